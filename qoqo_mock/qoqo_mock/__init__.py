@@ -8,7 +8,22 @@ Mocks quantum computing simulation for performance tests.
 
     mocked_call_operation
     mocked_call_circuit
+    mocked_compile_circuit
+    MockedCircuitPlan
+    MockedDensityMatrix
+    MockedBitRegister
+    MockedProfiler
+    MockedShotStream
     MockedBackend
+    MockedDeviceIndex
+    MockedMeasurementSession
+    MockedResultCache
+    MockedResultSink
+    MockedRegisterFile
+    MockedRemoteBackend
+    MockedTimingModel
+    read_circuit_archive
+    write_circuit_archive
 
 """
 
@@ -23,7 +38,75 @@ Mocks quantum computing simulation for performance tests.
 # is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
 # or implied. See the License for the specific language governing permissions and limitations under
 # the License.
-from qoqo_mock.interface import mocked_call_operation, mocked_call_circuit
-from qoqo_mock.backend import MockedBackend
+from qoqo_mock._lazy import lazy_attributes
+from typing import TYPE_CHECKING
 
-__all__ = ["MockedBackend", "mocked_call_circuit", "mocked_call_operation"]
+if TYPE_CHECKING:
+    from qoqo_mock.interface import (
+        mocked_call_operation,
+        mocked_call_circuit,
+        mocked_compile_circuit,
+        MockedBitRegister,
+        MockedCircuitPlan,
+        MockedDensityMatrix,
+        MockedProfiler,
+        MockedShotStream,
+    )
+    from qoqo_mock.backend import (
+        MockedBackend,
+        MockedDeviceIndex,
+        MockedMeasurementSession,
+        MockedRegisterFile,
+        MockedRemoteBackend,
+        MockedResultCache,
+        MockedResultSink,
+        MockedTimingModel,
+        read_circuit_archive,
+        write_circuit_archive,
+    )
+
+# Module defining each public name, imported on first access so that importing
+# qoqo_mock does not import qoqo and numpy
+_LAZY_IMPORTS = {
+    "mocked_call_operation": "qoqo_mock.interface",
+    "mocked_call_circuit": "qoqo_mock.interface",
+    "mocked_compile_circuit": "qoqo_mock.interface",
+    "MockedBitRegister": "qoqo_mock.interface",
+    "MockedCircuitPlan": "qoqo_mock.interface",
+    "MockedDensityMatrix": "qoqo_mock.interface",
+    "MockedProfiler": "qoqo_mock.interface",
+    "MockedShotStream": "qoqo_mock.interface",
+    "MockedBackend": "qoqo_mock.backend",
+    "MockedDeviceIndex": "qoqo_mock.backend",
+    "MockedMeasurementSession": "qoqo_mock.backend",
+    "MockedRegisterFile": "qoqo_mock.backend",
+    "MockedRemoteBackend": "qoqo_mock.backend",
+    "MockedResultCache": "qoqo_mock.backend",
+    "MockedResultSink": "qoqo_mock.backend",
+    "MockedTimingModel": "qoqo_mock.backend",
+    "read_circuit_archive": "qoqo_mock.backend",
+    "write_circuit_archive": "qoqo_mock.backend",
+}
+
+__all__ = [
+    "MockedBackend",
+    "MockedBitRegister",
+    "MockedCircuitPlan",
+    "MockedDensityMatrix",
+    "MockedDeviceIndex",
+    "MockedMeasurementSession",
+    "MockedProfiler",
+    "MockedRegisterFile",
+    "MockedRemoteBackend",
+    "MockedResultCache",
+    "MockedResultSink",
+    "MockedShotStream",
+    "MockedTimingModel",
+    "mocked_call_circuit",
+    "mocked_call_operation",
+    "mocked_compile_circuit",
+    "read_circuit_archive",
+    "write_circuit_archive",
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_IMPORTS)
@@ -0,0 +1,65 @@
+"""Lazy loading of the public names of the qoqo_mock packages."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from typing import Any, Callable, Dict, List, Tuple
+import importlib
+import sys
+
+
+def lazy_attributes(
+    package: str, imports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Create the module level __getattr__ and __dir__ of a package importing names lazily.
+
+    The modules defining the names, and with them qoqo and numpy, are only imported when a
+    name is accessed for the first time. The name is then stored in the package, so that
+    later accesses do not call __getattr__ again.
+
+    Args:
+        package: The name of the package
+        imports: The module defining each lazily imported name
+
+    Returns:
+        Tuple[Callable, Callable]: The __getattr__ and __dir__ functions of the package
+
+    """
+
+    def __getattr__(name: str) -> Any:
+        """Import a public name on first access.
+
+        Args:
+            name: The accessed name
+
+        Returns:
+            Any: The value of the name
+
+        Raises:
+            AttributeError: The package has no such name
+
+        """
+        if name not in imports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(imports[name]), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        """List the names of the package, including those not imported yet.
+
+        Returns:
+            List[str]: The names of the package
+
+        """
+        return sorted(set(vars(sys.modules[package])) | set(imports))
+
+    return (__getattr__, __dir__)
@@ -4,6 +4,15 @@
     :toctree: generated/
 
     MockedBackend
+    MockedDeviceIndex
+    MockedMeasurementSession
+    MockedRegisterFile
+    MockedRemoteBackend
+    MockedResultCache
+    MockedResultSink
+    MockedTimingModel
+    read_circuit_archive
+    write_circuit_archive
 
 """
 
@@ -18,8 +27,50 @@
 # is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
 # or implied. See the License for the specific language governing permissions and limitations under
 # the License.
-from qoqo_mock.backend.mocked_backend import (
-    MockedBackend,
-)
+from qoqo_mock._lazy import lazy_attributes
+from typing import TYPE_CHECKING
 
-__all__ = ["MockedBackend"]
+if TYPE_CHECKING:
+    from qoqo_mock.backend.mocked_backend import (
+        MockedBackend,
+        MockedMeasurementSession,
+    )
+    from qoqo_mock.backend.mocked_archive import (
+        read_circuit_archive,
+        write_circuit_archive,
+    )
+    from qoqo_mock.backend.mocked_device import MockedDeviceIndex
+    from qoqo_mock.backend.mocked_remote_backend import MockedRemoteBackend
+    from qoqo_mock.backend.mocked_result_cache import MockedResultCache
+    from qoqo_mock.backend.mocked_result_sink import MockedRegisterFile, MockedResultSink
+    from qoqo_mock.backend.mocked_timing import MockedTimingModel
+
+# Module defining each public name, imported on first access so that importing
+# qoqo_mock.backend does not import qoqo and numpy
+_LAZY_IMPORTS = {
+    "MockedBackend": "qoqo_mock.backend.mocked_backend",
+    "MockedDeviceIndex": "qoqo_mock.backend.mocked_device",
+    "MockedMeasurementSession": "qoqo_mock.backend.mocked_backend",
+    "MockedRegisterFile": "qoqo_mock.backend.mocked_result_sink",
+    "MockedRemoteBackend": "qoqo_mock.backend.mocked_remote_backend",
+    "MockedResultCache": "qoqo_mock.backend.mocked_result_cache",
+    "MockedResultSink": "qoqo_mock.backend.mocked_result_sink",
+    "MockedTimingModel": "qoqo_mock.backend.mocked_timing",
+    "read_circuit_archive": "qoqo_mock.backend.mocked_archive",
+    "write_circuit_archive": "qoqo_mock.backend.mocked_archive",
+}
+
+__all__ = [
+    "MockedBackend",
+    "MockedDeviceIndex",
+    "MockedMeasurementSession",
+    "MockedRegisterFile",
+    "MockedRemoteBackend",
+    "MockedResultCache",
+    "MockedResultSink",
+    "MockedTimingModel",
+    "read_circuit_archive",
+    "write_circuit_archive",
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_IMPORTS)
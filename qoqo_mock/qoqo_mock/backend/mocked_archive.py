@@ -0,0 +1,144 @@
+"""Archives of serialised circuits and measurements for bulk execution."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import Circuit  # type: ignore
+from qoqo import measurements  # type: ignore
+from qoqo_mock.backend.mocked_serialisation import _MEASUREMENT_TYPES, _SERIALISATIONS
+from typing import Any, BinaryIO, Iterable, Iterator, Union
+import mmap
+import os
+import struct
+
+# An archive is the magic bytes followed by one record per circuit or measurement. A record
+# is the header (serialisation, length of the type name, length of the payload), the type
+# name ("Circuit" or the measurement class name) and the JSON or bincode payload.
+_ARCHIVE_MAGIC = b"QOQOMOCK"
+
+_RECORD_HEADER = struct.Struct("<BBQ")
+
+# Path of an archive file or buffer holding an archive
+_ArchiveSource = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview]
+
+
+def write_circuit_archive(
+    file: Union[str, "os.PathLike[str]", BinaryIO],
+    serialisables: Iterable[Any],
+    serialisation: str = "bincode",
+) -> int:
+    """Write circuits and measurements to an archive for MockedBackend.run_archive.
+
+    Args:
+        file: The path of the archive or a binary file object it is written to
+        serialisables: The circuits and measurements, serialised one at a time
+        serialisation: The serialisation of the records, "json" or "bincode"
+
+    Returns:
+        int: The number of written records
+
+    Raises:
+        ValueError: Unknown serialisation or type that cannot be archived
+
+    """
+    if serialisation not in _SERIALISATIONS:
+        raise ValueError(
+            f"Unknown serialisation {serialisation}, expected one of {_SERIALISATIONS}"
+        )
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as archive:
+            return write_circuit_archive(archive, serialisables, serialisation)
+
+    file.write(_ARCHIVE_MAGIC)
+    number_records = 0
+    for serialisable in serialisables:
+        type_name = type(serialisable).__name__
+        if type_name != "Circuit" and type_name not in _MEASUREMENT_TYPES:
+            raise ValueError(f"Cannot archive objects of type {type_name}")
+        if serialisation == "json":
+            payload = serialisable.to_json().encode()
+        else:
+            payload = bytes(serialisable.to_bincode())
+        name = type_name.encode()
+        file.write(
+            _RECORD_HEADER.pack(_SERIALISATIONS.index(serialisation), len(name), len(payload))
+        )
+        file.write(name)
+        file.write(payload)
+        number_records += 1
+    return number_records
+
+
+def read_circuit_archive(source: _ArchiveSource) -> Iterator[Any]:
+    """Lazily deserialise the circuits and measurements of an archive.
+
+    Archive files are memory mapped, only the record that is currently deserialised is copied
+    into memory. The file is unmapped when the iterator is exhausted or closed.
+
+    Args:
+        source: The path of the archive or a buffer holding it
+
+    Yields:
+        Any: The next circuit or measurement
+
+    Raises:
+        ValueError: The source is not a valid archive
+
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield from _read_records(source)
+        return
+    with open(source, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError(f"{source!s} is not a circuit archive")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from _read_records(mapped)
+
+
+def _read_records(buffer: Any) -> Iterator[Any]:
+    """Deserialise the records of an archive held in a buffer.
+
+    Args:
+        buffer: The archive, any object supporting slicing and the buffer protocol
+
+    Yields:
+        Any: The next circuit or measurement
+
+    Raises:
+        ValueError: The buffer is not a valid archive
+
+    """
+    if bytes(buffer[: len(_ARCHIVE_MAGIC)]) != _ARCHIVE_MAGIC:
+        raise ValueError("Not a circuit archive")
+    offset = len(_ARCHIVE_MAGIC)
+    size = len(buffer)
+    while offset < size:
+        if offset + _RECORD_HEADER.size > size:
+            raise ValueError(f"Truncated record header at byte {offset}")
+        serialisation, name_length, payload_length = _RECORD_HEADER.unpack_from(buffer, offset)
+        if serialisation >= len(_SERIALISATIONS):
+            raise ValueError(f"Unknown record serialisation {serialisation} at byte {offset}")
+        name_start = offset + _RECORD_HEADER.size
+        payload_start = name_start + name_length
+        offset = payload_start + payload_length
+        if offset > size:
+            raise ValueError(f"Truncated record at byte {name_start}")
+        type_name = bytes(buffer[name_start:payload_start]).decode()
+        if type_name == "Circuit":
+            cls = Circuit
+        elif type_name in _MEASUREMENT_TYPES:
+            cls = getattr(measurements, type_name)
+        else:
+            raise ValueError(f"Unknown record type {type_name}")
+        if _SERIALISATIONS[serialisation] == "json":
+            yield cls.from_json(bytes(buffer[payload_start:offset]).decode())
+        else:
+            yield cls.from_bincode(bytearray(buffer[payload_start:offset]))
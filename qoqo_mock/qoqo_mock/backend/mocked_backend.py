@@ -12,8 +12,305 @@
 # or implied. See the License for the specific language governing permissions and limitations under
 # the License.
 from qoqo import Circuit  # type: ignore
-from typing import Tuple, List, Dict, Any, Optional, cast
-from qoqo_mock import mocked_call_circuit
+from typing import cast, Callable, Iterable, Iterator, Tuple, List, Dict, Any, Optional, Union
+from qoqo_mock import (
+    mocked_call_circuit,
+    mocked_compile_circuit,
+    MockedBitRegister,
+    MockedCircuitPlan,
+    MockedProfiler,
+    MockedShotStream,
+)
+from qoqo_mock.interface.mocked_interface import _check_formats
+from qoqo_mock.backend.mocked_timing import MockedTimingModel
+from qoqo_mock.backend.mocked_result_cache import MockedResultCache
+from qoqo_mock.backend.mocked_archive import _ArchiveSource, read_circuit_archive
+from qoqo_mock.backend.mocked_statistics import _evaluate_pauli_z_statistics
+from qoqo_mock.backend.mocked_result_sink import MockedResultSink
+from qoqo_mock.backend.mocked_device import MockedDeviceIndex
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import hashlib
+import os
+import threading
+import numpy as np
+
+_EXECUTORS = [None, "thread", "process"]
+
+
+def _append_repetition(register: Any, repetition: Any) -> Any:
+    """Append the register of one circuit repetition to an output register.
+
+    Args:
+        register: The output register, a list of repetitions or a 2d numpy array
+        repetition: The register of the repetition
+
+    Returns:
+        Any: The extended output register
+
+    """
+    if isinstance(register, np.ndarray):
+        if len(register) == 0:
+            return repetition[np.newaxis, :]
+        return np.concatenate((register, repetition[np.newaxis, :]))
+    register.append(repetition)
+    return register
+
+
+def _measurement_circuits(measurement: Any) -> List[Circuit]:
+    """Return the circuits of a measurement, each prefixed with the constant circuit.
+
+    Args:
+        measurement: The measurement
+
+    Returns:
+        List[Circuit]: The circuits that are run for the measurement
+
+    """
+    constant_circuit = measurement.constant_circuit()
+    if constant_circuit is None:
+        return list(measurement.circuits())
+    return [constant_circuit + circuit for circuit in measurement.circuits()]
+
+
+def _merge_registers(
+    results: Iterable[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]],
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Merge the output registers of the circuits of a measurement.
+
+    Registers are merged in circuit order, which keeps the result independent of the order
+    in which the circuits finished.
+
+    Args:
+        results: The output registers of each circuit, consumed one circuit at a time
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The merged output registers
+
+    """
+    output_bit_register_dict: Dict[str, Any] = {}
+    output_float_register_dict: Dict[str, Any] = {}
+    output_complex_register_dict: Dict[str, Any] = {}
+    for (
+        tmp_bit_register_dict,
+        tmp_float_register_dict,
+        tmp_complex_register_dict,
+    ) in results:
+        output_bit_register_dict.update(tmp_bit_register_dict)
+        output_float_register_dict.update(tmp_float_register_dict)
+        output_complex_register_dict.update(tmp_complex_register_dict)
+    return (
+        output_bit_register_dict,
+        output_float_register_dict,
+        output_complex_register_dict,
+    )
+
+
+class _BatchedGenerator(object):
+    """Random generator drawing the readouts of a batch of runs in single vectorised draws.
+
+    Runs of structurally identical circuits make the same sequence of random draws. The values
+    of consecutive runs are drawn at once, with an additional leading batch axis, and every run
+    receives its slice. With a memory limit, each batched draw covers only as many runs as fit
+    into the limit. Draws that do not match the recorded sequence fall back to the underlying
+    generator.
+    """
+
+    def __init__(
+        self, rng: np.random.Generator, batch_size: int, memory_limit: Optional[int] = None
+    ) -> None:
+        """Initialize generator.
+
+        Args:
+            rng: The underlying random generator
+            batch_size: The number of runs in the batch
+            memory_limit: The maximal number of bytes of a single batched draw
+
+        """
+        self._rng = rng
+        self._batch_size = batch_size
+        self._memory_limit = memory_limit
+        self._draws: List[List[Any]] = []
+        self._run_index = 0
+        self._call_index = 0
+
+    def start_run(self, run_index: int) -> None:
+        """Start drawing the readouts of the run with the given index in the batch.
+
+        Args:
+            run_index: The index of the run in the batch
+
+        """
+        self._run_index = run_index
+        self._call_index = 0
+
+    def _next_call(self, key: Tuple[Any, ...]) -> Optional[List[Any]]:
+        """Return the record of the next draw if it matches the call.
+
+        The first run of the batch records the sequence of draws.
+
+        Args:
+            key: The method and arguments of the draw
+
+        Returns:
+            Optional[List[Any]]: The record of key, start run and drawn values, if matching
+
+        """
+        call_index = self._call_index
+        self._call_index += 1
+        if self._run_index == 0 and call_index == len(self._draws):
+            self._draws.append([key, 0, None])
+        if call_index < len(self._draws) and self._draws[call_index][0] == key:
+            return self._draws[call_index]
+        return None
+
+    def _draw(
+        self,
+        key: Tuple[Any, ...],
+        shape: Tuple[int, ...],
+        itemsize: int,
+        draw: Callable[..., np.ndarray],
+    ) -> Any:
+        """Return the slice of the current run from the batched draw matching the call.
+
+        Args:
+            key: The method and arguments of the draw
+            shape: The shape of the values of a single run
+            itemsize: The number of bytes of a single drawn value
+            draw: Function drawing values of a given shape from the underlying generator
+
+        Returns:
+            Any: The drawn values of the current run
+
+        """
+        record = self._next_call(key)
+        if record is None:
+            return draw(shape)
+        run_index = self._run_index
+        values = record[2]
+        if values is None or not record[1] <= run_index < record[1] + len(values):
+            runs = self._batch_size - run_index
+            if self._memory_limit is not None:
+                run_bytes = max(1, int(np.prod(shape)) * itemsize)
+                runs = min(runs, max(1, self._memory_limit // run_bytes))
+            record[1] = run_index
+            record[2] = values = draw((runs, *shape))
+        return values[run_index - record[1]]
+
+    def integers(
+        self,
+        low: int,
+        high: Optional[int] = None,
+        size: Any = None,
+        dtype: Any = np.int64,
+        endpoint: bool = False,
+    ) -> Any:
+        """Draw random integers, see np.random.Generator.integers.
+
+        Args:
+            low: The lowest integer drawn
+            high: One above the highest integer drawn
+            size: The shape of the drawn values
+            dtype: The dtype of the drawn values
+            endpoint: Whether high is included
+
+        Returns:
+            Any: The drawn integers
+
+        """
+        shape = () if size is None else tuple(np.atleast_1d(size))
+        return self._draw(
+            ("integers", low, high, shape, np.dtype(dtype), endpoint),
+            shape,
+            np.dtype(dtype).itemsize,
+            lambda batch_shape: self._rng.integers(
+                low, high, size=batch_shape, dtype=dtype, endpoint=endpoint
+            ),
+        )
+
+    def random(self, size: Any = None, dtype: Any = np.float64, out: Any = None) -> Any:
+        """Draw random floats in [0, 1), see np.random.Generator.random.
+
+        Values written to a given out array are drawn directly into it.
+
+        Args:
+            size: The shape of the drawn values
+            dtype: The dtype of the drawn values
+            out: Array the values are written to, if given
+
+        Returns:
+            Any: The drawn floats
+
+        """
+        if out is not None:
+            self._next_call(("random_out", out.shape, np.dtype(dtype)))
+            return self._rng.random(dtype=dtype, out=out)
+        shape = () if size is None else tuple(np.atleast_1d(size))
+        return self._draw(
+            ("random", shape, np.dtype(dtype)),
+            shape,
+            np.dtype(dtype).itemsize,
+            lambda batch_shape: self._rng.random(batch_shape, dtype=dtype),
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        """Forward all other methods to the underlying generator.
+
+        Args:
+            name: The name of the attribute
+
+        Returns:
+            Any: The attribute of the underlying generator
+
+        """
+        return getattr(self._rng, name)
+
+
+def _digest(serialisable: Any) -> bytes:
+    """Hash a circuit, measurement or device by its type and its bincode serialisation.
+
+    Args:
+        serialisable: The circuit, measurement or device
+
+    Returns:
+        bytes: The 16 byte digest
+
+    """
+    content = hashlib.blake2b(type(serialisable).__name__.encode(), digest_size=16)
+    content.update(serialisable.to_bincode())
+    return content.digest()
+
+
+# The backend of a process pool worker, set once when the worker is started
+_WORKER_BACKEND: Dict[str, "MockedBackend"] = {}
+
+
+def _init_worker(backend: "MockedBackend") -> None:
+    """Set the backend of a process pool worker.
+
+    Args:
+        backend: The backend the circuits of the worker are run on
+
+    """
+    _WORKER_BACKEND["backend"] = backend
+
+
+def _run_serialised_circuit(
+    serialised_circuit: bytes, rng: np.random.Generator
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Run a bincode serialised circuit on the backend of a process pool worker.
+
+    qoqo circuits cannot be pickled, so they are sent to the worker processes serialised.
+
+    Args:
+        serialised_circuit: The bincode serialised circuit
+        rng: The random generator of the circuit
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+    """
+    return _WORKER_BACKEND["backend"]._run_circuit(Circuit.from_bincode(serialised_circuit), rng)
 
 
 class MockedBackend(object):
@@ -23,22 +320,168 @@ class MockedBackend(object):
     circuit using the qoqo_mocked interface. This interface produces random measurements coherent
     with the measured quantity. These results are then output from the run function in this backend
     and are accessible through the classical registers dictionary.
+
+    All random readouts are drawn from one generator owned by the backend, constructing the
+    backend with a fixed seed makes its runs reproducible.
     """
 
-    def __init__(self, number_qubits: int = 1) -> None:
+    def __init__(
+        self,
+        number_qubits: int = 1,
+        seed: Optional[int] = None,
+        output_format: str = "list",
+        density_matrix_format: str = "dense",
+        state_vector_dtype: Any = np.complex128,
+        memory_limit: Optional[int] = None,
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        timing_model: Optional[MockedTimingModel] = None,
+        shot_chunk_size: Optional[int] = None,
+        bit_register_format: str = "dense",
+        result_cache: Optional[MockedResultCache] = None,
+        profiler: Optional[MockedProfiler] = None,
+        measurement_statistics: bool = False,
+        result_sink: Optional[MockedResultSink] = None,
+        draw_threads: Optional[int] = None,
+        device: Any = None,
+    ) -> None:
         """Initialize backend.
 
         Args:
-            number_qubits: The number of qubits to use
+            number_qubits: The number of qubits to use, the number of qubits of the device
+                           if a device is given. Readouts are sized to the qubits a circuit
+                           uses, bounded by this number
+            seed: The seed of the random generator, fresh entropy is used if None
+            output_format: The format of the returned registers, "list" for nested python
+                           lists or "numpy" for arrays with one row per circuit repetition
+            density_matrix_format: The format of density matrix readouts, "dense", "sparse"
+                                   or "lazy" (see mocked_call_circuit)
+            state_vector_dtype: The dtype of state vector readouts, complex64 or complex128
+            memory_limit: The maximal number of bytes of a single state vector or dense density
+                          matrix readout, larger readouts are refused with a MemoryError
+            executor: Run the circuits of a measurement concurrently in a "thread" or
+                      "process" pool, serially if None. Each circuit draws from its own
+                      generator spawned from the seed. The pool is kept until close
+            max_workers: The number of pool workers, the executor default if None.
+                         Also bounds the number of concurrently running async jobs
+            timing_model: The model simulating the duration of each job in real or virtual
+                          time, no delay if None
+            shot_chunk_size: Return repeated measurement readouts as MockedShotStream,
+                             generated lazily in chunks of this many shots
+            bit_register_format: The format of the returned bit registers, "dense" for the
+                                 output format or "packed" for MockedBitRegister
+            result_cache: The cache of the results of run_circuit, run_measurement_registers
+                          and run_measurement, requires a seed. With a cache, the readouts of
+                          a circuit or measurement only depend on its content and the seed.
+                          No caching if None
+            profiler: The profiler recording the phases and operations of each run,
+                      runs are not instrumented if None. Runs in process pool workers are
+                      not profiled
+            measurement_statistics: Evaluate PauliZProduct measurements in run_measurement
+                                    from sampled parity counts, at a cost independent of
+                                    the number of shots. Other measurements are evaluated
+                                    from their registers
+            result_sink: The sink writing the output registers returned by run_circuit,
+                         run_measurement_registers and their batch, async and session
+                         variants to disk, registers are kept in memory if None. Evaluated
+                         measurements are not written
+            draw_threads: The number of threads generating a single large readout, see
+                          mocked_call_circuit. Large readouts are drawn by one thread if None
+            device: The qoqo device the circuits are validated against, circuits using gates
+                    or qubit pairs it does not support are refused with a RuntimeError. Any
+                    gate is accepted on any qubits if None
+
+        Raises:
+            ValueError: Unknown output format, density matrix format, bit register format
+                        or executor, or result cache without seed
 
         """
+        _check_formats(output_format, density_matrix_format, bit_register_format)
+        if executor not in _EXECUTORS:
+            raise ValueError(f"Unknown executor {executor}, expected one of {_EXECUTORS}")
+        if result_cache is not None and seed is None:
+            raise ValueError("A result cache requires a seed")
         self.name = "mocked"
-        self.number_qubits = number_qubits
+        self.device = device
+        self.device_index = None if device is None else MockedDeviceIndex(device)
+        self._device_digest = None if device is None else _digest(device)
+        self.number_qubits = number_qubits if device is None else device.number_qubits()
+        self.output_format = output_format
+        self.density_matrix_format = density_matrix_format
+        self.state_vector_dtype = state_vector_dtype
+        self.memory_limit = memory_limit
+        self.executor = executor
+        self.max_workers = max_workers
+        self.timing_model = timing_model
+        self.shot_chunk_size = shot_chunk_size
+        self.bit_register_format = bit_register_format
+        self.result_cache = result_cache
+        self.profiler = profiler
+        self.measurement_statistics = measurement_statistics
+        self.result_sink = result_sink
+        self.draw_threads = draw_threads
+        self.seed = seed
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.Generator(np.random.PCG64(self._seed_sequence))
+        self._async_pool: Optional[ThreadPoolExecutor] = None
+        self._executor_pool: Optional[Executor] = None
+        self._executor_pool_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state for pickling, without worker pools, profiler, cache and device.
+
+        Circuits are validated against the device before they are sent to process workers.
+
+        Returns:
+            Dict[str, Any]: The pickled state
+
+        """
+        state = self.__dict__.copy()
+        state["_async_pool"] = None
+        state["_executor_pool"] = None
+        state["_executor_pool_lock"] = None
+        state["profiler"] = None
+        state["result_cache"] = None
+        state["device"] = None
+        state["device_index"] = None
+        return state
+
+    def close(self) -> None:
+        """Shut down the worker pools of the executor and the async methods.
+
+        Waits for running jobs. The pools are started again when they are needed.
+        """
+        if self._async_pool is not None:
+            self._async_pool.shutdown(wait=True)
+            self._async_pool = None
+        with self._executor_pool_lock:
+            if self._executor_pool is not None:
+                self._executor_pool.shutdown(wait=True)
+                self._executor_pool = None
+
+    def spawn_generators(self, number: int) -> List[np.random.Generator]:
+        """Spawn independent random generators from the seed of the backend.
+
+        The spawned generators do not share state with the backend or with each other and can
+        be handed to parallel workers. For a fixed seed the n-th spawned generator is always
+        the same.
+
+        Args:
+            number: The number of generators to spawn
+
+        Returns:
+            List[np.random.Generator]: The spawned generators
+
+        """
+        return [
+            np.random.Generator(np.random.PCG64(child))
+            for child in self._seed_sequence.spawn(number)
+        ]
 
     def run_circuit(self, circuit: Circuit) -> Tuple[
-        Dict[str, List[List[bool]]],
-        Dict[str, List[List[float]]],
-        Dict[str, List[List[complex]]],
+        Dict[str, Union[List[List[bool]], np.ndarray]],
+        Dict[str, Union[List[List[float]], np.ndarray]],
+        Dict[str, Union[List[List[complex]], np.ndarray]],
     ]:
         """Run a circuit with the Mocked backend.
 
@@ -49,72 +492,404 @@ class MockedBackend(object):
             Union[None, Dict[str, 'RegisterOutput']]
 
         """
-        # Initializing the classical registers for calculation and output
-        internal_bit_register_dict: Dict[str, List[bool]] = {}
-        internal_float_register_dict: Dict[str, List[float]] = {}
-        internal_complex_register_dict: Dict[str, List[complex]] = {}
-
-        output_bit_register_dict: Dict[str, List[List[bool]]] = {}
-        output_float_register_dict: Dict[str, List[List[float]]] = {}
-        output_complex_register_dict: Dict[str, List[List[complex]]] = {}
-
-        for bit_def in circuit.filter_by_tag("DefinitionBit"):
-            internal_bit_register_dict[bit_def.name()] = [False for _ in range(bit_def.length())]
-            if bit_def.is_output():
-                output_bit_register_dict[bit_def.name()] = []
-
-        for float_def in circuit.filter_by_tag("DefinitionFloat"):
-            internal_float_register_dict[float_def.name()] = [
-                0.0 for _ in range(float_def.length())
-            ]
-            if float_def.is_output():
-                output_float_register_dict[float_def.name()] = cast("List[List[float]]", [])
-
-        for complex_def in circuit.filter_by_tag("DefinitionComplex"):
-            internal_complex_register_dict[complex_def.name()] = [
-                complex(0.0) for _ in range(complex_def.length())
-            ]
-            if complex_def.is_output():
-                output_complex_register_dict[complex_def.name()] = cast("List[List[complex]]", [])
-
-        (
-            internal_bit_register_dict,
-            internal_float_register_dict,
-            internal_complex_register_dict,
-            output_bit_register_dict,
-            output_complex_register_dict,
-        ) = mocked_call_circuit(
-            circuit=circuit,
-            classical_bit_registers=internal_bit_register_dict,
-            classical_float_registers=internal_float_register_dict,
-            classical_complex_registers=internal_complex_register_dict,
-            output_bit_register_dict=output_bit_register_dict,
-            output_complex_register_dict=output_complex_register_dict,
-            number_qubits=self.number_qubits,
+        return self._write_result(self._circuit_registers(circuit, self.rng))
+
+    def _circuit_registers(self, circuit: Circuit, rng: np.random.Generator) -> Tuple[
+        Dict[str, Any],
+        Dict[str, Any],
+        Dict[str, Any],
+    ]:
+        """Run a circuit without writing to the result sink, from the cache if set.
+
+        Args:
+            circuit: The circuit that is run
+            rng: The random generator used for the readouts, replaced by the generator of the
+                 circuit digest in deterministic mode
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        if self.result_cache is None:
+            return self._run_circuit_job(circuit, rng)
+        digest = _digest(circuit)
+        return self._cached(
+            "circuit", digest, self._run_circuit_job, circuit, self._job_generator(digest)
+        )
+
+    def _write_result(
+        self,
+        registers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+        run_index: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Write the output registers of a run to the result sink, if set.
+
+        Args:
+            registers: The output bit, float and complex registers of the run
+            run_index: The index of the sink run the registers belong to, a new run if None
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The registers, stored
+                                                                   registers as handles
+
+        """
+        if self.result_sink is None:
+            return registers
+        if self.profiler is None:
+            return self.result_sink.write_registers(registers, run_index)
+        return self.profiler.call("sink", self.result_sink.write_registers, registers, run_index)
+
+    def _write_results(
+        self, results: Iterable[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Merge the output registers of the circuits of a run, writing them to the sink if set.
+
+        The registers of each circuit are written as soon as the circuit has run, before the
+        next circuit is run, so that only the registers of one circuit are held in memory.
+
+        Args:
+            results: The output registers of each circuit, produced one circuit at a time
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The merged registers,
+                                                                   stored registers as handles
+
+        """
+        if self.result_sink is None:
+            return _merge_registers(results)
+        run_index = self.result_sink.start_run()
+        return _merge_registers(self._write_result(result, run_index) for result in results)
+
+    def _write_job(
+        self, function: Callable[..., Any], *args: Any
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Run a job and write its output registers to the result sink, if set.
+
+        Args:
+            function: The function run by the job
+            *args: The arguments of the function
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        return self._write_result(function(*args))
+
+    def _job_generator(self, digest: bytes) -> np.random.Generator:
+        """Return the generator of a job in deterministic mode.
+
+        Args:
+            digest: The digest of the circuit or measurement run by the job
+
+        Returns:
+            np.random.Generator: The generator derived from the seed and the digest
+
+        """
+        spawn_key = tuple(np.frombuffer(digest, dtype=np.uint64).tolist())
+        return np.random.Generator(
+            np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=spawn_key))
+        )
+
+    def _cache_key(self, kind: str, digest: bytes) -> Tuple[Any, ...]:
+        """Return the result cache key of a run, including all options changing the results.
+
+        The device and the memory limit are part of the key, so that a result is never served
+        to a backend that would refuse the run.
+
+        Args:
+            kind: The kind of the result
+            digest: The digest of the circuit or measurement that is run
+
+        Returns:
+            Tuple[Any, ...]: The cache key
+
+        """
+        return (
+            kind,
+            digest,
+            self.seed,
+            self.number_qubits,
+            self.output_format,
+            self.density_matrix_format,
+            np.dtype(self.state_vector_dtype).str,
+            self.memory_limit,
+            self._device_digest,
+            self.shot_chunk_size,
+            self.bit_register_format,
+            self.measurement_statistics,
+            self.draw_threads is not None,
         )
 
-        for name, reg in output_bit_register_dict.items():
-            if name in internal_bit_register_dict.keys():
-                reg.append(internal_bit_register_dict[name])
+    def _cached(self, kind: str, digest: bytes, function: Callable[..., Any], *args: Any) -> Any:
+        """Return a cached result, or compute and cache it.
+
+        Args:
+            kind: The kind of the result
+            digest: The digest of the circuit or measurement that is run
+            function: The function computing the result
+            *args: The arguments of the function
+
+        Returns:
+            Any: The result
+
+        """
+        cache = cast("MockedResultCache", self.result_cache)
+        key = self._cache_key(kind, digest)
+        result = cache.get(key)
+        if result is None:
+            result = function(*args)
+            cache.put(key, result)
+        return result
+
+    def _simulate_job(self, circuits: List[Circuit]) -> None:
+        """Simulate the duration of a job with the timing model, if any.
+
+        Args:
+            circuits: The circuits run in the job
+
+        """
+        if self.timing_model is not None:
+            self.timing_model.simulate_job(circuits)
+
+    def _compile(self, circuit: Circuit) -> MockedCircuitPlan:
+        """Compile a circuit into its plan and validate it against the device, if set.
+
+        The compile and validation phases are recorded if profiled.
+
+        Args:
+            circuit: The circuit that is compiled
+
+        Returns:
+            MockedCircuitPlan: The compiled plan
+
+        """
+        if self.profiler is None:
+            plan = mocked_compile_circuit(circuit)
+            if self.device_index is not None:
+                self.device_index.check(circuit, plan)
+            return plan
+        plan = self.profiler.call("compile", mocked_compile_circuit, circuit)
+        if self.device_index is not None:
+            self.profiler.call("validation", self.device_index.check, circuit, plan)
+        return plan
+
+    def _evaluate(
+        self, measurement: Any, registers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]
+    ) -> Optional[Dict[str, float]]:
+        """Evaluate a measurement from its registers, recording the evaluation phase if profiled.
+
+        Args:
+            measurement: The measurement that is evaluated
+            registers: The output bit, float and complex registers of the measurement
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        if self.shot_chunk_size is not None or self.bit_register_format == "packed":
+            # Measurements can only be evaluated from materialised shots
+            bit_registers = {
+                name: (
+                    register.tolist()
+                    if isinstance(register, (MockedShotStream, MockedBitRegister))
+                    else register
+                )
+                for name, register in registers[0].items()
+            }
+            registers = (bit_registers, registers[1], registers[2])
+        if self.profiler is None:
+            return measurement.evaluate(*registers)
+        return self.profiler.call("evaluation", measurement.evaluate, *registers)
+
+    def _run_circuit_job(self, circuit: Circuit, rng: np.random.Generator) -> Tuple[
+        Dict[str, Any],
+        Dict[str, Any],
+        Dict[str, Any],
+    ]:
+        """Run a circuit as a single job, including its simulated duration.
+
+        Args:
+            circuit: The circuit that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        self._simulate_job([circuit])
+        return self._run_circuit(circuit, rng)
+
+    def _run_circuit(self, circuit: Circuit, rng: np.random.Generator) -> Tuple[
+        Dict[str, Any],
+        Dict[str, Any],
+        Dict[str, Any],
+    ]:
+        """Run a circuit drawing the readouts from the given random generator.
+
+        Args:
+            circuit: The circuit that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        return self._run_plan(self._compile(circuit), rng)
+
+    def _run_plan(self, plan: MockedCircuitPlan, rng: Any) -> Tuple[
+        Dict[str, Any],
+        Dict[str, Any],
+        Dict[str, Any],
+    ]:
+        """Run a compiled circuit plan drawing the readouts from the given random generator.
+
+        Args:
+            plan: The compiled plan of the circuit that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        profiler = self.profiler
+        if profiler is None:
+            internal, output = self._setup_registers(plan)
+            self._call_plan(plan, rng, internal, output)
+            return self._assemble_outputs(internal, output)
+        internal, output = profiler.call("register_setup", self._setup_registers, plan)
+        self._call_plan(plan, rng, internal, output)
+        return profiler.call("output_assembly", self._assemble_outputs, internal, output)
+
+    def _setup_registers(self, plan: MockedCircuitPlan) -> Tuple[
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+        Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+    ]:
+        """Create the internal and output registers of a compiled circuit plan.
+
+        Args:
+            plan: The compiled plan of the circuit that is run
+
+        Returns:
+            Tuple[Tuple[Dict, Dict, Dict], Tuple[Dict, Dict, Dict]]: The internal and the output
+                                                                     bit, float and complex
+                                                                     registers
+
+        """
+        as_numpy = self.output_format == "numpy"
+        # Initializing the classical registers for calculation and output
+        internal_bit_register_dict: Dict[str, Any] = {}
+        internal_float_register_dict: Dict[str, Any] = {}
+        internal_complex_register_dict: Dict[str, Any] = {}
 
-        for name, reg in output_float_register_dict.items():  # type: ignore
-            if name in internal_float_register_dict.keys():
-                reg.append(internal_float_register_dict[name])  # type: ignore
+        output_bit_register_dict: Dict[str, Any] = {}
+        output_float_register_dict: Dict[str, Any] = {}
+        output_complex_register_dict: Dict[str, Any] = {}
 
-        for name, reg in output_complex_register_dict.items():  # type: ignore
-            if name in internal_complex_register_dict.keys():
-                reg.append(internal_complex_register_dict[name])  # type: ignore
+        for name, length, is_output in plan.bit_definitions:
+            if as_numpy:
+                internal_bit_register_dict[name] = np.zeros(length, dtype=np.bool_)
+                if is_output:
+                    output_bit_register_dict[name] = np.zeros((0, length), dtype=np.bool_)
+            else:
+                internal_bit_register_dict[name] = [False] * length
+                if is_output:
+                    output_bit_register_dict[name] = []
+
+        for name, length, is_output in plan.float_definitions:
+            if as_numpy:
+                internal_float_register_dict[name] = np.zeros(length, dtype=np.float64)
+                if is_output:
+                    output_float_register_dict[name] = np.zeros((0, length), dtype=np.float64)
+            else:
+                internal_float_register_dict[name] = [0.0] * length
+                if is_output:
+                    output_float_register_dict[name] = []
+
+        for name, length, is_output in plan.complex_definitions:
+            if as_numpy:
+                internal_complex_register_dict[name] = np.zeros(length, dtype=np.complex128)
+                if is_output:
+                    output_complex_register_dict[name] = np.zeros((0, length), dtype=np.complex128)
+            else:
+                internal_complex_register_dict[name] = [complex(0.0)] * length
+                if is_output:
+                    output_complex_register_dict[name] = []
 
         return (
-            output_bit_register_dict,
-            output_float_register_dict,
-            output_complex_register_dict,
+            (
+                internal_bit_register_dict,
+                internal_float_register_dict,
+                internal_complex_register_dict,
+            ),
+            (output_bit_register_dict, output_float_register_dict, output_complex_register_dict),
         )
 
+    def _call_plan(
+        self,
+        plan: MockedCircuitPlan,
+        rng: Any,
+        internal: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+        output: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+    ) -> None:
+        """Run the readout operations of a compiled circuit plan on its registers.
+
+        Args:
+            plan: The compiled plan of the circuit that is run
+            rng: The random generator used for the readouts
+            internal: The internal bit, float and complex registers, modified in place
+            output: The output bit, float and complex registers, modified in place
+
+        """
+        mocked_call_circuit(
+            circuit=plan,
+            classical_bit_registers=internal[0],
+            classical_float_registers=internal[1],
+            classical_complex_registers=internal[2],
+            output_bit_register_dict=output[0],
+            output_complex_register_dict=output[2],
+            number_qubits=self.number_qubits,
+            rng=rng,
+            output_format=self.output_format,
+            density_matrix_format=self.density_matrix_format,
+            state_vector_dtype=self.state_vector_dtype,
+            memory_limit=self.memory_limit,
+            shot_chunk_size=self.shot_chunk_size,
+            bit_register_format=self.bit_register_format,
+            profiler=self.profiler,
+            draw_threads=self.draw_threads,
+        )
+
+    def _assemble_outputs(
+        self,
+        internal: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+        output: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Append the internal registers of a run to the output registers.
+
+        Args:
+            internal: The internal bit, float and complex registers
+            output: The output bit, float and complex registers
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        for output_dict, internal_dict in zip(output, internal):
+            for name, reg in output_dict.items():
+                if name in internal_dict.keys():
+                    output_dict[name] = _append_repetition(reg, internal_dict[name])
+
+        if self.bit_register_format == "packed":
+            output_bit_register_dict = output[0]
+            for name, reg in output_bit_register_dict.items():
+                if not isinstance(reg, (MockedBitRegister, MockedShotStream)):
+                    output_bit_register_dict[name] = MockedBitRegister.from_bool(reg)
+        return output
+
     def run_measurement_registers(self, measurement: Any) -> Tuple[
-        Dict[str, List[List[bool]]],
-        Dict[str, List[List[float]]],
-        Dict[str, List[List[complex]]],
+        Dict[str, Union[List[List[bool]], np.ndarray]],
+        Dict[str, Union[List[List[float]], np.ndarray]],
+        Dict[str, Union[List[List[complex]], np.ndarray]],
     ]:
         """Run all circuits of a measurement with the Mocked backend.
 
@@ -125,30 +900,355 @@ class MockedBackend(object):
             Union[None, Dict[str, 'RegisterOutput']]
 
         """
-        # Initializing the classical registers for calculation and output
+        if self.result_cache is not None:
+            return self._write_result(self._measurement_registers(measurement))
+        return self._write_results(self._measurement_results(measurement))
 
-        constant_circuit = measurement.constant_circuit()
-        output_bit_register_dict: Dict[str, List[List[bool]]] = {}
-        output_float_register_dict: Dict[str, List[List[float]]] = {}
-        output_complex_register_dict: Dict[str, List[List[complex]]] = {}
-        for circuit in measurement.circuits():
-            if constant_circuit is None:
-                run_circuit = circuit
-            else:
-                run_circuit = constant_circuit + circuit
+    def _measurement_registers(
+        self, measurement: Any
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Run all circuits of a measurement in deterministic mode, from the result cache.
 
-            (
-                tmp_bit_register_dict,
-                tmp_float_register_dict,
-                tmp_complex_register_dict,
-            ) = self.run_circuit(run_circuit)
-            output_bit_register_dict.update(tmp_bit_register_dict)
-            output_float_register_dict.update(tmp_float_register_dict)
-            output_complex_register_dict.update(tmp_complex_register_dict)
-        return (
-            output_bit_register_dict,
-            output_float_register_dict,
-            output_complex_register_dict,
+        Args:
+            measurement: The measurement that is run
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        digest = _digest(measurement)
+        return self._cached(
+            "registers",
+            digest,
+            self._run_measurement_registers_serial,
+            measurement,
+            self._job_generator(digest),
+        )
+
+    def _measurement_results(
+        self, measurement: Any
+    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+        """Compile the circuits of a measurement and run them one at a time.
+
+        Args:
+            measurement: The measurement that is run
+
+        Returns:
+            Iterator[Tuple[Dict, Dict, Dict]]: The output registers of each circuit
+
+        """
+        run_circuits = _measurement_circuits(measurement)
+        plans = [self._compile(run_circuit) for run_circuit in run_circuits]
+        self._simulate_job(run_circuits)
+        return self._run_plans(run_circuits, plans)
+
+    def _run_plans(
+        self, circuits: List[Circuit], plans: List[MockedCircuitPlan]
+    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+        """Run compiled circuits, concurrently if an executor is set.
+
+        Args:
+            circuits: The circuits that are run
+            plans: The compiled plans of the circuits
+
+        Yields:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers of
+                                                                   each circuit, in order
+
+        """
+        if self.executor is None:
+            for plan in plans:
+                yield self._run_plan(plan, self.rng)
+            return
+
+        rngs = self.spawn_generators(len(plans))
+        pool = self._get_executor_pool()
+        if self.executor == "process":
+            # Circuits are sent in chunks, one chunk per worker and round
+            workers = self.max_workers or os.cpu_count() or 1
+            yield from pool.map(
+                _run_serialised_circuit,
+                [bytes(circuit.to_bincode()) for circuit in circuits],
+                rngs,
+                chunksize=max(1, len(circuits) // (4 * workers)),
+            )
+        else:
+            yield from pool.map(self._run_plan, plans, rngs)
+
+    def _get_executor_pool(self) -> Executor:
+        """Return the worker pool of the executor, starting it on first use.
+
+        Process workers receive a copy of the backend once, when the pool is started.
+
+        Returns:
+            Executor: The thread or process pool
+
+        """
+        with self._executor_pool_lock:
+            if self._executor_pool is None:
+                if self.executor == "process":
+                    self._executor_pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, initializer=_init_worker, initargs=(self,)
+                    )
+                else:
+                    self._executor_pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="qoqo_mock_executor"
+                    )
+            return self._executor_pool
+
+    def prepare(self, measurement: Any) -> "MockedMeasurementSession":
+        """Prepare a measurement for repeated runs with the Mocked backend.
+
+        Args:
+            measurement: The measurement that is prepared
+
+        Returns:
+            MockedMeasurementSession: The prepared measurement
+
+        """
+        return MockedMeasurementSession(self, measurement)
+
+    def run_circuit_batch(self, circuits: List[Circuit]) -> List[
+        Tuple[
+            Dict[str, Union[List[List[bool]], np.ndarray]],
+            Dict[str, Union[List[List[float]], np.ndarray]],
+            Dict[str, Union[List[List[complex]], np.ndarray]],
+        ]
+    ]:
+        """Run a batch of circuits with the Mocked backend.
+
+        Circuits are grouped by the structure of their compiled plans. The readouts of all
+        circuits in a group are generated in one vectorised draw per readout operation.
+
+        Args:
+            circuits: The circuits that are run
+
+        Returns:
+            List[Tuple[Dict, Dict, Dict]]: The output registers of each circuit, in order
+
+        """
+        plans = [self._compile(circuit) for circuit in circuits]
+        self._simulate_job(circuits)
+        return self._run_plans_batched(plans, self._write_result)
+
+    def _run_plans_batched(
+        self,
+        plans: List[MockedCircuitPlan],
+        finish: Optional[Callable[..., Any]] = None,
+    ) -> List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+        """Run compiled plans, drawing the readouts of structurally identical plans at once.
+
+        Args:
+            plans: The compiled plans that are run
+            finish: Applied to the output registers of each plan as soon as it has run,
+                    e.g. writing them to the result sink
+
+        Returns:
+            List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]: The output registers
+                                                                         in plan order
+
+        """
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        for index, plan in enumerate(plans):
+            groups.setdefault(plan.structure, []).append(index)
+
+        results: List[Any] = [None] * len(plans)
+        for indices in groups.values():
+            rng = _BatchedGenerator(self.rng, len(indices), self.memory_limit)
+            for run_index, index in enumerate(indices):
+                rng.start_run(run_index)
+                result = self._run_plan(plans[index], rng)
+                results[index] = result if finish is None else finish(result)
+        return results
+
+    def run_measurement_batch(self, measurements: List[Any]) -> List[Optional[Dict[str, float]]]:
+        """Run a batch of measurements with the Mocked backend.
+
+        The circuits of all measurements are run together as one batch,
+        see run_circuit_batch.
+
+        Args:
+            measurements: The measurements that are run
+
+        Returns:
+            List[Optional[Dict[str, float]]]: The evaluated results of each measurement
+
+        """
+        all_circuits: List[Circuit] = []
+        number_circuits: List[int] = []
+        for measurement in measurements:
+            run_circuits = _measurement_circuits(measurement)
+            all_circuits.extend(run_circuits)
+            number_circuits.append(len(run_circuits))
+        plans = [self._compile(run_circuit) for run_circuit in all_circuits]
+        self._simulate_job(all_circuits)
+
+        results = self._run_plans_batched(plans)
+        evaluated: List[Optional[Dict[str, float]]] = []
+        stop = 0
+        for measurement, number in zip(measurements, number_circuits):
+            start, stop = stop, stop + number
+            evaluated.append(self._evaluate(measurement, _merge_registers(results[start:stop])))
+        return evaluated
+
+    def _run_measurement_registers_serial(
+        self, measurement: Any, rng: np.random.Generator
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Run all circuits of a measurement one after another with the given generator.
+
+        Args:
+            measurement: The measurement that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        return _merge_registers(self._measurement_results_serial(measurement, rng))
+
+    def _measurement_results_serial(
+        self, measurement: Any, rng: np.random.Generator
+    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+        """Compile the circuits of a measurement and run them one after another.
+
+        Args:
+            measurement: The measurement that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Iterator[Tuple[Dict, Dict, Dict]]: The output registers of each circuit
+
+        """
+        run_circuits = _measurement_circuits(measurement)
+        plans = [self._compile(run_circuit) for run_circuit in run_circuits]
+        self._simulate_job(run_circuits)
+        return (self._run_plan(plan, rng) for plan in plans)
+
+    def _measurement_registers_job(
+        self, measurement: Any, rng: np.random.Generator
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Run all circuits of a measurement in an async job, writing to the result sink.
+
+        Args:
+            measurement: The measurement that is run
+            rng: The random generator used for the readouts
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The output registers
+
+        """
+        if self.result_cache is not None:
+            return self._write_result(self._measurement_registers(measurement))
+        return self._write_results(self._measurement_results_serial(measurement, rng))
+
+    def _measurement_job(
+        self, measurement: Any, rng: np.random.Generator
+    ) -> Optional[Dict[str, float]]:
+        """Run and evaluate a measurement in an async job, from the cache if set.
+
+        Args:
+            measurement: The measurement that is run
+            rng: The random generator used for the readouts, replaced by the generator of the
+                 measurement digest in deterministic mode
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        if self.result_cache is not None:
+            return self.run_measurement(measurement)
+        return self._evaluate_measurement(measurement, rng)
+
+    async def _submit(
+        self, function: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """Submit a job to the async worker pool and await its result.
+
+        Args:
+            function: The function run by the job
+            *args: The arguments of the function
+            timeout: The number of seconds after which the job is cancelled, no limit if None
+
+        Returns:
+            Any: The result of the job
+
+        """
+        if self._async_pool is None:
+            self._async_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="qoqo_mock"
+            )
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self._async_pool, function, *args)
+        return await asyncio.wait_for(job, timeout)
+
+    async def run_circuit_async(self, circuit: Circuit, timeout: Optional[float] = None) -> Tuple[
+        Dict[str, Union[List[List[bool]], np.ndarray]],
+        Dict[str, Union[List[List[float]], np.ndarray]],
+        Dict[str, Union[List[List[complex]], np.ndarray]],
+    ]:
+        """Run a circuit with the Mocked backend in the async worker pool.
+
+        Args:
+            circuit: The circuit that is run
+            timeout: The number of seconds after which the job is cancelled, no limit if None
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        return await self._submit(
+            self._write_job,
+            self._circuit_registers,
+            circuit,
+            self.spawn_generators(1)[0],
+            timeout=timeout,
+        )
+
+    async def run_measurement_registers_async(
+        self, measurement: Any, timeout: Optional[float] = None
+    ) -> Tuple[
+        Dict[str, Union[List[List[bool]], np.ndarray]],
+        Dict[str, Union[List[List[float]], np.ndarray]],
+        Dict[str, Union[List[List[complex]], np.ndarray]],
+    ]:
+        """Run all circuits of a measurement with the Mocked backend in the async worker pool.
+
+        The circuits of one measurement are run one after another in a single job,
+        the executor option only applies to the synchronous methods.
+
+        Args:
+            measurement: The measurement that is run
+            timeout: The number of seconds after which the job is cancelled, no limit if None
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        return await self._submit(
+            self._measurement_registers_job,
+            measurement,
+            self.spawn_generators(1)[0],
+            timeout=timeout,
+        )
+
+    async def run_measurement_async(
+        self, measurement: Any, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, float]]:
+        """Run and evaluate a measurement with the Mocked backend in the async worker pool.
+
+        Args:
+            measurement: The measurement that is run
+            timeout: The number of seconds after which the job is cancelled, no limit if None
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        return await self._submit(
+            self._measurement_job,
+            measurement,
+            self.spawn_generators(1)[0],
+            timeout=timeout,
         )
 
     def run_measurement(self, measurement: Any) -> Optional[Dict[str, float]]:
@@ -161,15 +1261,171 @@ class MockedBackend(object):
             Union[None, Dict[str, 'RegisterOutput']]
 
         """
-        # Initializing the classical registers for calculation and output
+        if self.result_cache is not None:
+            digest = _digest(measurement)
+            return self._cached(
+                "evaluated",
+                digest,
+                self._evaluate_measurement,
+                measurement,
+                self._job_generator(digest),
+            )
+        return self._evaluate_measurement(measurement)
+
+    def _evaluate_measurement(
+        self, measurement: Any, rng: Optional[np.random.Generator] = None
+    ) -> Optional[Dict[str, float]]:
+        """Run and evaluate a measurement, without caching its registers.
 
-        (
-            output_bit_register_dict,
-            output_float_register_dict,
-            output_complex_register_dict,
-        ) = self.run_measurement_registers(measurement)
-        return measurement.evaluate(
-            output_bit_register_dict,
-            output_float_register_dict,
-            output_complex_register_dict,
+        Args:
+            measurement: The measurement that is run
+            rng: The random generator the circuits are run with one after another. If None,
+                 they are run with the generator of the backend, concurrently if an executor
+                 is set
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        if self.measurement_statistics:
+            run_circuits = _measurement_circuits(measurement)
+            result = self._evaluate_statistics(
+                measurement,
+                run_circuits,
+                [self._compile(run_circuit) for run_circuit in run_circuits],
+                self.rng if rng is None else rng,
+            )
+            if result is not None:
+                return result
+        if rng is None:
+            return self._evaluate(
+                measurement, _merge_registers(self._measurement_results(measurement))
+            )
+        return self._evaluate(
+            measurement, self._run_measurement_registers_serial(measurement, rng)
         )
+
+    def _evaluate_statistics(
+        self,
+        measurement: Any,
+        circuits: List[Circuit],
+        plans: List[MockedCircuitPlan],
+        rng: np.random.Generator,
+    ) -> Optional[Dict[str, float]]:
+        """Evaluate a measurement from sampled statistics, recording the evaluation if profiled.
+
+        Args:
+            measurement: The measurement that is evaluated
+            circuits: The circuits of the measurement
+            plans: The compiled plans of the circuits
+            rng: The random generator used for the draws
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement, None if it can only be
+                                        evaluated from its registers
+
+        """
+        if self.profiler is None:
+            result = _evaluate_pauli_z_statistics(measurement, plans, self.number_qubits, rng)
+        else:
+            result = self.profiler.call(
+                "evaluation",
+                _evaluate_pauli_z_statistics,
+                measurement,
+                plans,
+                self.number_qubits,
+                rng,
+            )
+        if result is not None:
+            self._simulate_job(circuits)
+        return result
+
+    def run_archive(
+        self,
+        source: _ArchiveSource,
+        evaluate: bool = True,
+    ) -> Iterator[Any]:
+        """Run the circuits and measurements of an archive written by write_circuit_archive.
+
+        Archive files are memory mapped and the records are deserialised and run one at a
+        time, so that the results are streamed back without holding the whole archive or all
+        deserialised objects in memory.
+
+        Args:
+            source: The path of the archive or a buffer holding it
+            evaluate: Evaluate measurements with run_measurement,
+                      otherwise return their registers from run_measurement_registers
+
+        Yields:
+            Any: The output registers of each circuit and the result of each measurement,
+                 in archive order
+
+        """
+        for serialisable in read_circuit_archive(source):
+            if isinstance(serialisable, Circuit):
+                yield self.run_circuit(serialisable)
+            elif evaluate:
+                yield self.run_measurement(serialisable)
+            else:
+                yield self.run_measurement_registers(serialisable)
+
+
+class MockedMeasurementSession(object):
+    """Measurement prepared for repeated runs on a MockedBackend.
+
+    The circuits of the measurement, each prefixed with the constant circuit, are built and
+    compiled once when the session is created. Every run only draws fresh random readouts
+    and evaluates the measurement, which makes repeated runs in optimisation loops cheap.
+    """
+
+    def __init__(self, backend: MockedBackend, measurement: Any) -> None:
+        """Initialize session.
+
+        Args:
+            backend: The backend the measurement is run on
+            measurement: The measurement that is prepared
+
+        """
+        self.backend = backend
+        self.measurement = measurement
+        self._circuits = _measurement_circuits(measurement)
+        self._plans = [backend._compile(circuit) for circuit in self._circuits]
+
+    def run_registers(self) -> Tuple[
+        Dict[str, Union[List[List[bool]], np.ndarray]],
+        Dict[str, Union[List[List[float]], np.ndarray]],
+        Dict[str, Union[List[List[complex]], np.ndarray]],
+    ]:
+        """Run all circuits of the prepared measurement.
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        self.backend._simulate_job(self._circuits)
+        return self.backend._write_results(self.backend._run_plans(self._circuits, self._plans))
+
+    def _run_registers(self) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Run all circuits of the prepared measurement without writing to the result sink.
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        self.backend._simulate_job(self._circuits)
+        return _merge_registers(self.backend._run_plans(self._circuits, self._plans))
+
+    def run(self) -> Optional[Dict[str, float]]:
+        """Run and evaluate the prepared measurement.
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        if self.backend.measurement_statistics:
+            result = self.backend._evaluate_statistics(
+                self.measurement, self._circuits, self._plans, self.backend.rng
+            )
+            if result is not None:
+                return result
+        return self.backend._evaluate(self.measurement, self._run_registers())
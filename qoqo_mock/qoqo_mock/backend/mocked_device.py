@@ -0,0 +1,175 @@
+"""Validation of circuits against the connectivity and gate set of a qoqo device."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import Circuit  # type: ignore
+from qoqo_mock import mocked_compile_circuit, MockedCircuitPlan
+from typing import Dict, Any, Optional
+import threading
+import weakref
+import numpy as np
+
+
+class MockedDeviceIndex(object):
+    """Connectivity and gate set index of a qoqo device.
+
+    The index is built once from the device: the qubits each single-qubit gate is available
+    on and the adjacency matrix of the qubit pairs each two-qubit gate is available on.
+    Circuits are validated by grouping their gates by name and looking up the qubits of each
+    group in one vectorised pass. Three-qubit and multi-qubit gates, which devices only
+    describe per combination of qubits, are looked up in the device.
+
+    The verdict for a circuit is cached with its compiled plan, so that repeated runs of a
+    circuit are only validated once.
+    """
+
+    def __init__(self, device: Any) -> None:
+        """Initialize device index.
+
+        Args:
+            device: The qoqo device, e.g. a GenericDevice, AllToAllDevice or SquareLatticeDevice
+
+        """
+        self.device = device
+        self.number_qubits: int = device.number_qubits()
+        self.single_qubit_gates: Dict[str, np.ndarray] = {
+            name: np.array(
+                [
+                    device.single_qubit_gate_time(name, qubit) is not None
+                    for qubit in range(self.number_qubits)
+                ],
+                dtype=np.bool_,
+            )
+            for name in device.single_qubit_gate_names()
+        }
+        self.two_qubit_gates: Dict[str, np.ndarray] = {}
+        for name in device.two_qubit_gate_names():
+            adjacency = np.zeros((self.number_qubits, self.number_qubits), dtype=np.bool_)
+            for first, second in device.two_qubit_edges():
+                for control, target in ((first, second), (second, first)):
+                    adjacency[control, target] = (
+                        device.two_qubit_gate_time(name, control, target) is not None
+                    )
+            self.two_qubit_gates[name] = adjacency
+        self._verdicts: "weakref.WeakKeyDictionary[MockedCircuitPlan, Optional[str]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def validate(
+        self, circuit: Circuit, plan: Optional[MockedCircuitPlan] = None
+    ) -> Optional[str]:
+        """Validate a circuit against the device.
+
+        Args:
+            circuit: The circuit that is validated
+            plan: The compiled plan of the circuit, compiled with mocked_compile_circuit if None
+
+        Returns:
+            Optional[str]: The reason the device rejects the circuit, None if it is supported
+
+        """
+        if plan is None:
+            plan = mocked_compile_circuit(circuit)
+        with self._lock:
+            if plan in self._verdicts:
+                return self._verdicts[plan]
+        verdict = self._find_violation(circuit)
+        with self._lock:
+            self._verdicts[plan] = verdict
+        return verdict
+
+    def check(self, circuit: Circuit, plan: Optional[MockedCircuitPlan] = None) -> None:
+        """Refuse circuits the device does not support.
+
+        Args:
+            circuit: The circuit that is checked
+            plan: The compiled plan of the circuit, compiled with mocked_compile_circuit if None
+
+        Raises:
+            RuntimeError: The device does not support the circuit
+
+        """
+        verdict = self.validate(circuit, plan)
+        if verdict is not None:
+            raise RuntimeError(f"Circuit not supported by the device: {verdict}")
+
+    def _find_violation(self, circuit: Circuit) -> Optional[str]:
+        """Find the first operation of a circuit the device does not support.
+
+        Args:
+            circuit: The circuit that is validated
+
+        Returns:
+            Optional[str]: The reason the device rejects the circuit, None if it is supported
+
+        """
+        if circuit.number_of_qubits() > self.number_qubits:
+            return (
+                f"the circuit uses {circuit.number_of_qubits()} qubits, "
+                f"the device has {self.number_qubits}"
+            )
+        for name in sorted(circuit.get_operation_types()):
+            operations = circuit.filter_by_tag(name)
+            tags = operations[0].tags()
+            if name == "PragmaConditional":
+                for operation in operations:
+                    verdict = self._find_violation(operation.circuit())
+                    if verdict is not None:
+                        return verdict
+            elif "SingleQubitGateOperation" in tags:
+                available = self.single_qubit_gates.get(name)
+                if available is None:
+                    return f"gate {name} is not available"
+                qubits = np.fromiter(
+                    (operation.qubit() for operation in operations),
+                    dtype=np.int64,
+                    count=len(operations),
+                )
+                supported = available[qubits]
+                if not supported.all():
+                    return f"gate {name} is not available on qubit {qubits[~supported][0]}"
+            elif "TwoQubitGateOperation" in tags:
+                adjacency = self.two_qubit_gates.get(name)
+                if adjacency is None:
+                    return f"gate {name} is not available"
+                controls = np.fromiter(
+                    (operation.control() for operation in operations),
+                    dtype=np.int64,
+                    count=len(operations),
+                )
+                targets = np.fromiter(
+                    (operation.target() for operation in operations),
+                    dtype=np.int64,
+                    count=len(operations),
+                )
+                supported = adjacency[controls, targets]
+                if not supported.all():
+                    index = int(np.argmin(supported))
+                    return (
+                        f"gate {name} is not available on qubits "
+                        f"({controls[index]}, {targets[index]})"
+                    )
+            elif "ThreeQubitGateOperation" in tags:
+                for operation in operations:
+                    gate_qubits = (
+                        operation.control_0(),
+                        operation.control_1(),
+                        operation.target(),
+                    )
+                    if self.device.three_qubit_gate_time(name, *gate_qubits) is None:
+                        return f"gate {name} is not available on qubits {gate_qubits}"
+            elif "MultiQubitGateOperation" in tags:
+                for operation in operations:
+                    if self.device.multi_qubit_gate_time(name, operation.qubits()) is None:
+                        return f"gate {name} is not available on qubits {operation.qubits()}"
+        return None
@@ -0,0 +1,330 @@
+"""Client backend for the mocked job server."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import Circuit  # type: ignore
+from qoqo_mock.backend.mocked_serialisation import _SERIALISATIONS
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit
+import http.client
+import json
+import queue
+import time
+import uuid
+
+_CONTENT_TYPES = {"json": "application/json", "bincode": "application/octet-stream"}
+
+
+def _encode_registers(
+    registers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Encode the output registers of a run as JSON compatible dictionary.
+
+    Complex numbers are encoded as [real, imaginary] pairs.
+
+    Args:
+        registers: The output bit, float and complex registers
+
+    Returns:
+        Dict[str, Any]: The encoded registers
+
+    """
+    bit_registers, float_registers, complex_registers = (
+        {name: _as_list(register) for name, register in register_dict.items()}
+        for register_dict in registers
+    )
+    return {
+        "bit_registers": bit_registers,
+        "float_registers": float_registers,
+        "complex_registers": {
+            name: [[[value.real, value.imag] for value in row] for row in register]
+            for name, register in complex_registers.items()
+        },
+    }
+
+
+def _as_list(register: Any) -> Any:
+    """Convert a register in any output format to nested lists.
+
+    Args:
+        register: The register
+
+    Returns:
+        Any: The register as nested lists
+
+    """
+    return register.tolist() if hasattr(register, "tolist") else register
+
+
+def _decode_registers(
+    encoded: Dict[str, Any],
+) -> Tuple[
+    Dict[str, List[List[bool]]], Dict[str, List[List[float]]], Dict[str, List[List[complex]]]
+]:
+    """Decode the output registers of a run encoded by _encode_registers.
+
+    Args:
+        encoded: The encoded registers
+
+    Returns:
+        Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+    """
+    return (
+        encoded["bit_registers"],
+        encoded["float_registers"],
+        {
+            name: [[complex(real, imaginary) for real, imaginary in row] for row in register]
+            for name, register in encoded["complex_registers"].items()
+        },
+    )
+
+
+class MockedRemoteBackend(object):
+    """Client backend running circuits and measurements on a mocked job server.
+
+    Every run is submitted as a job, polled until it is finished and its result is downloaded,
+    like on a remote hardware backend. Requests are sent over a pool of persistent HTTP
+    connections, so that the backend can be shared by concurrent threads.
+
+    Requests failing on a connection the server has closed are retried once on a fresh
+    connection. Submissions carry an idempotency key, so that a retried submission cannot
+    queue the job twice.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        serialisation: str = "bincode",
+        pool_size: int = 4,
+        poll_interval: float = 0.001,
+        timeout: Optional[float] = None,
+        request_timeout: Optional[float] = 60.0,
+    ) -> None:
+        """Initialize remote backend.
+
+        Args:
+            url: The URL of the job server, for example http://127.0.0.1:8000
+            serialisation: The serialisation of the submitted circuits and measurements,
+                           "json" or "bincode"
+            pool_size: The maximal number of idle connections kept open
+            poll_interval: The number of seconds between polls of an unfinished job
+            timeout: The number of seconds after which a job is abandoned, no limit if None
+            request_timeout: The socket timeout of each HTTP request in seconds,
+                             requests block without limit if None
+
+        Raises:
+            ValueError: Unknown serialisation or URL scheme
+
+        """
+        if serialisation not in _SERIALISATIONS:
+            raise ValueError(
+                f"Unknown serialisation {serialisation}, expected one of {_SERIALISATIONS}"
+            )
+        parts = urlsplit(url)
+        if parts.scheme != "http" or parts.hostname is None:
+            raise ValueError(f"Unsupported job server URL {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.serialisation = serialisation
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self._connections: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            maxsize=pool_size
+        )
+
+    def close(self) -> None:
+        """Close all idle connections of the pool."""
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Open a new connection to the server.
+
+        Returns:
+            http.client.HTTPConnection: The connection
+
+        """
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.request_timeout)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Any]:
+        """Send a request over a pooled connection.
+
+        GET requests and requests with an Idempotency-Key header are retried once on a fresh
+        connection if the pooled connection fails, other requests are not retried.
+
+        Args:
+            method: The HTTP method
+            path: The path of the request
+            body: The body of the request
+            headers: The headers of the request
+
+        Returns:
+            Tuple[int, Any]: The status code and the decoded JSON response
+
+        Raises:
+            http.client.HTTPException: The connection of a request that is not retried failed
+            ConnectionError: The connection of a request that is not retried was closed
+
+        """
+        try:
+            connection = self._connections.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        headers = {} if headers is None else headers
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            if method != "GET" and "Idempotency-Key" not in headers:
+                raise
+            # The server closed the idle connection, retry once on a fresh one
+            connection = self._connect()
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+        content = json.loads(response.read())
+        try:
+            self._connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return (response.status, content)
+
+    def _serialise(self, serialisable: Any) -> bytes:
+        """Serialise a circuit or measurement.
+
+        Args:
+            serialisable: The circuit or measurement
+
+        Returns:
+            bytes: The serialised circuit or measurement
+
+        """
+        if self.serialisation == "json":
+            return serialisable.to_json().encode()
+        return bytes(serialisable.to_bincode())
+
+    def submit(self, kind: str, serialisable: Any) -> str:
+        """Submit a job to the server.
+
+        Args:
+            kind: The kind of job, "circuit", "measurement_registers" or "measurement"
+            serialisable: The circuit or measurement run by the job
+
+        Returns:
+            str: The id of the job
+
+        Raises:
+            RuntimeError: The server refused the job
+
+        """
+        path = f"/jobs?kind={kind}"
+        if not isinstance(serialisable, Circuit):
+            path += f"&type={type(serialisable).__name__}"
+        status, content = self._request(
+            "POST",
+            path,
+            self._serialise(serialisable),
+            {
+                "Content-Type": _CONTENT_TYPES[self.serialisation],
+                "Idempotency-Key": uuid.uuid4().hex,
+            },
+        )
+        if status != 202:
+            raise RuntimeError(f"Job submission failed: {content['error']}")
+        return content["job_id"]
+
+    def wait(self, job_id: str) -> Any:
+        """Poll a job until it is finished and download its result.
+
+        Args:
+            job_id: The id of the job
+
+        Returns:
+            Any: The result of the job
+
+        Raises:
+            RuntimeError: The job failed
+            TimeoutError: The job did not finish within the timeout
+
+        """
+        start = time.monotonic()
+        while True:
+            status, content = self._request("GET", f"/jobs/{job_id}")
+            if status != 200:
+                raise RuntimeError(f"Polling job {job_id} failed: {content['error']}")
+            if content["status"] == "failed":
+                raise RuntimeError(f"Job {job_id} failed: {content['error']}")
+            if content["status"] == "done":
+                break
+            if self.timeout is not None and time.monotonic() - start > self.timeout:
+                raise TimeoutError(f"Job {job_id} did not finish within {self.timeout} s")
+            time.sleep(self.poll_interval)
+        status, content = self._request("GET", f"/jobs/{job_id}/result")
+        if status != 200:
+            raise RuntimeError(f"Downloading job {job_id} failed: {content['error']}")
+        return content
+
+    def run_circuit(self, circuit: Circuit) -> Tuple[
+        Dict[str, List[List[bool]]],
+        Dict[str, List[List[float]]],
+        Dict[str, List[List[complex]]],
+    ]:
+        """Run a circuit on the job server.
+
+        Args:
+            circuit: The circuit that is run
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        return _decode_registers(self.wait(self.submit("circuit", circuit)))
+
+    def run_measurement_registers(self, measurement: Any) -> Tuple[
+        Dict[str, List[List[bool]]],
+        Dict[str, List[List[float]]],
+        Dict[str, List[List[complex]]],
+    ]:
+        """Run all circuits of a measurement on the job server.
+
+        Args:
+            measurement: The measurement that is run
+
+        Returns:
+            Tuple[Dict, Dict, Dict]: The output bit, float and complex registers
+
+        """
+        return _decode_registers(self.wait(self.submit("measurement_registers", measurement)))
+
+    def run_measurement(self, measurement: Any) -> Optional[Dict[str, float]]:
+        """Run and evaluate a measurement on the job server.
+
+        Args:
+            measurement: The measurement that is run
+
+        Returns:
+            Optional[Dict[str, float]]: The evaluated measurement
+
+        """
+        return self.wait(self.submit("measurement", measurement))
@@ -0,0 +1,197 @@
+"""Result cache for the mocked backend."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo_mock import MockedBitRegister
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import copy
+import sys
+import threading
+import numpy as np
+
+
+def _freeze(value: Any) -> Any:
+    """Make the numpy arrays of a result read-only and copy everything else.
+
+    Args:
+        value: The result, nested dicts, tuples, lists and arrays
+
+    Returns:
+        Any: The frozen result
+
+    """
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value
+    if isinstance(value, MockedBitRegister):
+        value.packed.setflags(write=False)
+        return value
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    return copy.deepcopy(value)
+
+
+def _thaw(value: Any) -> Any:
+    """Return a result that can be handed out without exposing the cached entry.
+
+    Read-only numpy arrays are shared, containers and python objects are copied.
+
+    Args:
+        value: The frozen result
+
+    Returns:
+        Any: The result handed out
+
+    """
+    if isinstance(value, (np.ndarray, MockedBitRegister)):
+        return value
+    if isinstance(value, tuple):
+        return tuple(_thaw(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _thaw(item) for key, item in value.items()}
+    return copy.deepcopy(value)
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Estimate the memory used by a result.
+
+    Args:
+        value: The result
+
+    Returns:
+        int: The estimated number of bytes
+
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, MockedBitRegister):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_bytes(item) for item in value.values())
+    if isinstance(value, bool) or value is None:
+        # Shared singletons
+        return 0
+    return sys.getsizeof(value)
+
+
+class MockedResultCache(object):
+    """LRU cache of run results, bounded by the number of entries and by their size in bytes.
+
+    Cached numpy arrays are made read-only and shared between the results handed out, all
+    other parts of a result are copied, so that cached entries cannot be corrupted by
+    modifying a returned result.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: Optional[int] = None) -> None:
+        """Initialize result cache.
+
+        Args:
+            max_entries: The maximal number of cached results
+            max_bytes: The maximal estimated size of all cached results, no limit if None.
+                       Results larger than this limit are not cached
+
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state for pickling, without the lock.
+
+        Returns:
+            Dict[str, Any]: The pickled state
+
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the pickled state.
+
+        Args:
+            state: The pickled state
+
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached results.
+
+        Returns:
+            int: The number of cached results
+
+        """
+        return len(self._entries)
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        """Return a cached result, counting the hit or miss.
+
+        Args:
+            key: The key of the result
+
+        Returns:
+            Optional[Any]: The result, None if it is not cached
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return _thaw(entry[0])
+
+    def put(self, key: Tuple[Any, ...], value: Any) -> None:
+        """Cache a result, evicting the least recently used results beyond the bounds.
+
+        The numpy arrays of the result are made read-only, as they are shared with the cache.
+
+        Args:
+            key: The key of the result
+            value: The result
+
+        """
+        size = _estimate_bytes(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        frozen = _freeze(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (frozen, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+
+    def clear(self) -> None:
+        """Remove all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,259 @@
+"""On-disk result sink for the mocked backend."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo_mock import MockedBitRegister, MockedShotStream
+from typing import cast, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+from urllib.parse import quote
+import itertools
+import os
+import numpy as np
+
+# The dtype of the stored bit, float and complex registers
+_REGISTER_DTYPES = [np.dtype(np.bool_), np.dtype(np.float64), np.dtype(np.complex128)]
+
+_REGISTER_KINDS = ["bit", "float", "complex"]
+
+# The number of rows of a register converted and written at once
+_WRITE_BLOCK_ROWS = 1 << 16
+
+
+def _escape_name(name: str) -> str:
+    """Escape a register name for use in a file name.
+
+    The name is percent-encoded, dots included, so that it can neither contain path
+    separators nor refer to a parent directory. Distinct names stay distinct.
+
+    Args:
+        name: The name of the register
+
+    Returns:
+        str: The escaped name
+
+    """
+    return quote(name, safe="").replace(".", "%2E")
+
+
+def _row_blocks(number_rows: int) -> Iterator[slice]:
+    """Yield the row slices a register is written in.
+
+    Args:
+        number_rows: The number of rows of the register
+
+    Yields:
+        slice: The rows of the next block
+
+    """
+    for start in range(0, number_rows, _WRITE_BLOCK_ROWS):
+        stop = min(start + _WRITE_BLOCK_ROWS, number_rows)
+        yield slice(start, stop)
+
+
+class MockedRegisterFile(object):
+    """Handle of an output register stored as .npy file by a MockedResultSink.
+
+    The handle only holds the location and layout of the register. The data stays on disk
+    until it is opened, the file can also be mapped directly with
+    np.memmap(path, dtype, mode="r", offset=offset, shape=shape).
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, ...], dtype: Any, offset: int) -> None:
+        """Initialize register file.
+
+        Args:
+            path: The path of the .npy file
+            shape: The shape of the register
+            dtype: The dtype of the register
+            offset: The number of bytes of the .npy header before the data
+
+        """
+        self.path = path
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.offset = offset
+
+    def __len__(self) -> int:
+        """Return the number of rows of the register.
+
+        Returns:
+            int: The number of rows
+
+        """
+        return self.shape[0]
+
+    def open(self, mode: str = "r") -> np.ndarray:
+        """Memory map the stored register.
+
+        Args:
+            mode: The mode of the memory map, "r" for read-only or "r+" for read-write
+
+        Returns:
+            np.ndarray: The mapped register, an empty array for registers without entries
+
+        """
+        if 0 in self.shape:
+            # Empty files cannot be memory mapped
+            return np.zeros(self.shape, dtype=self.dtype)
+        return np.memmap(
+            self.path, self.dtype, mode=cast("Any", mode), offset=self.offset, shape=self.shape
+        )
+
+    def tolist(self) -> List[Any]:
+        """Read the stored register as nested lists.
+
+        Returns:
+            List[Any]: The register
+
+        """
+        return self.open().tolist()
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """Read the stored register into memory for numpy.
+
+        Args:
+            dtype: The requested dtype, the stored dtype if None
+            copy: Ignored, a new array is always created
+
+        Returns:
+            np.ndarray: The register
+
+        """
+        return np.array(self.open(), dtype=dtype)
+
+
+class MockedResultSink(object):
+    """Result sink writing every output register of a run to its own .npy file.
+
+    The files of the n-th run are named run_<n>_<kind>_<name>.npy in the sink directory, where
+    kind is "bit", "float" or "complex" and name is the percent-encoded register name.
+
+    Registers are written as they are produced: runs of several circuits write the registers
+    of each circuit before the next circuit is run, streamed registers (see the
+    shot_chunk_size option of MockedBackend) are drawn and written one chunk of shots at a
+    time and other registers are converted and written in blocks of rows. The memory needed
+    for storing a run is therefore bounded by the registers of a single circuit.
+    """
+
+    def __init__(self, directory: Union[str, "os.PathLike[str]"]) -> None:
+        """Initialize result sink.
+
+        Args:
+            directory: The directory the register files are written to, created if missing
+
+        """
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._runs = itertools.count()
+
+    def start_run(self) -> int:
+        """Start a new run, whose registers can be written in several parts.
+
+        Returns:
+            int: The index of the run
+
+        """
+        return next(self._runs)
+
+    def write_registers(
+        self,
+        registers: Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]],
+        run_index: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Write output registers of a run to disk.
+
+        Args:
+            registers: The output bit, float and complex registers
+            run_index: The index of the run the registers belong to, see start_run.
+                       A new run is started if None. Registers written twice in the same
+                       run are overwritten
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]: The registers, with every
+                stored register replaced by its MockedRegisterFile. Registers that are not
+                arrays, such as sparse and lazy density matrices, are kept in memory
+
+        """
+        if run_index is None:
+            run_index = self.start_run()
+        bit_registers, float_registers, complex_registers = (
+            {
+                name: self._write_register(
+                    f"run_{run_index}_{kind}_{_escape_name(name)}.npy", register, dtype
+                )
+                for name, register in register_dict.items()
+            }
+            for register_dict, kind, dtype in zip(registers, _REGISTER_KINDS, _REGISTER_DTYPES)
+        )
+        return (bit_registers, float_registers, complex_registers)
+
+    def _write_register(self, filename: str, register: Any, dtype: np.dtype) -> Any:
+        """Write a single register to disk.
+
+        Args:
+            filename: The name of the register file
+            register: The register
+            dtype: The dtype the register is stored with
+
+        Returns:
+            Any: The MockedRegisterFile of the stored register, the register itself if it
+                 cannot be stored
+
+        """
+        blocks: Iterable[Any]
+        if isinstance(register, MockedShotStream):
+            shape = register.shape
+            blocks = register.chunks()
+        elif isinstance(register, MockedBitRegister):
+            shape = register.shape
+            blocks = (register.row(rows) for rows in _row_blocks(len(register)))
+        elif isinstance(register, np.ndarray):
+            shape = register.shape
+            blocks = (register[rows] for rows in _row_blocks(len(register)))
+        elif isinstance(register, list):
+            shape = (len(register), *np.shape(register[0])) if register else (0,)
+            blocks = (register[rows] for rows in _row_blocks(len(register)))
+        else:
+            return register
+        return self._write_blocks(os.path.join(self.directory, filename), shape, dtype, blocks)
+
+    def _write_blocks(
+        self, path: str, shape: Tuple[int, ...], dtype: np.dtype, blocks: Iterable[Any]
+    ) -> MockedRegisterFile:
+        """Write a register to a .npy file one block of rows at a time.
+
+        Args:
+            path: The path of the register file
+            shape: The shape of the register
+            dtype: The dtype the register is stored with
+            blocks: The consecutive blocks of rows of the register
+
+        Returns:
+            MockedRegisterFile: The handle of the stored register
+
+        Raises:
+            ValueError: The blocks do not match the shape of the register
+
+        """
+        header = {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": tuple(shape),
+        }
+        with open(path, "wb") as file:
+            np.lib.format.write_array_header_1_0(file, header)
+            offset = file.tell()
+            for block in blocks:
+                np.ascontiguousarray(block, dtype=dtype).tofile(file)
+            size = file.tell() - offset
+        if size != int(np.prod(shape)) * dtype.itemsize:
+            raise ValueError(f"Register written to {path} does not match its shape {shape}")
+        return MockedRegisterFile(path, tuple(shape), dtype, offset)
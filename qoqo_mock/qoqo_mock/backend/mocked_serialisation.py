@@ -0,0 +1,19 @@
+"""Serialisations and measurement types shared by circuit archives and the job server."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+
+# Measurement types that can be archived and submitted to the job server
+_MEASUREMENT_TYPES = ["Cheated", "CheatedPauliZProduct", "ClassicalRegister", "PauliZProduct"]
+
+# Serialisations of circuits and measurements, archive records store the index in this list
+_SERIALISATIONS = ["json", "bincode"]
@@ -0,0 +1,164 @@
+"""Evaluation of mocked measurements from sampled statistics instead of per-shot registers."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo.measurements import PauliZProduct  # type: ignore
+from qoqo_calculator_pyo3 import Calculator  # type: ignore
+from qoqo_mock import MockedCircuitPlan
+from qoqo_mock.interface.mocked_interface import _measured_bits
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
+import json
+import numpy as np
+
+
+def _repeated_measurements(
+    plans: List[MockedCircuitPlan], number_qubits: int
+) -> Optional[Dict[str, Tuple[int, int, Optional[np.ndarray]]]]:
+    """Return the shape of the repeated measurement readout written to each bit register.
+
+    Args:
+        plans: The compiled circuits of the measurement
+        number_qubits: The number of qubits of the backend
+
+    Returns:
+        Optional[Dict[str, Tuple[int, int, Optional[np.ndarray]]]]: The number of shots, width
+            and measured bits of each register, None if the circuits contain other readouts
+
+    """
+    registers: Dict[str, Tuple[int, int, Optional[np.ndarray]]] = {}
+    for plan in plans:
+        run_qubits = number_qubits
+        if plan.number_qubits > 0:
+            run_qubits = min(number_qubits, plan.number_qubits)
+        for _, operation in plan.readouts:
+            if operation.hqslang() != "PragmaRepeatedMeasurement":
+                return None
+            registers[operation.readout()] = (
+                operation.number_measurements(),
+                *_measured_bits(operation, run_qubits, plan.bit_register_lengths),
+            )
+    return registers
+
+
+def _parity_expectation_values(
+    readout: Tuple[int, int, Optional[np.ndarray]],
+    qubit_masks: Dict[str, List[int]],
+    rng: np.random.Generator,
+) -> Optional[Dict[int, float]]:
+    """Sample the expectation values of the Pauli Z products of one register.
+
+    The mocked bits are independent and uniformly random, so the parity of a product over
+    measured bits is odd in a binomially distributed number of shots. Products over the same
+    measured bits share one draw, products over unmeasured bits only are always even.
+
+    Args:
+        readout: The number of shots, width and measured bits of the register
+        qubit_masks: The qubits of each Pauli product in the register, by product index
+        rng: The random generator used for the draws
+
+    Returns:
+        Optional[Dict[int, float]]: The expectation value of each Pauli product, None if a
+                                    product reads bits beyond the register
+
+    """
+    number_shots, width, mask = readout
+    measured = set(range(width)) if mask is None else set(np.flatnonzero(mask).tolist())
+    draws: Dict[FrozenSet[int], float] = {}
+    values: Dict[int, float] = {}
+    for index, qubits in qubit_masks.items():
+        if any(qubit >= width for qubit in qubits):
+            return None
+        random_bits = frozenset(
+            qubit for qubit in qubits if qubit in measured and qubits.count(qubit) % 2 == 1
+        )
+        if random_bits not in draws:
+            draws[random_bits] = (
+                1.0 - 2.0 * rng.binomial(number_shots, 0.5) / number_shots if random_bits else 1.0
+            )
+        values[int(index)] = draws[random_bits]
+    return values
+
+
+def _evaluate_pauli_z_statistics(
+    measurement: Any,
+    plans: List[MockedCircuitPlan],
+    number_qubits: int,
+    rng: np.random.Generator,
+) -> Optional[Dict[str, float]]:
+    """Evaluate a PauliZProduct measurement from sampled parity counts.
+
+    The expectation value of each Pauli product is drawn directly, at a cost independent of
+    the number of shots, and combined into the measured expectation values like
+    PauliZProduct.evaluate does. Each expectation value has the same distribution as when
+    evaluating mocked registers, correlations between products over different but
+    overlapping bits are not reproduced.
+
+    Args:
+        measurement: The measurement that is evaluated
+        plans: The compiled circuits of the measurement
+        number_qubits: The number of qubits of the backend
+        rng: The random generator used for the draws
+
+    Returns:
+        Optional[Dict[str, float]]: The evaluated measurement, None if the measurement is not a
+                                    PauliZProduct measurement of repeated measurements
+
+    """
+    if not isinstance(measurement, PauliZProduct):
+        return None
+    readouts = _repeated_measurements(plans, number_qubits)
+    if readouts is None:
+        return None
+    measurement_input = json.loads(measurement.input().to_json())
+    register_names: List[Tuple[str, str]] = [
+        (name, name) for name in measurement_input["pauli_product_qubit_masks"]
+    ]
+    if measurement_input["use_flipped_measurement"]:
+        register_names += [
+            (name, f"{name}_flipped") for name in measurement_input["pauli_product_qubit_masks"]
+        ]
+
+    register_values: Dict[str, Dict[int, float]] = {}
+    for name, register in register_names:
+        readout = readouts.get(register)
+        if readout is None or readout[0] == 0:
+            return None
+        values = _parity_expectation_values(
+            readout, measurement_input["pauli_product_qubit_masks"][name], rng
+        )
+        if values is None:
+            return None
+        register_values[register] = values
+
+    pauli_products: Dict[int, float] = {}
+    for name, qubit_masks in measurement_input["pauli_product_qubit_masks"].items():
+        for index, qubits in qubit_masks.items():
+            value = register_values[name][int(index)]
+            if measurement_input["use_flipped_measurement"]:
+                # Flipping all measured qubits changes the sign of products over odd many qubits
+                flipped = register_values[f"{name}_flipped"][int(index)]
+                value = (value + (-1) ** len(qubits) * flipped) / 2
+            pauli_products[int(index)] = value
+
+    calculator = Calculator()
+    for index, value in pauli_products.items():
+        calculator.set(f"pauli_product_{index}", value)
+    results: Dict[str, float] = {}
+    for name, exp_val in measurement_input["measured_exp_vals"].items():
+        if "Linear" in exp_val:
+            results[name] = sum(
+                coefficient * pauli_products[int(index)]
+                for index, coefficient in exp_val["Linear"].items()
+            )
+        else:
+            results[name] = calculator.parse_get(exp_val["Symbolic"])
+    return results
@@ -0,0 +1,187 @@
+"""Hardware timing model for the mocked backend."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import Circuit  # type: ignore
+from typing import Dict, List, Any, Optional
+import threading
+import time
+
+
+class MockedTimingModel(object):
+    """Timing model simulating the latency of a quantum hardware backend.
+
+    The duration of a job is the queue delay plus the duration of each of its circuits.
+    A circuit is executed once per shot, where the number of shots is the largest
+    PragmaSetNumberOfMeasurements or PragmaRepeatedMeasurement count in the circuit (one
+    shot if there is none). Each shot takes the summed durations of the gates, PragmaSleep
+    and PragmaActiveReset operations of the circuit plus the per-shot readout time.
+
+    In real-time mode the backend sleeps for the duration of each job. In virtual mode the
+    duration is only added to the virtual clock, so that tests stay fast.
+    """
+
+    def __init__(
+        self,
+        queue_delay: float = 0.0,
+        shot_time: float = 0.0,
+        single_qubit_gate_time: float = 0.0,
+        two_qubit_gate_time: float = 0.0,
+        multi_qubit_gate_time: float = 0.0,
+        active_reset_time: float = 0.0,
+        gate_times: Optional[Dict[str, float]] = None,
+        virtual: bool = False,
+    ) -> None:
+        """Initialize timing model.
+
+        Args:
+            queue_delay: The delay in seconds before each job starts
+            shot_time: The readout time in seconds of each shot
+            single_qubit_gate_time: The duration in seconds of single qubit gates
+            two_qubit_gate_time: The duration in seconds of two qubit gates
+            multi_qubit_gate_time: The duration in seconds of multi qubit gates
+            active_reset_time: The duration in seconds of PragmaActiveReset
+            gate_times: Durations in seconds by hqslang name, overriding the defaults above
+            virtual: Only advance the virtual clock instead of sleeping
+
+        """
+        self.queue_delay = queue_delay
+        self.shot_time = shot_time
+        self.single_qubit_gate_time = single_qubit_gate_time
+        self.two_qubit_gate_time = two_qubit_gate_time
+        self.multi_qubit_gate_time = multi_qubit_gate_time
+        self.active_reset_time = active_reset_time
+        self.gate_times = {} if gate_times is None else dict(gate_times)
+        self.virtual = virtual
+        self.number_jobs = 0
+        self.last_job_duration = 0.0
+        self.total_duration = 0.0
+        self._operation_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state for pickling, without the lock.
+
+        Returns:
+            Dict[str, Any]: The pickled state
+
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the pickled state.
+
+        Args:
+            state: The pickled state
+
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _operation_time(self, circuit: Circuit, hqslang: str) -> float:
+        """Return the duration of one operation of the given type.
+
+        Args:
+            circuit: A circuit containing the operation type
+            hqslang: The hqslang name of the operation type
+
+        Returns:
+            float: The duration in seconds
+
+        """
+        if hqslang in self.gate_times:
+            return self.gate_times[hqslang]
+        try:
+            return self._operation_times[hqslang]
+        except KeyError:
+            pass
+        tags = circuit.filter_by_tag(hqslang)[0].tags()
+        if "SingleQubitGateOperation" in tags:
+            duration = self.single_qubit_gate_time
+        elif "TwoQubitGateOperation" in tags:
+            duration = self.two_qubit_gate_time
+        elif "MultiQubitGateOperation" in tags:
+            duration = self.multi_qubit_gate_time
+        elif "PragmaActiveReset" in tags:
+            duration = self.active_reset_time
+        else:
+            duration = 0.0
+        self._operation_times[hqslang] = duration
+        return duration
+
+    def circuit_duration(self, circuit: Circuit) -> float:
+        """Return the simulated execution time of a circuit, without the queue delay.
+
+        Args:
+            circuit: The circuit
+
+        Returns:
+            float: The duration in seconds
+
+        """
+        number_shots = 1
+        for tag in ("PragmaSetNumberOfMeasurements", "PragmaRepeatedMeasurement"):
+            for operation in circuit.filter_by_tag(tag):
+                number_shots = max(number_shots, operation.number_measurements())
+
+        shot_duration = self.shot_time
+        for hqslang in circuit.get_operation_types():
+            operation_time = self._operation_time(circuit, hqslang)
+            if operation_time != 0.0:
+                shot_duration += circuit.count_occurences([hqslang]) * operation_time
+        for operation in circuit.filter_by_tag("PragmaSleep"):
+            try:
+                shot_duration += float(operation.sleep_time())
+            except ValueError:
+                # Symbolic sleep times can not be timed
+                pass
+        return number_shots * shot_duration
+
+    def job_duration(self, circuits: List[Circuit]) -> float:
+        """Return the simulated wall-clock time of a job.
+
+        Args:
+            circuits: The circuits run in the job
+
+        Returns:
+            float: The duration in seconds
+
+        """
+        return self.queue_delay + sum(self.circuit_duration(circuit) for circuit in circuits)
+
+    def simulate_job(self, circuits: List[Circuit]) -> float:
+        """Simulate the wall-clock time of a job, sleeping unless the model is virtual.
+
+        Args:
+            circuits: The circuits run in the job
+
+        Returns:
+            float: The duration in seconds
+
+        """
+        duration = self.job_duration(circuits)
+        with self._lock:
+            self.number_jobs += 1
+            self.last_job_duration = duration
+            self.total_duration += duration
+        if not self.virtual:
+            time.sleep(duration)
+        return duration
+
+    def reset(self) -> None:
+        """Reset the job statistics and the virtual clock."""
+        with self._lock:
+            self.number_jobs = 0
+            self.last_job_duration = 0.0
+            self.total_duration = 0.0
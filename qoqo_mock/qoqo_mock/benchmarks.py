@@ -0,0 +1,395 @@
+"""Benchmark suite for the mocked interface and backend.
+
+Run the suite and store the results as JSON with::
+
+    python -m qoqo_mock.benchmarks --output results.json
+
+and compare a new run against stored baseline results with::
+
+    python -m qoqo_mock.benchmarks --baseline results.json --tolerance 0.25
+
+The command exits with a non-zero status when a benchmark is slower than its baseline by more
+than the tolerance, or when ``import qoqo_mock`` in a fresh interpreter takes longer than the
+import time budget.
+"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import operations as ops  # type: ignore
+from qoqo import Circuit  # type: ignore
+from qoqo.measurements import PauliZProduct, PauliZProductInput  # type: ignore
+from qoqo.devices import AllToAllDevice  # type: ignore
+from qoqo_mock import mocked_call_circuit, MockedBackend
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
+from functools import partial
+import argparse
+import json
+import platform
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+
+# Sweeps of the benchmark parameters
+CIRCUIT_LENGTHS = [100, 1000, 10000]
+QUBIT_COUNTS = [2, 6, 10]
+SHOT_COUNTS = [10, 1000, 100000]
+MEASUREMENT_CIRCUIT_COUNTS = [1, 10, 50]
+# Thread counts of single large readouts, drawn by the calling thread for None
+DRAW_THREAD_COUNTS = [None, 2, 4]
+READOUT_TYPES = [
+    "MeasureQubit",
+    "PragmaRepeatedMeasurement",
+    "PragmaGetPauliProduct",
+    "PragmaGetOccupationProbability",
+    "PragmaGetStateVector",
+    "PragmaGetDensityMatrix",
+]
+
+# Budget in seconds for importing qoqo_mock in a fresh interpreter, qoqo and numpy are only
+# imported on first use
+IMPORT_TIME_BUDGET = 0.05
+
+IMPORT_BENCHMARK = "import/qoqo_mock"
+
+
+def _readout_circuit(
+    readout_type: str, number_qubits: int, circuit_length: int = 0, number_shots: int = 100
+) -> Circuit:
+    """Create a circuit with the given number of gates followed by a single readout.
+
+    Args:
+        readout_type: The hqslang name of the readout operation
+        number_qubits: The number of qubits the gates act on
+        circuit_length: The number of gates before the readout
+        number_shots: The number of shots of repeated measurements
+
+    Returns:
+        Circuit: The benchmark circuit
+
+    Raises:
+        ValueError: Unknown readout type
+
+    """
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=number_qubits, is_output=True)
+    circuit += ops.DefinitionFloat(name="ro_float", length=number_qubits, is_output=True)
+    circuit += ops.DefinitionComplex(name="ro_complex", length=2**number_qubits, is_output=True)
+    for index in range(circuit_length):
+        circuit += ops.CNOT(index % number_qubits, (index + 1) % number_qubits)
+    if readout_type == "MeasureQubit":
+        for qubit in range(number_qubits):
+            circuit += ops.MeasureQubit(qubit, "ro", qubit)
+    elif readout_type == "PragmaRepeatedMeasurement":
+        circuit += ops.PragmaRepeatedMeasurement("ro", number_shots, None)
+    elif readout_type == "PragmaGetPauliProduct":
+        circuit += ops.PragmaGetPauliProduct({0: 3}, "ro_float", Circuit())
+    elif readout_type == "PragmaGetOccupationProbability":
+        circuit += ops.PragmaGetOccupationProbability("ro_float", Circuit())
+    elif readout_type == "PragmaGetStateVector":
+        circuit += ops.PragmaGetStateVector("ro_complex", Circuit())
+    elif readout_type == "PragmaGetDensityMatrix":
+        circuit += ops.PragmaGetDensityMatrix("ro_complex", Circuit())
+    else:
+        raise ValueError(f"Unknown readout type {readout_type}")
+    return circuit
+
+
+def _pauliz_measurement(
+    number_circuits: int, number_qubits: int, number_shots: int
+) -> PauliZProduct:
+    """Create a PauliZProduct measurement with one basis circuit per readout.
+
+    Args:
+        number_circuits: The number of basis circuits
+        number_qubits: The number of measured qubits
+        number_shots: The number of shots of each basis circuit
+
+    Returns:
+        PauliZProduct: The benchmark measurement
+
+    """
+    measurement_input = PauliZProductInput(number_qubits, False)
+    constant_circuit = Circuit()
+    for qubit in range(number_qubits):
+        constant_circuit += ops.Hadamard(qubit)
+    circuits = []
+    for index in range(number_circuits):
+        readout = f"ro_{index}"
+        product = measurement_input.add_pauliz_product(readout, list(range(number_qubits)))
+        measurement_input.add_linear_exp_val(f"exp_{index}", {product: 1.0})
+        circuit = Circuit()
+        circuit += ops.DefinitionBit(name=readout, length=number_qubits, is_output=True)
+        circuit += ops.RotateX(0, 0.1 * index)
+        circuit += ops.PragmaRepeatedMeasurement(readout, number_shots, None)
+        circuits.append(circuit)
+    return PauliZProduct(constant_circuit, circuits, measurement_input)
+
+
+def _call_circuit(circuit: Circuit, number_qubits: int) -> Callable[[], Any]:
+    """Return a function calling mocked_call_circuit on the circuit with empty registers.
+
+    Args:
+        circuit: The circuit that is called
+        number_qubits: The number of mocked qubits
+
+    Returns:
+        Callable[[], Any]: The benchmarked function
+
+    """
+    rng = np.random.default_rng(0)
+    return lambda: mocked_call_circuit(
+        circuit, {}, {}, {}, {}, {}, number_qubits=number_qubits, rng=rng
+    )
+
+
+def benchmark_cases() -> Iterator[Tuple[str, Callable[[], Any]]]:
+    """Yield the named benchmark functions of the suite.
+
+    Yields:
+        Tuple[str, Callable[[], Any]]: The name and the function of each benchmark
+
+    """
+    for circuit_length in CIRCUIT_LENGTHS:
+        circuit = _readout_circuit("PragmaRepeatedMeasurement", 2, circuit_length)
+        yield (
+            f"mocked_call_circuit/length={circuit_length}",
+            _call_circuit(circuit, 2),
+        )
+        backend = MockedBackend(number_qubits=2, seed=0)
+        yield (
+            f"run_circuit/length={circuit_length}",
+            partial(backend.run_circuit, circuit),
+        )
+        backend = MockedBackend(seed=0, device=AllToAllDevice(2, [], ["CNOT"], 1.0))
+        yield (
+            f"run_circuit/length={circuit_length}/device",
+            partial(backend.run_circuit, circuit),
+        )
+    for readout_type in READOUT_TYPES:
+        for number_qubits in QUBIT_COUNTS:
+            circuit = _readout_circuit(readout_type, number_qubits)
+            backend = MockedBackend(number_qubits=number_qubits, seed=0)
+            yield (
+                f"run_circuit/{readout_type}/qubits={number_qubits}",
+                partial(backend.run_circuit, circuit),
+            )
+    for number_shots in SHOT_COUNTS:
+        circuit = _readout_circuit("PragmaRepeatedMeasurement", 6, number_shots=number_shots)
+        measure_qubit_circuit = _readout_circuit("MeasureQubit", 6)
+        measure_qubit_circuit += ops.PragmaSetNumberOfMeasurements(number_shots, "ro")
+        for output_format in ("list", "numpy"):
+            backend = MockedBackend(number_qubits=6, seed=0, output_format=output_format)
+            yield (
+                f"run_circuit/PragmaRepeatedMeasurement/shots={number_shots}/{output_format}",
+                partial(backend.run_circuit, circuit),
+            )
+            yield (
+                f"run_circuit/MeasureQubit/shots={number_shots}/{output_format}",
+                partial(backend.run_circuit, measure_qubit_circuit),
+            )
+    large_readouts = [
+        ("PragmaRepeatedMeasurement/shots=1000000", 10, 1000000),
+        ("PragmaGetStateVector/qubits=22", 22, 1),
+    ]
+    for name, number_qubits, number_shots in large_readouts:
+        circuit = _readout_circuit(name.split("/")[0], number_qubits, number_shots=number_shots)
+        for draw_threads in DRAW_THREAD_COUNTS:
+            backend = MockedBackend(
+                number_qubits=number_qubits,
+                seed=0,
+                output_format="numpy",
+                draw_threads=draw_threads,
+            )
+            yield (
+                f"run_circuit/{name}/threads={draw_threads or 1}",
+                partial(backend.run_circuit, circuit),
+            )
+    for number_circuits in MEASUREMENT_CIRCUIT_COUNTS:
+        measurement = _pauliz_measurement(number_circuits, 4, 1000)
+        backend = MockedBackend(number_qubits=4, seed=0)
+        yield (
+            f"run_measurement_registers/circuits={number_circuits}",
+            partial(backend.run_measurement_registers, measurement),
+        )
+        yield (
+            f"run_measurement/circuits={number_circuits}",
+            partial(backend.run_measurement, measurement),
+        )
+    for number_shots in SHOT_COUNTS:
+        measurement = _pauliz_measurement(10, 4, number_shots)
+        for measurement_statistics in (False, True):
+            backend = MockedBackend(
+                number_qubits=4, seed=0, measurement_statistics=measurement_statistics
+            )
+            mode = "statistics" if measurement_statistics else "registers"
+            yield (
+                f"run_measurement/shots={number_shots}/{mode}",
+                partial(backend.run_measurement, measurement),
+            )
+
+
+def time_function(function: Callable[[], Any], repeats: int = 5) -> float:
+    """Return the median wall-clock time of a function.
+
+    Args:
+        function: The benchmarked function
+        repeats: The number of timed calls, after one untimed warm-up call
+
+    Returns:
+        float: The median time in seconds
+
+    """
+    function()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def time_import(module: str = "qoqo_mock", repeats: int = 5) -> float:
+    """Return the median time of importing a module in a fresh interpreter.
+
+    Only the import itself is timed, not the startup of the interpreter.
+
+    Args:
+        module: The imported module
+        repeats: The number of fresh interpreters the import is timed in
+
+    Returns:
+        float: The median time in seconds
+
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    # Resolve the module like the current interpreter does
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=environment,
+            text=True,
+        )
+        timings.append(float(output.stdout))
+    return statistics.median(timings)
+
+
+def run_benchmarks(repeats: int = 5, pattern: Optional[str] = None) -> Dict[str, Any]:
+    """Run the benchmark suite.
+
+    Args:
+        repeats: The number of timed calls of each benchmark
+        pattern: Only run benchmarks whose name matches this regular expression
+
+    Returns:
+        Dict[str, Any]: The metadata of the run and the median time of each benchmark
+
+    """
+    results: Dict[str, float] = {}
+    for name, function in benchmark_cases():
+        if pattern is not None and re.search(pattern, name) is None:
+            continue
+        results[name] = time_function(function, repeats)
+    if pattern is None or re.search(pattern, IMPORT_BENCHMARK) is not None:
+        results[IMPORT_BENCHMARK] = time_import(repeats=repeats)
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25
+) -> List[Tuple[str, float, float]]:
+    """Find the benchmarks that regressed compared to the baseline.
+
+    Args:
+        results: The results of the new run
+        baseline: The stored baseline results
+        tolerance: The allowed relative slowdown
+
+    Returns:
+        List[Tuple[str, float, float]]: The name, baseline time and new time of each regression
+
+    """
+    regressions = []
+    for name, new_time in results["results"].items():
+        baseline_time = baseline["results"].get(name)
+        if baseline_time is not None and new_time > baseline_time * (1 + tolerance):
+            regressions.append((name, baseline_time, new_time))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite from the command line.
+
+    Args:
+        argv: The command line arguments, sys.argv if None
+
+    Returns:
+        int: The exit status, 1 if a benchmark regressed or the import exceeded its budget
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="store the results as JSON in this file")
+    parser.add_argument("--baseline", help="compare against the JSON results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown")
+    parser.add_argument("--repeats", type=int, default=5, help="timed calls per benchmark")
+    parser.add_argument("--filter", help="only run benchmarks matching this regex")
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=IMPORT_TIME_BUDGET,
+        help="allowed seconds for importing qoqo_mock",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeats=args.repeats, pattern=args.filter)
+    for name, median in results["results"].items():
+        print(f"{name:<70} {median * 1e3:12.3f} ms")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    import_time = results["results"].get(IMPORT_BENCHMARK)
+    over_budget = import_time is not None and import_time > args.import_budget
+    if over_budget:
+        print(f"OVER BUDGET {IMPORT_BENCHMARK}: {import_time * 1e3:.3f} ms")
+    if args.baseline is None:
+        return 1 if over_budget else 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare_results(results, baseline, args.tolerance)
+    for name, baseline_time, new_time in regressions:
+        print(f"REGRESSION {name}: {baseline_time * 1e3:.3f} ms -> {new_time * 1e3:.3f} ms")
+    return 1 if regressions or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
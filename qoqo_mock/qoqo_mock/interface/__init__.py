@@ -12,9 +12,43 @@
 # or implied. See the License for the specific language governing permissions and limitations under
 # the License.
 
-from qoqo_mock.interface.mocked_interface import (
-    mocked_call_operation,
-    mocked_call_circuit,
-)
+from qoqo_mock._lazy import lazy_attributes
+from typing import TYPE_CHECKING
 
-__all__ = ["mocked_call_circuit", "mocked_call_operation"]
+if TYPE_CHECKING:
+    from qoqo_mock.interface.mocked_interface import (
+        mocked_call_operation,
+        mocked_call_circuit,
+        mocked_compile_circuit,
+        MockedBitRegister,
+        MockedCircuitPlan,
+        MockedDensityMatrix,
+        MockedShotStream,
+    )
+    from qoqo_mock.interface.mocked_profiler import MockedProfiler
+
+# Module defining each public name, imported on first access so that importing
+# qoqo_mock.interface does not import qoqo and numpy
+_LAZY_IMPORTS = {
+    "mocked_call_operation": "qoqo_mock.interface.mocked_interface",
+    "mocked_call_circuit": "qoqo_mock.interface.mocked_interface",
+    "mocked_compile_circuit": "qoqo_mock.interface.mocked_interface",
+    "MockedBitRegister": "qoqo_mock.interface.mocked_interface",
+    "MockedCircuitPlan": "qoqo_mock.interface.mocked_interface",
+    "MockedDensityMatrix": "qoqo_mock.interface.mocked_interface",
+    "MockedProfiler": "qoqo_mock.interface.mocked_profiler",
+    "MockedShotStream": "qoqo_mock.interface.mocked_interface",
+}
+
+__all__ = [
+    "MockedBitRegister",
+    "MockedCircuitPlan",
+    "MockedDensityMatrix",
+    "MockedProfiler",
+    "MockedShotStream",
+    "mocked_call_circuit",
+    "mocked_call_operation",
+    "mocked_compile_circuit",
+]
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_IMPORTS)
@@ -14,8 +14,14 @@
 
 from qoqo import operations as ops  # type: ignore
 from qoqo import Circuit  # type: ignore
-from typing import cast, Dict, List, Any, Tuple
+from typing import cast, Callable, Dict, Iterator, List, Any, Optional, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import hashlib
+import threading
 import numpy as np
+from qoqo_mock.interface.mocked_profiler import MockedProfiler
 
 _ALLOWED_PRAGMAS = [
     "PragmaSetNumberOfMeasurements",
@@ -36,19 +42,1054 @@ _ALLOWED_PRAGMAS = [
     "InputSymbolic",
     "PragmaStartDecompositionBlock",
     "PragmaStopDecompositionBlock",
-    "PragmaConditional",
 ]
 
+_NO_OP_TAGS = [
+    "GateOperation",
+    "DefinitionFloat",
+    "DefinitionComplex",
+    "DefinitionBit",
+    "DefinitionUsize",
+]
+
+_OUTPUT_FORMATS = ["list", "numpy"]
+
+_DENSITY_MATRIX_FORMATS = ["dense", "sparse", "lazy"]
+
+_BIT_REGISTER_FORMATS = ["dense", "packed"]
+
+_STATE_VECTOR_DTYPES = [np.dtype(np.complex64), np.dtype(np.complex128)]
+
+# Approximate size of a boxed python number plus its list pointer, used to estimate the
+# memory of readouts converted to nested lists
+_PYTHON_OBJECT_BYTES = 40
+
+# Maximal number of compiled circuits kept in the plan cache
+_PLAN_CACHE_SIZE = 256
+
+# Number of elements drawn from one spawned generator when splitting draws across threads
+_DRAW_BLOCK_SIZE = 1 << 20
+
+# Thread pools of the split draws by number of threads, shared by all runs
+_DRAW_POOLS: Dict[int, ThreadPoolExecutor] = {}
+_DRAW_POOLS_LOCK = threading.Lock()
+
+
+class MockedCircuitPlan(object):
+    """Precompiled execution plan of a qoqo circuit for the mocked interface.
+
+    The plan only holds the operations that produce readouts, together with the handler
+    that mocks them, and the register definitions of the circuit. Gate operations and
+    allowed pragmas are dropped when compiling, as they do not change the mocked results.
+
+    The plan also records the number of qubits the circuit uses, so that readouts are only
+    generated for those qubits, and the number of shots PragmaSetNumberOfMeasurements sets for
+    bit registers. Circuits that only differ in their gates compile to plans with the same
+    structure, which produce readouts of the same shape.
+    """
+
+    def __init__(
+        self,
+        readouts: List[Tuple[Callable[..., None], Any]],
+        bit_definitions: List[Tuple[str, int, bool]],
+        float_definitions: List[Tuple[str, int, bool]],
+        complex_definitions: List[Tuple[str, int, bool]],
+        number_qubits: int = 0,
+        number_measurements: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Initialize plan.
+
+        Args:
+            readouts: The (handler, operation) pairs of the readout-producing operations
+            bit_definitions: The (name, length, is_output) of each DefinitionBit
+            float_definitions: The (name, length, is_output) of each DefinitionFloat
+            complex_definitions: The (name, length, is_output) of each DefinitionComplex
+            number_qubits: The number of qubits used by the circuit, 0 if it only contains
+                           operations acting on all qubits
+            number_measurements: The number of shots of each bit register set by
+                                 PragmaSetNumberOfMeasurements
+
+        """
+        self.readouts = readouts
+        self.bit_definitions = bit_definitions
+        self.float_definitions = float_definitions
+        self.complex_definitions = complex_definitions
+        self.number_qubits = number_qubits
+        self.number_measurements = {} if number_measurements is None else number_measurements
+        self.bit_register_lengths = {name: length for name, length, _ in bit_definitions}
+
+    @property
+    def structure(self) -> Tuple[Any, ...]:
+        """Return a hashable key identifying the readouts and registers of the plan.
+
+        Returns:
+            Tuple[Any, ...]: The structure key
+
+        """
+        return (
+            tuple(self.bit_definitions),
+            tuple(self.float_definitions),
+            tuple(self.complex_definitions),
+            self.number_qubits,
+            tuple(sorted(self.number_measurements.items())),
+            tuple(str(operation) for _, operation in self.readouts),
+        )
+
+
+class MockedDensityMatrix(object):
+    """Density matrix of a mocked computational basis state, materialised on request.
+
+    The mocked density matrices are projectors onto a single basis state and have exactly one
+    non-zero entry. Only the index of that basis state is stored, the dense 2^n x 2^n matrix
+    is created when converting to a numpy array or list.
+    """
+
+    def __init__(self, index: int, number_qubits: int) -> None:
+        """Initialize density matrix.
+
+        Args:
+            index: The index of the basis state (little endian: qubit i is bit i of the index)
+            number_qubits: The number of qubits of the state
+
+        """
+        self.index = index
+        self.number_qubits = number_qubits
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Return the shape of the dense density matrix.
+
+        Returns:
+            Tuple[int, int]: The shape
+
+        """
+        dimension = 2**self.number_qubits
+        return (dimension, dimension)
+
+    def to_sparse(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the non-zero entries of the density matrix.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The (row, column) indices with shape (1, 2)
+                                           and the complex values with shape (1,)
+        """
+        return (
+            np.array([[self.index, self.index]], dtype=np.int64),
+            np.ones(1, dtype=np.complex128),
+        )
+
+    def to_dense(self, dtype: Any = np.complex128) -> np.ndarray:
+        """Materialise the dense density matrix.
+
+        Args:
+            dtype: The dtype of the created matrix
+
+        Returns:
+            np.ndarray: The dense density matrix
+
+        """
+        density_matrix = np.zeros(self.shape, dtype=dtype)
+        density_matrix[self.index, self.index] = 1
+        return density_matrix
+
+    def tolist(self) -> List[List[complex]]:
+        """Materialise the dense density matrix as nested lists.
+
+        Returns:
+            List[List[complex]]: The dense density matrix
+
+        """
+        return self.to_dense().tolist()
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """Materialise the dense density matrix for numpy.
+
+        Args:
+            dtype: The requested dtype, complex128 if None
+            copy: Ignored, a new array is always created
+
+        Returns:
+            np.ndarray: The dense density matrix
+
+        """
+        return self.to_dense(np.complex128 if dtype is None else dtype)
+
+
+class MockedBitRegister(object):
+    """Bit register of several shots, packed eight bits per byte.
+
+    Row i holds the bits of shot i. The bits of a shot are packed little endian: bit j of the
+    register is bit j % 8 of byte j // 8, unused bits of the last byte are zero. Compared to
+    nested lists of bools this takes 64 times less memory.
+    """
+
+    def __init__(self, packed: np.ndarray, number_bits: int) -> None:
+        """Initialize bit register.
+
+        Args:
+            packed: The packed bits as uint8 array of shape (number_shots, ceil(number_bits / 8))
+            number_bits: The number of bits of each shot
+
+        """
+        self.packed = packed
+        self.number_bits = number_bits
+
+    @classmethod
+    def from_bool(cls, bits: Any) -> "MockedBitRegister":
+        """Pack a register of bools.
+
+        Args:
+            bits: The bits as array-like of shape (number_shots, number_bits)
+
+        Returns:
+            MockedBitRegister: The packed register
+
+        """
+        bits = np.asarray(bits, dtype=np.bool_)
+        return cls(np.packbits(bits, axis=1, bitorder="little"), bits.shape[1])
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Return the shape of the unpacked register.
+
+        Returns:
+            Tuple[int, int]: The number of shots and the number of bits
+
+        """
+        return (len(self.packed), self.number_bits)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes of the packed bits.
+
+        Returns:
+            int: The number of bytes
+
+        """
+        return self.packed.nbytes
+
+    def __len__(self) -> int:
+        """Return the number of shots.
+
+        Returns:
+            int: The number of shots
+
+        """
+        return len(self.packed)
+
+    def row(self, shot: Any) -> np.ndarray:
+        """Unpack the bits of one or several shots.
+
+        Args:
+            shot: The index, slice or index array of the shots
+
+        Returns:
+            np.ndarray: The bits as bool array, with a trailing axis of length number_bits
+
+        """
+        return np.unpackbits(
+            self.packed[shot], axis=-1, count=self.number_bits, bitorder="little"
+        ).view(np.bool_)
+
+    def column(self, bit: int) -> np.ndarray:
+        """Unpack one bit of all shots.
+
+        Args:
+            bit: The index of the bit in the register
+
+        Returns:
+            np.ndarray: The bit of each shot as bool array
+
+        Raises:
+            IndexError: The bit index is out of range
+
+        """
+        if not -self.number_bits <= bit < self.number_bits:
+            raise IndexError(f"Bit {bit} out of range for {self.number_bits} bits")
+        bit %= self.number_bits
+        return ((self.packed[:, bit >> 3] >> (bit & 7)) & 1).view(np.bool_)
+
+    def to_bool(self) -> np.ndarray:
+        """Unpack all shots.
+
+        Returns:
+            np.ndarray: The bits as bool array of shape (number_shots, number_bits)
+
+        """
+        return self.row(slice(None))
+
+    def tolist(self) -> List[List[bool]]:
+        """Unpack all shots as nested lists.
+
+        Returns:
+            List[List[bool]]: The bits of each shot
+
+        """
+        return self.to_bool().tolist()
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """Unpack all shots for numpy.
+
+        Args:
+            dtype: The requested dtype, bool if None
+            copy: Ignored, a new array is always created
+
+        Returns:
+            np.ndarray: The bits
+
+        """
+        bits = self.to_bool()
+        return bits if dtype is None else bits.astype(dtype)
+
+
+class MockedShotStream(object):
+    """Repeated measurement readout generated lazily in chunks of shots.
+
+    Iterating over the stream yields the shots in chunks of at most chunk_size rows, so that
+    arbitrarily large shot counts can be processed in bounded memory. The chunks are drawn
+    from a generator seeded when the readout is mocked, every iteration yields the same shots.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        number_shots: int,
+        number_qubits: int,
+        chunk_size: int,
+        as_numpy: bool,
+        mask: Optional[np.ndarray] = None,
+    ) -> None:
+        """Initialize shot stream.
+
+        Args:
+            seed: The seed of the generator the chunks are drawn from
+            number_shots: The total number of shots
+            number_qubits: The number of measured qubits
+            chunk_size: The maximal number of shots in one chunk
+            as_numpy: Yield the chunks as bool arrays instead of nested lists
+            mask: The measured bits of each shot, unmeasured bits are False. All bits are
+                  measured if None
+
+        """
+        self.seed = seed
+        self.number_shots = number_shots
+        self.number_qubits = number_qubits
+        self.chunk_size = chunk_size
+        self.as_numpy = as_numpy
+        self.mask = mask
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Return the shape of the materialised readout.
+
+        Returns:
+            Tuple[int, int]: The number of shots and the number of qubits
+
+        """
+        return (self.number_shots, self.number_qubits)
+
+    def __len__(self) -> int:
+        """Return the number of shots.
+
+        Returns:
+            int: The number of shots
+
+        """
+        return self.number_shots
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        """Yield the shots as bool arrays of at most chunk_size rows.
+
+        Yields:
+            np.ndarray: The next chunk of shots
+
+        """
+        rng = np.random.default_rng(self.seed)
+        for start in range(0, self.number_shots, self.chunk_size):
+            size = min(self.chunk_size, self.number_shots - start)
+            chunk = rng.integers(0, 2, size=(size, self.number_qubits), dtype=np.bool_)
+            if self.mask is not None:
+                chunk &= self.mask
+            yield chunk
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield the shots in chunks, in the output format of the run.
+
+        Yields:
+            Any: The next chunk of shots
+
+        """
+        for chunk in self.chunks():
+            yield chunk if self.as_numpy else chunk.tolist()
+
+    def histogram(self) -> Dict[int, int]:
+        """Count the occurrences of each measured basis state, one chunk at a time.
+
+        Returns:
+            Dict[int, int]: The number of shots of each basis state index
+                            (little endian: qubit i is bit i of the index)
+
+        """
+        weights = np.left_shift(1, np.arange(self.number_qubits, dtype=np.uint64))
+        counts: Dict[int, int] = {}
+        for chunk in self.chunks():
+            indices, chunk_counts = np.unique(chunk @ weights, return_counts=True)
+            for index, count in zip(indices.tolist(), chunk_counts.tolist()):
+                counts[index] = counts.get(index, 0) + count
+        return counts
+
+    def to_array(self) -> np.ndarray:
+        """Materialise all shots.
+
+        Returns:
+            np.ndarray: The shots as bool array of shape (number_shots, number_qubits)
+
+        """
+        return np.concatenate([np.empty((0, self.number_qubits), dtype=np.bool_), *self.chunks()])
+
+    def tolist(self) -> List[List[bool]]:
+        """Materialise all shots as nested lists.
+
+        Returns:
+            List[List[bool]]: The shots
+
+        """
+        return [shot for chunk in self.chunks() for shot in chunk.tolist()]
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """Materialise all shots for numpy.
+
+        Args:
+            dtype: The requested dtype, bool if None
+            copy: Ignored, a new array is always created
+
+        Returns:
+            np.ndarray: The shots
+
+        """
+        array = self.to_array()
+        return array if dtype is None else array.astype(dtype)
+
+
+def _check_formats(
+    output_format: str, density_matrix_format: str, bit_register_format: str
+) -> None:
+    """Check that the output formats of a run are known.
+
+    Args:
+        output_format: The format of the output registers
+        density_matrix_format: The format of density matrix readouts
+        bit_register_format: The format of bit register readouts
+
+    Raises:
+        ValueError: Unknown output format, density matrix format or bit register format
+
+    """
+    if output_format not in _OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format}, expected one of {_OUTPUT_FORMATS}"
+        )
+    if density_matrix_format not in _DENSITY_MATRIX_FORMATS:
+        raise ValueError(
+            f"Unknown density matrix format {density_matrix_format}, "
+            f"expected one of {_DENSITY_MATRIX_FORMATS}"
+        )
+    if bit_register_format not in _BIT_REGISTER_FORMATS:
+        raise ValueError(
+            f"Unknown bit register format {bit_register_format}, "
+            f"expected one of {_BIT_REGISTER_FORMATS}"
+        )
+
+
+class _MockedRun(object):
+    """Registers and settings shared by the readout handlers during a single mocked run."""
+
+    def __init__(
+        self,
+        classical_bit_registers: Dict[str, List[bool]],
+        classical_float_registers: Dict[str, List[float]],
+        classical_complex_registers: Dict[str, List[complex]],
+        output_bit_register_dict: Dict[str, List[List[bool]]],
+        output_complex_register_dict: Dict[str, List[List[complex]]],
+        number_qubits: int,
+        rng: np.random.Generator,
+        output_format: str,
+        density_matrix_format: str,
+        state_vector_dtype: Any,
+        memory_limit: Optional[int],
+        shot_chunk_size: Optional[int] = None,
+        bit_register_format: str = "dense",
+        bit_register_lengths: Optional[Dict[str, int]] = None,
+        number_measurements: Optional[Dict[str, int]] = None,
+        draw_threads: Optional[int] = None,
+    ) -> None:
+        _check_formats(output_format, density_matrix_format, bit_register_format)
+        self.classical_bit_registers = classical_bit_registers
+        self.classical_float_registers = classical_float_registers
+        self.classical_complex_registers = classical_complex_registers
+        self.output_bit_register_dict = output_bit_register_dict
+        self.output_complex_register_dict = output_complex_register_dict
+        self.number_qubits = number_qubits
+        self.rng = rng
+        self.as_numpy = output_format == "numpy"
+        self.density_matrix_format = density_matrix_format
+        self.state_vector_dtype = np.dtype(state_vector_dtype)
+        if self.state_vector_dtype not in _STATE_VECTOR_DTYPES:
+            raise ValueError(
+                f"Unsupported state vector dtype {state_vector_dtype}, "
+                "expected complex64 or complex128"
+            )
+        self.memory_limit = memory_limit
+        if shot_chunk_size is not None and shot_chunk_size < 1:
+            raise ValueError(f"The shot chunk size must be positive, got {shot_chunk_size}")
+        self.shot_chunk_size = shot_chunk_size
+        if draw_threads is not None and draw_threads < 1:
+            raise ValueError(f"The number of draw threads must be positive, got {draw_threads}")
+        self.draw_threads = draw_threads
+        self.packed_bits = bit_register_format == "packed"
+        self.bit_register_lengths = {} if bit_register_lengths is None else bit_register_lengths
+        self.number_measurements = {} if number_measurements is None else number_measurements
+        # The drawn shots and the measured bits of the multi-shot MeasureQubit registers
+        self.measured_shots: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # The shots selected by the enclosing PragmaConditional, all shots if None
+        self.shot_selection: Optional[np.ndarray] = None
+
+    def new_bit_register(self, length: int) -> Any:
+        """Create an all-False bit register in the output format of the run.
+
+        Args:
+            length: The length of the register
+
+        Returns:
+            Any: The bit register
+
+        """
+        if self.as_numpy:
+            return np.zeros(length, dtype=np.bool_)
+        return [False for _ in range(length)]
+
+    def finish(self) -> None:
+        """Write the multi-shot MeasureQubit registers to the output registers."""
+        for readout, (shots, measured) in self.measured_shots.items():
+            bits = shots & measured
+            register: Any = (
+                MockedBitRegister.from_bool(bits) if self.packed_bits else self.convert(bits)
+            )
+            self.output_bit_register_dict[readout] = register
+            if readout in self.classical_bit_registers.keys():
+                del self.classical_bit_registers[readout]
+        self.measured_shots = {}
+
+    def fill(
+        self, out: np.ndarray, draw: Callable[[np.random.Generator, np.ndarray], None]
+    ) -> np.ndarray:
+        """Fill a preallocated readout buffer with random values.
+
+        With draw threads, the buffer is split along its first axis into blocks of about
+        _DRAW_BLOCK_SIZE elements. Every block is filled from its own generator, spawned from
+        a single draw of the run generator, by a pool of draw_threads threads. NumPy releases
+        the GIL while drawing, so large readouts are generated on several cores. The values
+        only depend on the run generator, not on the number of threads.
+
+        Args:
+            out: The buffer that is filled
+            draw: Function filling a buffer from a random generator
+
+        Returns:
+            np.ndarray: The filled buffer
+
+        """
+        if self.draw_threads is None:
+            draw(self.rng, out)
+            return out
+        number_blocks = min(len(out), -(-out.size // _DRAW_BLOCK_SIZE))
+        blocks = np.array_split(out, max(1, number_blocks))
+        generators = [
+            np.random.Generator(np.random.PCG64(child))
+            for child in np.random.SeedSequence(int(self.rng.integers(0, 2**63 - 1))).spawn(
+                len(blocks)
+            )
+        ]
+        if len(blocks) == 1:
+            draw(generators[0], blocks[0])
+        else:
+            list(_draw_pool(self.draw_threads).map(draw, generators, blocks))
+        return out
+
+    def check_memory(self, number_elements: int, itemsize: int, readout: str) -> None:
+        """Refuse readouts that would exceed the memory limit of the run.
+
+        Args:
+            number_elements: The number of elements of the readout
+            itemsize: The size of one element in bytes
+            readout: The name of the readout, used in the error message
+
+        Raises:
+            MemoryError: The readout would exceed the memory limit
+
+        """
+        if self.memory_limit is None:
+            return
+        if not self.as_numpy:
+            itemsize += _PYTHON_OBJECT_BYTES
+        required = number_elements * itemsize
+        if required > self.memory_limit:
+            raise MemoryError(
+                f"Readout {readout} requires about {required} bytes, "
+                f"exceeding the memory limit of {self.memory_limit} bytes"
+            )
+
+    def convert(self, values: np.ndarray) -> Any:
+        """Convert a generated readout to the output format of the run.
+
+        Args:
+            values: The generated readout
+
+        Returns:
+            Any: The readout, as nested lists unless the output format is numpy
+
+        """
+        if self.as_numpy:
+            return values
+        return values.tolist()
+
+
+def _draw_pool(threads: int) -> ThreadPoolExecutor:
+    """Return the shared thread pool of split draws with the given number of threads.
+
+    Args:
+        threads: The number of threads of the pool
+
+    Returns:
+        ThreadPoolExecutor: The pool, created on first use
+
+    """
+    with _DRAW_POOLS_LOCK:
+        pool = _DRAW_POOLS.get(threads)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="qoqo_mock_draw")
+            _DRAW_POOLS[threads] = pool
+        return pool
+
+
+def _fill_bits(rng: np.random.Generator, out: np.ndarray) -> None:
+    out[...] = rng.integers(0, 2, size=out.shape, dtype=np.bool_)
+
+
+def _fill_bytes(rng: np.random.Generator, out: np.ndarray) -> None:
+    out[...] = rng.integers(0, 256, size=out.shape, dtype=np.uint8)
+
+
+def _fill_uniform(rng: np.random.Generator, out: np.ndarray) -> None:
+    rng.random(out=out, dtype=out.dtype)
+
+
+def _mock_measure_qubit(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.MeasureQubit", operation)
+    readout = operation.readout()
+    index = cast("int", operation.readout_index())
+    selection = run.shot_selection
+    number_measurements = run.number_measurements.get(readout)
+    if readout in run.measured_shots:
+        pass
+    elif number_measurements is not None:
+        # All shots of the register are drawn at once, each MeasureQubit marks its bit as
+        # measured and the unmeasured bits are cleared when the run finishes
+        length = run.bit_register_lengths.get(readout, max(run.number_qubits, index + 1))
+        run.measured_shots[readout] = (
+            run.fill(np.empty((number_measurements, length), dtype=np.bool_), _fill_bits),
+            np.zeros(length, dtype=np.bool_),
+        )
+    elif selection is not None:
+        # Registers written under a per-shot condition hold one row per shot, starting from
+        # their current values
+        register = run.classical_bit_registers.get(readout)
+        if register is None:
+            values = np.zeros(
+                run.bit_register_lengths.get(readout, max(run.number_qubits, index + 1)),
+                dtype=np.bool_,
+            )
+        else:
+            values = np.asarray(register, dtype=np.bool_)
+        run.measured_shots[readout] = (
+            np.tile(values, (len(selection), 1)),
+            np.ones(len(values), dtype=np.bool_),
+        )
+    else:
+        if readout not in run.classical_bit_registers.keys():
+            run.classical_bit_registers[readout] = run.new_bit_register(
+                max(run.number_qubits, index + 1)
+            )
+        run.classical_bit_registers[readout][index] = bool(run.rng.integers(0, 2))  # type: ignore
+        return
+
+    shots, measured = run.measured_shots[readout]
+    if selection is None:
+        measured[index] = True
+    elif measured[index]:
+        shots[selection, index] = run.rng.integers(
+            0, 2, size=int(np.count_nonzero(selection)), dtype=np.bool_
+        )
+    else:
+        measured[index] = True
+        shots[~selection, index] = False
+
+
+def _measured_bits(
+    operation: Any, number_qubits: int, bit_register_lengths: Dict[str, int]
+) -> Tuple[int, Optional[np.ndarray]]:
+    """Return the width of a repeated measurement readout and the mask of its measured bits.
+
+    Without a qubit mapping, qubit i is written to bit i and bits beyond the qubits of the run
+    are not measured. With a qubit mapping only the mapped bits are measured. The readout is
+    as wide as its register if it is defined, otherwise as wide as the measured bits.
+
+    Args:
+        operation: The PragmaRepeatedMeasurement
+        number_qubits: The number of qubits of the run
+        bit_register_lengths: The length of each bit register defined in the circuit
+
+    Returns:
+        Tuple[int, Optional[np.ndarray]]: The width and the measured bits, None if all bits
+                                          are measured
+
+    """
+    mapping = operation.qubit_mapping()
+    length = bit_register_lengths.get(operation.readout())
+    if mapping is None:
+        width = number_qubits if length is None else length
+        if width <= number_qubits:
+            return (width, None)
+        mask = np.zeros(width, dtype=np.bool_)
+        mask[:number_qubits] = True
+        return (width, mask)
+    width = max(mapping.values()) + 1 if length is None else length
+    mask = np.zeros(width, dtype=np.bool_)
+    mask[[index for index in mapping.values() if index < width]] = True
+    return (width, mask)
+
+
+def _mock_repeated_measurement(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.PragmaRepeatedMeasurement", operation)
+    width, mask = _measured_bits(operation, run.number_qubits, run.bit_register_lengths)
+    if run.shot_chunk_size is not None:
+        run.output_bit_register_dict[operation.readout()] = MockedShotStream(  # type: ignore
+            int(run.rng.integers(0, 2**63 - 1)),
+            operation.number_measurements(),
+            width,
+            run.shot_chunk_size,
+            run.as_numpy,
+            mask,
+        )
+    elif run.packed_bits:
+        packed = run.fill(
+            np.empty((operation.number_measurements(), (width + 7) // 8), dtype=np.uint8),
+            _fill_bytes,
+        )
+        # Clears the unmeasured bits and the unused bits of the last byte
+        packed &= np.packbits(
+            np.ones(width, dtype=np.bool_) if mask is None else mask, bitorder="little"
+        )
+        run.output_bit_register_dict[operation.readout()] = MockedBitRegister(  # type: ignore
+            packed, width
+        )
+    else:
+        bits = run.fill(
+            np.empty((operation.number_measurements(), width), dtype=np.bool_), _fill_bits
+        )
+        if mask is not None:
+            bits &= mask
+        run.output_bit_register_dict[operation.readout()] = run.convert(bits)
+    if operation.readout() in run.classical_bit_registers.keys():
+        del run.classical_bit_registers[operation.readout()]
+
+
+def _mock_pauli_product(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.PragmaGetPauliProduct", operation)
+    run.classical_float_registers[operation.readout()] = run.convert(run.rng.random(1))
+
+
+def _mock_occupation_probability(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.PragmaGetOccupationProbability", operation)
+    run.classical_float_registers[operation.readout()] = run.convert(
+        run.rng.random(run.number_qubits)
+    )
+
+
+def _mock_state_vector(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.PragmaGetStateVector", operation)
+    dimension = 2**run.number_qubits
+    run.check_memory(dimension, run.state_vector_dtype.itemsize, operation.readout())
+    state_vector = np.empty(dimension, dtype=run.state_vector_dtype)
+    # Real and imaginary parts are drawn directly into the buffer through a float view
+    real_view = state_vector.view(state_vector.real.dtype)
+    run.fill(real_view, _fill_uniform)
+    state_vector /= np.sqrt(np.vdot(state_vector, state_vector).real)
+    run.classical_complex_registers[operation.readout()] = run.convert(state_vector)
+
+
+def _mock_density_matrix(operation: Any, run: "_MockedRun") -> None:
+    operation = cast("ops.PragmaGetDensityMatrix", operation)
+    qubits = run.rng.integers(0, 2, size=run.number_qubits)
+    # Qubit i is bit i of the basis state index
+    index = sum(1 << int(qubit) for qubit in np.flatnonzero(qubits))
+    density_matrix = MockedDensityMatrix(index, run.number_qubits)
+    if run.density_matrix_format == "lazy":
+        readout: Any = density_matrix
+    elif run.density_matrix_format == "sparse":
+        readout = tuple(run.convert(values) for values in density_matrix.to_sparse())
+    elif run.as_numpy:
+        run.check_memory(4**run.number_qubits, 16, operation.readout())
+        readout = density_matrix.to_dense()
+    else:
+        run.check_memory(4**run.number_qubits, 8, operation.readout())
+        readout = density_matrix.to_dense(np.int64).tolist()
+    run.output_complex_register_dict[operation.readout()] = readout
+    if operation.readout() in run.classical_complex_registers.keys():
+        del run.classical_complex_registers[operation.readout()]
+
+
+def _condition(operation: Any, run: "_MockedRun") -> Union[bool, np.ndarray]:
+    """Return the condition bit of a PragmaConditional in the current run.
+
+    Args:
+        operation: The PragmaConditional
+        run: The state of the mocked run
+
+    Returns:
+        Union[bool, np.ndarray]: The condition, with one entry per shot for registers holding
+                                 multiple shots. False for registers that were not written
+
+    """
+    register = operation.condition_register()
+    index = operation.condition_index()
+    if register in run.measured_shots:
+        shots, measured = run.measured_shots[register]
+        return shots[:, index] & measured[index]
+    if register in run.classical_bit_registers.keys():
+        return bool(run.classical_bit_registers[register][index])
+    return False
+
+
+def _mock_conditional(
+    operation: Any, run: "_MockedRun", plan: Optional["MockedCircuitPlan"] = None
+) -> None:
+    """Run the readouts of the circuit of a PragmaConditional for the shots meeting the condition.
+
+    Conditions on registers holding multiple shots are evaluated for all shots at once.
+    MeasureQubit readouts of the conditional circuit then only change the selected shots, the
+    other readouts run once if any shot is selected.
+
+    Args:
+        operation: The PragmaConditional
+        run: The state of the mocked run
+        plan: The compiled conditional circuit, compiled on the fly if None
+
+    """
+    operation = cast("ops.PragmaConditional", operation)
+    condition = _condition(operation, run)
+    outer_selection = run.shot_selection
+    if isinstance(condition, np.ndarray):
+        selection: Optional[np.ndarray] = (
+            condition if outer_selection is None else condition & outer_selection
+        )
+    elif condition:
+        selection = outer_selection
+    else:
+        return
+    if selection is not None and not selection.any():
+        return
+    if plan is None:
+        plan = mocked_compile_circuit(operation.circuit())
+    run.shot_selection = selection
+    try:
+        for handler, nested_operation in plan.readouts:
+            handler(nested_operation, run)
+    finally:
+        run.shot_selection = outer_selection
+
+
+_READOUT_HANDLERS: Dict[str, Callable[..., None]] = {
+    "MeasureQubit": _mock_measure_qubit,
+    "PragmaRepeatedMeasurement": _mock_repeated_measurement,
+    "PragmaGetPauliProduct": _mock_pauli_product,
+    "PragmaGetOccupationProbability": _mock_occupation_probability,
+    "PragmaGetStateVector": _mock_state_vector,
+    "PragmaGetDensityMatrix": _mock_density_matrix,
+    "PragmaConditional": _mock_conditional,
+}
+
+# Dispatch table from hqslang name to readout handler, None for operations that are ignored.
+# Filled lazily the first time an operation type is encountered.
+_DISPATCH_TABLE: Dict[str, Optional[Callable[..., None]]] = {}
+
+_PLAN_CACHE: "OrderedDict[bytes, MockedCircuitPlan]" = OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
+
+
+def _lookup_handler(operation: Any) -> Optional[Callable[..., None]]:
+    """Return the readout handler for an operation, classifying its type on first use.
+
+    Args:
+        operation: The qoqo operation that is looked up
+
+    Returns:
+        Optional[Callable[..., None]]: The readout handler, None if the operation is a no-op
+
+    Raises:
+        RuntimeError: Operation cannot be mocked
+
+    """
+    hqslang = operation.hqslang()
+    try:
+        return _DISPATCH_TABLE[hqslang]
+    except KeyError:
+        pass
+    tags = operation.tags()
+    handler: Optional[Callable[..., None]]
+    if any(tag in tags for tag in _NO_OP_TAGS):
+        handler = None
+    elif hqslang in _READOUT_HANDLERS:
+        handler = _READOUT_HANDLERS[hqslang]
+    elif any(pragma in tags for pragma in _ALLOWED_PRAGMAS):
+        handler = None
+    else:
+        raise RuntimeError("Operation cannot be mocked")
+    _DISPATCH_TABLE[hqslang] = handler
+    return handler
+
+
+def _run_profiled(
+    readouts: List[Tuple[Callable[..., None], Any]], run: _MockedRun, profiler: MockedProfiler
+) -> None:
+    """Run readout operations with their handlers, recording them with the profiler.
+
+    Args:
+        readouts: The handlers and the readout operations
+        run: The state of the mocked run
+        profiler: The profiler recording the operations
+
+    """
+    # Shadowing the method on the instance keeps unprofiled runs free of timing calls
+    run.convert = profiler.wrap("conversion", run.convert)  # type: ignore[method-assign]
+    for handler, operation in readouts:
+        profiler.run_operation(handler, operation, run)
+
+
+def mocked_compile_circuit(circuit: Circuit) -> MockedCircuitPlan:
+    """Compile a qoqo circuit into a mocked execution plan.
+
+    Every operation type in the circuit is validated once, so that circuits containing
+    operations that cannot be mocked are rejected before any readout is produced.
+    Compiled plans are cached by the hash of the serialised circuit, repeated runs of
+    the same circuit skip the compilation entirely.
+
+    Args:
+        circuit: The qoqo circuit that is compiled
+
+    Returns:
+        MockedCircuitPlan: The compiled plan
+
+    Raises:
+        RuntimeError: Operation cannot be mocked
+
+    """
+    key = hashlib.blake2b(circuit.to_bincode(), digest_size=16).digest()
+    with _PLAN_CACHE_LOCK:
+        plan = _PLAN_CACHE.get(key)
+        if plan is not None:
+            _PLAN_CACHE.move_to_end(key)
+            return plan
+
+    for hqslang in circuit.get_operation_types():
+        if hqslang not in _DISPATCH_TABLE:
+            # Operation tags always contain the hqslang name of the operation
+            try:
+                _lookup_handler(circuit.filter_by_tag(hqslang)[0])
+            except RuntimeError as error:
+                raise RuntimeError(f"Operation {hqslang} cannot be mocked") from error
+
+    readouts: List[Tuple[Callable[..., None], Any]] = []
+    if "PragmaConditional" in circuit.get_operation_types():
+        # Conditionals have to run in order with the readouts, their circuits are compiled
+        # along with the circuit
+        for operation in circuit:
+            if operation.hqslang() == "PragmaConditional":
+                readouts.append(
+                    (
+                        partial(
+                            _mock_conditional, plan=mocked_compile_circuit(operation.circuit())
+                        ),
+                        operation,
+                    )
+                )
+            elif "Measurement" in operation.tags():
+                handler = _DISPATCH_TABLE[operation.hqslang()]
+                if handler is not None:
+                    readouts.append((handler, operation))
+    else:
+        for operation in circuit.filter_by_tag("Measurement"):
+            handler = _DISPATCH_TABLE[operation.hqslang()]
+            if handler is not None:
+                readouts.append((handler, operation))
+
+    bit_definitions: List[Tuple[str, int, bool]] = []
+    float_definitions: List[Tuple[str, int, bool]] = []
+    complex_definitions: List[Tuple[str, int, bool]] = []
+    for definition in circuit.definitions():
+        hqslang = definition.hqslang()
+        if hqslang == "DefinitionBit":
+            registers = bit_definitions
+        elif hqslang == "DefinitionFloat":
+            registers = float_definitions
+        elif hqslang == "DefinitionComplex":
+            registers = complex_definitions
+        else:
+            continue
+        registers.append((definition.name(), definition.length(), definition.is_output()))
+
+    number_qubits = circuit.number_of_qubits()
+    for operation in circuit.filter_by_tag("PragmaRepeatedMeasurement"):
+        mapping = operation.qubit_mapping()
+        if mapping:
+            number_qubits = max(number_qubits, max(mapping) + 1)
+
+    number_measurements: Dict[str, int] = {}
+    for operation in circuit.filter_by_tag("PragmaSetNumberOfMeasurements"):
+        number_measurements[operation.readout()] = operation.number_measurements()
+
+    plan = MockedCircuitPlan(
+        readouts,
+        bit_definitions,
+        float_definitions,
+        complex_definitions,
+        number_qubits,
+        number_measurements,
+    )
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE[key] = plan
+        if len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+            _PLAN_CACHE.popitem(last=False)
+    return plan
+
 
 def mocked_call_circuit(
-    circuit: Circuit,
+    circuit: Union[Circuit, MockedCircuitPlan],
     classical_bit_registers: Dict[str, List[bool]],
     classical_float_registers: Dict[str, List[float]],
     classical_complex_registers: Dict[str, List[complex]],
     output_bit_register_dict: Dict[str, List[List[bool]]],
     output_complex_register_dict: Dict[str, List[List[complex]]],
     number_qubits: int = 1,
-    **kwargs,
+    rng: Optional[np.random.Generator] = None,
+    output_format: str = "list",
+    density_matrix_format: str = "dense",
+    state_vector_dtype: Any = np.complex128,
+    memory_limit: Optional[int] = None,
+    shot_chunk_size: Optional[int] = None,
+    bit_register_format: str = "dense",
+    profiler: Optional[MockedProfiler] = None,
+    draw_threads: Optional[int] = None,
 ) -> Tuple[
     Dict[str, List[bool]],
     Dict[str, List[float]],
@@ -62,8 +1103,16 @@ def mocked_call_circuit(
     gates are not applied and the measurements produce random results coherent with the
     measured quantity.
 
+    MeasureQubit readouts into a bit register whose number of shots is set by
+    PragmaSetNumberOfMeasurements produce all shots in one draw, as a (shots, length) output
+    register.
+
+    PragmaConditional runs the readouts of its circuit if its condition bit is set. Conditions
+    on such multi-shot registers are evaluated for all shots at once and only the selected
+    shots are measured again.
+
     Args:
-        circuit: The qoqo circuit that is executed
+        circuit: The qoqo circuit that is executed or its precompiled plan
         classical_bit_registers: Dictionary or registers (lists) containing bit readout values
         classical_float_registers: Dictionary or registers (lists)
                                    containing float readout values
@@ -74,7 +1123,28 @@ def mocked_call_circuit(
         output_complex_register_dict: Dictionary or lists of registers (lists)
                               containing a register for each repetition of the circuit
         number_qubits: Number of qubits mocked
-        **kwargs: Additional keyword arguments
+        rng: The random generator used for the mocked readouts. If None, every call creates
+             a new unseeded generator and its readouts are not reproducible. MockedBackend
+             always passes its own generator, seeded by its seed argument
+        output_format: The format of the generated readouts, "list" for nested python lists
+                       or "numpy" for numpy arrays (bool, float64 and complex128)
+        density_matrix_format: The format of PragmaGetDensityMatrix readouts, "dense" for the
+                               full matrix, "sparse" for the (indices, values) of the non-zero
+                               entries or "lazy" for a MockedDensityMatrix
+        state_vector_dtype: The dtype of PragmaGetStateVector readouts, complex64 or complex128
+        memory_limit: The maximal number of bytes of a single state vector or dense density
+                      matrix readout, larger readouts raise a MemoryError. No limit if None
+        shot_chunk_size: Return PragmaRepeatedMeasurement readouts as MockedShotStream,
+                         generating the shots lazily in chunks of this size. The shots are
+                         returned at once if None
+        bit_register_format: The format of PragmaRepeatedMeasurement readouts, "dense" for the
+                             output format or "packed" for a MockedBitRegister holding eight
+                             bits per byte
+        profiler: The profiler recording the run, the run is not instrumented if None
+        draw_threads: Split repeated measurement, multi-shot MeasureQubit and state vector
+                      draws into blocks filled by this many threads, each block from its
+                      own generator spawned from rng. Drawn by the calling thread from rng
+                      if None
 
     Returns:
         Tuple[
@@ -85,23 +1155,39 @@ def mocked_call_circuit(
             Dict[str, List[List[complex]]]]: modified registers
 
     """
-    for op in circuit:
-        (
-            classical_bit_registers,
-            classical_float_registers,
-            classical_complex_registers,
-            output_bit_register_dict,
-            output_complex_register_dict,
-        ) = mocked_call_operation(
-            op,
-            classical_bit_registers,
-            classical_float_registers,
-            classical_complex_registers,
-            output_bit_register_dict,
-            output_complex_register_dict,
-            number_qubits,
-            **kwargs,
-        )
+    if isinstance(circuit, MockedCircuitPlan):
+        plan = circuit
+    elif profiler is None:
+        plan = mocked_compile_circuit(circuit)
+    else:
+        plan = profiler.call("compile", mocked_compile_circuit, circuit)
+    if plan.number_qubits > 0:
+        # Readouts are only generated for the qubits used by the circuit
+        number_qubits = min(number_qubits, plan.number_qubits)
+    run = _MockedRun(
+        classical_bit_registers,
+        classical_float_registers,
+        classical_complex_registers,
+        output_bit_register_dict,
+        output_complex_register_dict,
+        number_qubits,
+        np.random.default_rng() if rng is None else rng,
+        output_format,
+        density_matrix_format,
+        state_vector_dtype,
+        memory_limit,
+        shot_chunk_size,
+        bit_register_format,
+        plan.bit_register_lengths,
+        plan.number_measurements,
+        draw_threads,
+    )
+    if profiler is None:
+        for handler, operation in plan.readouts:
+            handler(operation, run)
+    else:
+        profiler.call("dispatch", _run_profiled, plan.readouts, run, profiler)
+    run.finish()
 
     return (
         classical_bit_registers,
@@ -120,6 +1206,15 @@ def mocked_call_operation(
     output_bit_register_dict: Dict[str, List[List[bool]]],
     output_complex_register_dict: Dict[str, List[List[complex]]],
     number_qubits: int = 1,
+    rng: Optional[np.random.Generator] = None,
+    output_format: str = "list",
+    density_matrix_format: str = "dense",
+    state_vector_dtype: Any = np.complex128,
+    memory_limit: Optional[int] = None,
+    shot_chunk_size: Optional[int] = None,
+    bit_register_format: str = "dense",
+    profiler: Optional[MockedProfiler] = None,
+    draw_threads: Optional[int] = None,
 ) -> Tuple[
     Dict[str, List[bool]],
     Dict[str, List[float]],
@@ -141,76 +1236,68 @@ def mocked_call_operation(
         output_complex_register_dict: Dictionary or lists of registers (lists)
                               containing a register for each repetition of the circuit
         number_qubits: Number of qubits mocked
-        **kwargs: Additional keyword arguments
+        rng: The random generator used for the mocked readouts. If None, every call creates
+             a new unseeded generator and its readouts are not reproducible. MockedBackend
+             always passes its own generator, seeded by its seed argument
+        output_format: The format of the generated readouts, "list" for nested python lists
+                       or "numpy" for numpy arrays (bool, float64 and complex128)
+        density_matrix_format: The format of PragmaGetDensityMatrix readouts, "dense" for the
+                               full matrix, "sparse" for the (indices, values) of the non-zero
+                               entries or "lazy" for a MockedDensityMatrix
+        state_vector_dtype: The dtype of PragmaGetStateVector readouts, complex64 or complex128
+        memory_limit: The maximal number of bytes of a single state vector or dense density
+                      matrix readout, larger readouts raise a MemoryError. No limit if None
+        shot_chunk_size: Return PragmaRepeatedMeasurement readouts as MockedShotStream,
+                         generating the shots lazily in chunks of this size. The shots are
+                         returned at once if None
+        bit_register_format: The format of PragmaRepeatedMeasurement readouts, "dense" for the
+                             output format or "packed" for a MockedBitRegister holding eight
+                             bits per byte
+        profiler: The profiler recording the run, the run is not instrumented if None
+        draw_threads: Split repeated measurement, multi-shot MeasureQubit and state vector
+                      draws into blocks filled by this many threads, each block from its
+                      own generator spawned from rng. Drawn by the calling thread from rng
+                      if None
 
     Returns:
-        stuff
+        Tuple[
+            Dict[str, List[bool]],
+            Dict[str, List[float]],
+            Dict[str, List[complex]],
+            Dict[str, List[List[bool]]],
+            Dict[str, List[List[complex]]]]: The classical bit, float and complex registers and
+                                             the output bit and complex registers, modified
+                                             by the readout of the operation
 
     Raises:
         RuntimeError: Operation cannot be mocked
 
     """
-    tags = operation.tags()
-    if "GateOperation" in tags:
-        pass
-    elif "DefinitionFloat" in tags:
-        pass
-    elif "DefinitionComplex" in tags:
-        pass
-    elif "DefinitionBit" in tags:
-        pass
-    elif "DefinitionUsize" in tags:
-        pass
-    elif "MeasureQubit" in tags:
-        operation = cast("ops.MeasureQubit", operation)
-        res = np.random.randint(0, 1)  # noqa: NPY002
-        if operation.readout() not in classical_bit_registers.keys():
-            classical_bit_registers[operation.readout()] = [False for _ in range(number_qubits)]
-        else:
-            index = cast("int", operation.readout_index())
-            classical_bit_registers[operation.readout()][index] = res  # type: ignore
-    elif "PragmaRepeatedMeasurement" in tags:
-        operation = cast("ops.PragmaRepeatedMeasurement", operation)
-        output_bit_register_dict[operation.readout()] = np.random.randint(  # noqa: NPY002
-            0, 2, size=(operation.number_measurements(), number_qubits)
-        ).tolist()
-        if operation.readout() in classical_bit_registers.keys():
-            del classical_bit_registers[operation.readout()]
-    elif "PragmaGetPauliProduct" in tags:
-        operation = cast("ops.PragmaGetPauliProduct", operation)
-        classical_float_registers[operation.readout()] = [
-            np.random.Generator(np.random.PCG64()).random(1).tolist(),
-        ]
-    elif "PragmaGetOccupationProbability" in tags:
-        operation = cast("ops.PragmaGetOccupationProbability", operation)
-        classical_float_registers[operation.readout()] = (
-            np.random.Generator(np.random.PCG64()).random(number_qubits).tolist()
+    try:
+        handler = _lookup_handler(operation)
+    except RuntimeError as error:
+        raise RuntimeError(f"Operation {operation.hqslang()} cannot be mocked") from error
+    if handler is not None:
+        run = _MockedRun(
+            classical_bit_registers,
+            classical_float_registers,
+            classical_complex_registers,
+            output_bit_register_dict,
+            output_complex_register_dict,
+            number_qubits,
+            np.random.default_rng() if rng is None else rng,
+            output_format,
+            density_matrix_format,
+            state_vector_dtype,
+            memory_limit,
+            shot_chunk_size,
+            bit_register_format,
+            draw_threads=draw_threads,
         )
-    elif "PragmaGetStateVector" in tags:
-        operation = cast("ops.PragmaGetStateVector", operation)
-        values = np.random.default_rng().uniform(0, 1, (2**number_qubits, 2))
-        values_complex = values[..., 0] + 1j * values[..., 1]
-        normalisation = 0
-        for value in values_complex:
-            normalisation += abs(value) ** 2
-        values_normalised = values_complex / normalisation
-        classical_complex_registers[operation.readout()] = values_normalised.tolist()
-    elif "PragmaGetDensityMatrix" in tags:
-        operation = cast("ops.PragmaGetDensityMatrix", operation)
-        qubits = np.random.randint(0, 2, size=number_qubits)  # noqa: NPY002
-        statevector = np.array([1])
-        for qubit in qubits:
-            if qubit == 0:
-                statevector = np.kron(np.array([1, 0]), statevector)
-            else:
-                statevector = np.kron(np.array([0, 1]), statevector)
-        output_complex_register_dict[operation.readout()] = np.kron(
-            statevector[..., None], statevector
-        ).tolist()
-    elif any(pragma in tags for pragma in _ALLOWED_PRAGMAS):
-        pass
-    else:
-        raise RuntimeError("Operation cannot be mocked")
+        if profiler is None:
+            handler(operation, run)
+        else:
+            profiler.call("dispatch", _run_profiled, [(handler, operation)], run, profiler)
 
     return (
         classical_bit_registers,
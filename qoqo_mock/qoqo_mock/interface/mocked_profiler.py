@@ -0,0 +1,189 @@
+"""Opt-in profiling of mocked circuit runs."""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from typing import Callable, Dict, List, Any
+import threading
+import time
+
+
+class MockedProfiler(object):
+    """Profiler recording counts and cumulative times of mocked runs.
+
+    Times are recorded per operation type (hqslang name) for each dispatched readout
+    operation and per phase of a run:
+
+    * compile: compiling circuits into plans, including the validation of the operations
+    * register_setup: creating the classical registers of a circuit
+    * dispatch: running the readout operations of a circuit
+    * conversion: converting generated readouts to the output format (part of dispatch)
+    * output_assembly: collecting the registers of the circuit repetitions
+    * evaluation: evaluating a measurement from its registers
+
+    Callbacks registered with add_before_operation and add_after_operation are called around
+    each dispatched operation. Profiling is only done when a profiler is passed to
+    mocked_call_circuit or MockedBackend, runs without a profiler are not instrumented.
+    """
+
+    def __init__(self) -> None:
+        """Initialize profiler."""
+        self.phase_counts: Dict[str, int] = {}
+        self.phase_times: Dict[str, float] = {}
+        self.operation_counts: Dict[str, int] = {}
+        self.operation_times: Dict[str, float] = {}
+        self.before_operation: List[Callable[[Any], None]] = []
+        self.after_operation: List[Callable[[Any, float], None]] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state for pickling, without the lock.
+
+        Returns:
+            Dict[str, Any]: The pickled state
+
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the pickled state.
+
+        Args:
+            state: The pickled state
+
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add_before_operation(self, callback: Callable[[Any], None]) -> None:
+        """Register a callback called with each operation before it is run.
+
+        Args:
+            callback: The callback
+
+        """
+        self.before_operation.append(callback)
+
+    def add_after_operation(self, callback: Callable[[Any, float], None]) -> None:
+        """Register a callback called with each operation and its duration after it is run.
+
+        Args:
+            callback: The callback
+
+        """
+        self.after_operation.append(callback)
+
+    def record_phase(self, phase: str, duration: float) -> None:
+        """Record one pass through a phase.
+
+        Args:
+            phase: The name of the phase
+            duration: The duration in seconds
+
+        """
+        with self._lock:
+            self.phase_counts[phase] = self.phase_counts.get(phase, 0) + 1
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + duration
+
+    def record_operation(self, hqslang: str, duration: float) -> None:
+        """Record one run of an operation.
+
+        Args:
+            hqslang: The hqslang name of the operation
+            duration: The duration in seconds
+
+        """
+        with self._lock:
+            self.operation_counts[hqslang] = self.operation_counts.get(hqslang, 0) + 1
+            self.operation_times[hqslang] = self.operation_times.get(hqslang, 0.0) + duration
+
+    def call(self, phase: str, function: Callable[..., Any], *args: Any) -> Any:
+        """Call a function and record its duration as a pass through a phase.
+
+        Args:
+            phase: The name of the phase
+            function: The function that is called
+            *args: The arguments of the function
+
+        Returns:
+            Any: The return value of the function
+
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        self.record_phase(phase, time.perf_counter() - start)
+        return result
+
+    def wrap(self, phase: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a function so that each call is recorded as a pass through a phase.
+
+        Args:
+            phase: The name of the phase
+            function: The function that is wrapped
+
+        Returns:
+            Callable[..., Any]: The wrapped function
+
+        """
+
+        def wrapped(*args: Any) -> Any:
+            return self.call(phase, function, *args)
+
+        return wrapped
+
+    def run_operation(self, handler: Callable[..., None], operation: Any, run: Any) -> None:
+        """Run a readout operation, calling the callbacks and recording its duration.
+
+        Args:
+            handler: The handler mocking the operation
+            operation: The operation
+            run: The state of the mocked run passed to the handler
+
+        """
+        for before in self.before_operation:
+            before(operation)
+        start = time.perf_counter()
+        handler(operation, run)
+        duration = time.perf_counter() - start
+        self.record_operation(operation.hqslang(), duration)
+        for after in self.after_operation:
+            after(operation, duration)
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return the recorded statistics.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: The count and the cumulative time in seconds
+                                                  of each phase and of each operation type,
+                                                  under the keys "phases" and "operations"
+
+        """
+        with self._lock:
+            return {
+                "phases": {
+                    phase: {"count": count, "time": self.phase_times[phase]}
+                    for phase, count in self.phase_counts.items()
+                },
+                "operations": {
+                    hqslang: {"count": count, "time": self.operation_times[hqslang]}
+                    for hqslang, count in self.operation_counts.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Clear the recorded statistics, keeping the callbacks."""
+        with self._lock:
+            self.phase_counts.clear()
+            self.phase_times.clear()
+            self.operation_counts.clear()
+            self.operation_times.clear()
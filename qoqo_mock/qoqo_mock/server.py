@@ -0,0 +1,396 @@
+"""Local HTTP job server wrapping a MockedBackend.
+
+The server stands in for a remote hardware backend: circuits and measurements are submitted
+as jobs, queued, run by worker threads and their results are downloaded once finished.
+Start it with::
+
+    python -m qoqo_mock.server --port 8000 --number-qubits 4 --seed 1
+
+and connect with MockedRemoteBackend("http://127.0.0.1:8000").
+
+The HTTP interface is:
+
+* POST /jobs?kind=<kind>[&type=<measurement type>] submits a job. The kind is "circuit",
+  "measurement_registers" or "measurement", the body is the JSON (application/json) or
+  bincode (application/octet-stream) serialisation of the circuit or measurement.
+  Responds 202 with {"job_id": ...}. Submissions repeated with the same Idempotency-Key
+  header respond with the job of the first submission instead of queueing a new job.
+* GET /jobs/<job_id> responds with {"status": ...}, one of "queued", "running", "done" and
+  "failed" (with an "error"). A failed job is removed once its error has been reported.
+* GET /jobs/<job_id>/result downloads the result of a finished job and removes the job.
+  Registers are returned as {"bit_registers", "float_registers", "complex_registers"},
+  complex numbers as [real, imaginary] pairs.
+
+Finished and failed jobs that are not retrieved are removed after the job TTL of the server.
+"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+from qoqo import Circuit  # type: ignore
+from qoqo import measurements  # type: ignore
+from qoqo_mock import MockedBackend
+from qoqo_mock.backend.mocked_remote_backend import _encode_registers
+from qoqo_mock.backend.mocked_serialisation import _MEASUREMENT_TYPES
+from typing import Deque, Dict, List, Any, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import collections
+import itertools
+import json
+import queue
+import threading
+import time
+
+_JOB_KINDS = ["circuit", "measurement_registers", "measurement"]
+
+
+class _MockedJob(object):
+    """Job queued on the server."""
+
+    def __init__(self, kind: str, serialisable: Any, idempotency_key: Optional[str]) -> None:
+        self.kind = kind
+        self.serialisable = serialisable
+        self.idempotency_key = idempotency_key
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+
+class _MockedJobHandler(BaseHTTPRequestHandler):
+    """HTTP request handler of the job server."""
+
+    # Keep connections alive for pooled clients
+    protocol_version = "HTTP/1.1"
+    server: "_MockedHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Do not log requests, the server is used in benchmarks.
+
+        Args:
+            format: The format of the message
+            *args: The arguments of the message
+
+        """
+
+    def _respond(self, status: int, content: Any) -> None:
+        """Send a JSON response.
+
+        Args:
+            status: The status code
+            content: The JSON content
+
+        """
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        """Submit a job."""
+        parts = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if parts.path != "/jobs":
+            self._respond(404, {"error": f"Unknown path {parts.path}"})
+            return
+        query = parse_qs(parts.query)
+        try:
+            kind = query.get("kind", ["circuit"])[0]
+            serialisable = _deserialise(
+                kind,
+                query.get("type", [None])[0],
+                body,
+                self.headers.get("Content-Type", "application/octet-stream"),
+            )
+        except (ValueError, RuntimeError, TypeError) as error:
+            self._respond(400, {"error": str(error)})
+            return
+        job_id = self.server.job_server.submit(
+            kind, serialisable, self.headers.get("Idempotency-Key")
+        )
+        self._respond(202, {"job_id": job_id})
+
+    def do_GET(self) -> None:
+        """Poll a job or download its result."""
+        segments = urlsplit(self.path).path.strip("/").split("/")
+        if len(segments) not in (2, 3) or segments[0] != "jobs":
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+        job_server = self.server.job_server
+        job = job_server.job(segments[1])
+        if job is None:
+            self._respond(404, {"error": f"Unknown job {segments[1]}"})
+        elif len(segments) == 2:
+            if job.status == "failed":
+                # Failed jobs have no result to download
+                job_server.remove(segments[1])
+            self._respond(200, {"status": job.status, "error": job.error})
+        elif segments[2] != "result":
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+        elif job.status == "failed":
+            job_server.remove(segments[1])
+            self._respond(409, {"error": f"Job {segments[1]} failed: {job.error}"})
+        elif job.status != "done":
+            self._respond(409, {"error": f"Job {segments[1]} is {job.status}"})
+        else:
+            job_server.remove(segments[1])
+            self._respond(200, job.result)
+
+
+class _MockedHTTPServer(ThreadingHTTPServer):
+    """HTTP server holding a reference to the job server."""
+
+    daemon_threads = True
+    job_server: "MockedJobServer"
+
+
+def _deserialise(
+    kind: str, measurement_type: Optional[str], body: bytes, content_type: str
+) -> Any:
+    """Deserialise the circuit or measurement of a submitted job.
+
+    Args:
+        kind: The kind of the job
+        measurement_type: The class name of the measurement, None for circuits
+        body: The serialised circuit or measurement
+        content_type: application/json or application/octet-stream for bincode
+
+    Returns:
+        Any: The circuit or measurement
+
+    Raises:
+        ValueError: Unknown job kind or measurement type
+
+    """
+    if kind not in _JOB_KINDS:
+        raise ValueError(f"Unknown job kind {kind}, expected one of {_JOB_KINDS}")
+    if kind == "circuit":
+        cls = Circuit
+    elif measurement_type in _MEASUREMENT_TYPES:
+        cls = getattr(measurements, measurement_type)
+    else:
+        raise ValueError(
+            f"Unknown measurement type {measurement_type}, expected one of {_MEASUREMENT_TYPES}"
+        )
+    if content_type == "application/json":
+        return cls.from_json(body.decode())
+    return cls.from_bincode(bytearray(body))
+
+
+class MockedJobServer(object):
+    """Local HTTP job server running the submitted jobs on a MockedBackend."""
+
+    def __init__(
+        self,
+        backend: MockedBackend,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        number_workers: int = 1,
+        job_ttl: Optional[float] = 600.0,
+    ) -> None:
+        """Initialize job server.
+
+        Args:
+            backend: The backend running the jobs
+            host: The host the server listens on
+            port: The port the server listens on, a free port if 0
+            number_workers: The number of worker threads running queued jobs
+            job_ttl: The number of seconds finished and failed jobs are kept for retrieval,
+                     until they are retrieved if None
+
+        Raises:
+            ValueError: Backend does not return dense density matrices
+
+        """
+        if backend.density_matrix_format != "dense":
+            raise ValueError(
+                "The job server only returns dense density matrices, "
+                f"got density matrix format {backend.density_matrix_format}"
+            )
+        self.backend = backend
+        self.host = host
+        self.number_workers = number_workers
+        self.job_ttl = job_ttl
+        self._jobs: Dict[str, _MockedJob] = {}
+        self._idempotency_keys: Dict[str, str] = {}
+        # The ids of finished jobs with their finishing time, in finishing order
+        self._finished: Deque[Tuple[float, str]] = collections.deque()
+        self._jobs_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._queue: "queue.Queue[Optional[Tuple[str, _MockedJob]]]" = queue.Queue()
+        self._http_server = _MockedHTTPServer((host, port), _MockedJobHandler)
+        self._http_server.job_server = self
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the server.
+
+        Returns:
+            str: The URL
+
+        """
+        return f"http://{self.host}:{self._http_server.server_port}"
+
+    def submit(self, kind: str, serialisable: Any, idempotency_key: Optional[str] = None) -> str:
+        """Queue a job.
+
+        Args:
+            kind: The kind of the job
+            serialisable: The circuit or measurement run by the job
+            idempotency_key: The key of the submission, a job submitted before with the same
+                             key is returned instead of queueing a new job
+
+        Returns:
+            str: The id of the job
+
+        """
+        with self._jobs_lock:
+            self._evict_expired()
+            if idempotency_key in self._idempotency_keys:
+                return self._idempotency_keys[idempotency_key]
+            job = _MockedJob(kind, serialisable, idempotency_key)
+            job_id = str(next(self._job_ids))
+            self._jobs[job_id] = job
+            if idempotency_key is not None:
+                self._idempotency_keys[idempotency_key] = job_id
+        self._queue.put((job_id, job))
+        return job_id
+
+    def job(self, job_id: str) -> Optional[_MockedJob]:
+        """Return a job by id.
+
+        Args:
+            job_id: The id of the job
+
+        Returns:
+            Optional[_MockedJob]: The job, None if it does not exist or has expired
+
+        """
+        with self._jobs_lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def remove(self, job_id: str) -> None:
+        """Remove a job.
+
+        Args:
+            job_id: The id of the job
+
+        """
+        with self._jobs_lock:
+            self._pop_job(job_id)
+
+    def _pop_job(self, job_id: str) -> None:
+        """Remove a job and its idempotency key, the jobs lock must be held.
+
+        Args:
+            job_id: The id of the job
+
+        """
+        job = self._jobs.pop(job_id, None)
+        if job is not None and job.idempotency_key is not None:
+            self._idempotency_keys.pop(job.idempotency_key, None)
+
+    def _evict_expired(self) -> None:
+        """Remove finished and failed jobs older than the job TTL, the jobs lock must be held."""
+        if self.job_ttl is None:
+            return
+        deadline = time.monotonic() - self.job_ttl
+        while self._finished and self._finished[0][0] <= deadline:
+            _, job_id = self._finished.popleft()
+            self._pop_job(job_id)
+
+    def _work(self) -> None:
+        """Run queued jobs until the server is shut down."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, job = item
+            job.status = "running"
+            try:
+                if job.kind == "circuit":
+                    job.result = _encode_registers(self.backend.run_circuit(job.serialisable))
+                elif job.kind == "measurement_registers":
+                    job.result = _encode_registers(
+                        self.backend.run_measurement_registers(job.serialisable)
+                    )
+                else:
+                    job.result = self.backend.run_measurement(job.serialisable)
+                job.status = "done"
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+                job.status = "failed"
+            job.serialisable = None
+            with self._jobs_lock:
+                self._finished.append((time.monotonic(), job_id))
+
+    def start(self) -> None:
+        """Start the workers and serve requests in a background thread."""
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(self.number_workers)
+        ]
+        self._threads.append(threading.Thread(target=self._http_server.serve_forever, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def shutdown(self) -> None:
+        """Stop serving requests and stop the workers after their current job."""
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        for _ in range(self.number_workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the job server from the command line until interrupted.
+
+    Args:
+        argv: The command line arguments, sys.argv if None
+
+    """
+    parser = argparse.ArgumentParser(description="Local HTTP job server wrapping MockedBackend")
+    parser.add_argument("--host", default="127.0.0.1", help="host the server listens on")
+    parser.add_argument("--port", type=int, default=8000, help="port the server listens on")
+    parser.add_argument("--number-qubits", type=int, default=1, help="qubits of the backend")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the backend")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker threads")
+    parser.add_argument(
+        "--job-ttl", type=float, default=600.0, help="seconds unretrieved jobs are kept"
+    )
+    args = parser.parse_args(argv)
+
+    server = MockedJobServer(
+        MockedBackend(number_qubits=args.number_qubits, seed=args.seed),
+        host=args.host,
+        port=args.port,
+        number_workers=args.workers,
+        job_ttl=args.job_ttl,
+    )
+    server.start()
+    print(f"Serving MockedBackend jobs on {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
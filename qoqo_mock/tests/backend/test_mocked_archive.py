@@ -0,0 +1,105 @@
+"""Test qoqo mocked circuit archives"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import io
+import pytest
+import sys
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo.measurements import PauliZProduct, PauliZProductInput
+from qoqo_mock import MockedBackend, read_circuit_archive, write_circuit_archive
+
+
+def _circuit(number_measurements: int) -> Circuit:
+    """Create a circuit with one repeated measurement"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.CNOT(0, 1)
+    circuit += ops.PragmaRepeatedMeasurement("ro", number_measurements, None)
+    return circuit
+
+
+def _measurement() -> PauliZProduct:
+    """Create a PauliZProduct measurement of one circuit"""
+    measurement_input = PauliZProductInput(2, False)
+    product = measurement_input.add_pauliz_product("ro", [0, 1])
+    measurement_input.add_linear_exp_val("exp", {product: 1.0})
+    return PauliZProduct(None, [_circuit(50)], measurement_input)
+
+
+@pytest.mark.parametrize("serialisation", ["json", "bincode"])
+def test_archive_roundtrip(tmp_path, serialisation):
+    """Test that archived circuits and measurements are read back unchanged"""
+    serialisables = [_circuit(10), _measurement(), _circuit(20)]
+    path = tmp_path / "jobs.qoqo"
+    assert write_circuit_archive(path, serialisables, serialisation) == 3
+
+    read = list(read_circuit_archive(path))
+    assert read[0] == serialisables[0]
+    assert read[2] == serialisables[2]
+    assert read[1].circuits() == serialisables[1].circuits()
+
+    buffer = io.BytesIO()
+    write_circuit_archive(buffer, serialisables, serialisation)
+    assert buffer.getvalue() == path.read_bytes()
+    assert [circuit for circuit in read_circuit_archive(buffer.getbuffer())][0] == read[0]
+
+
+@pytest.mark.parametrize("evaluate", [True, False])
+def test_run_archive(tmp_path, evaluate):
+    """Test that running an archive matches running its contents one after another"""
+    serialisables = [_circuit(10), _measurement(), _circuit(20)]
+    path = tmp_path / "jobs.qoqo"
+    write_circuit_archive(path, serialisables)
+
+    results = list(MockedBackend(number_qubits=2, seed=3).run_archive(path, evaluate=evaluate))
+    backend = MockedBackend(number_qubits=2, seed=3)
+    expected = [
+        backend.run_circuit(serialisables[0]),
+        (
+            backend.run_measurement(serialisables[1])
+            if evaluate
+            else backend.run_measurement_registers(serialisables[1])
+        ),
+        backend.run_circuit(serialisables[2]),
+    ]
+    assert results == expected
+    assert len(results[2][0]["ro"]) == 20
+
+
+def test_archive_errors(tmp_path):
+    """Test that invalid archives and contents are rejected"""
+    with pytest.raises(ValueError):
+        write_circuit_archive(io.BytesIO(), [_circuit(1)], "yaml")
+    with pytest.raises(ValueError):
+        write_circuit_archive(io.BytesIO(), [ops.CNOT(0, 1)])
+
+    empty = tmp_path / "empty.qoqo"
+    empty.write_bytes(b"")
+    with pytest.raises(ValueError):
+        list(read_circuit_archive(empty))
+    with pytest.raises(ValueError):
+        list(read_circuit_archive(b"NOTQOQO!"))
+
+    buffer = io.BytesIO()
+    write_circuit_archive(buffer, [_circuit(1)])
+    with pytest.raises(ValueError):
+        list(read_circuit_archive(buffer.getvalue()[:-1]))
+    corrupt = bytearray(buffer.getvalue())
+    corrupt[len(b"QOQOMOCK")] = 7
+    with pytest.raises(ValueError, match="serialisation"):
+        list(read_circuit_archive(corrupt))
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -10,13 +10,26 @@
 # is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
 # or implied. See the License for the specific language governing permissions and limitations under
 # the License.
+import asyncio
 import pytest
 import sys
 import numpy as np
 import numpy.testing as npt
 from qoqo import operations as ops
 from qoqo import Circuit
-from qoqo_mock import MockedBackend
+from qoqo.measurements import (
+    CheatedPauliZProduct,
+    CheatedPauliZProductInput,
+    PauliZProduct,
+    PauliZProductInput,
+)
+from qoqo_mock import (
+    MockedBackend,
+    MockedBitRegister,
+    MockedDensityMatrix,
+    MockedProfiler,
+    MockedShotStream,
+)
 from typing import List
 
 
@@ -55,5 +68,547 @@ def test_mocked_backend(measurement):
         assert isinstance(results[0], measurement[1])
 
 
+def test_mocked_backend_seed():
+    """Test that seeded mocked backends are reproducible"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionFloat(name="fl", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="co", length=4, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=10)
+    circuit += ops.PragmaGetOccupationProbability(readout="fl", circuit=Circuit())
+    circuit += ops.PragmaGetStateVector(readout="co", circuit=Circuit())
+
+    first = MockedBackend(number_qubits=2, seed=42).run_circuit(circuit)
+    second = MockedBackend(number_qubits=2, seed=42).run_circuit(circuit)
+    other = MockedBackend(number_qubits=2, seed=43).run_circuit(circuit)
+    assert first == second
+    assert first != other
+
+
+def test_mocked_backend_spawn_generators():
+    """Test that spawned generators are independent and reproducible"""
+    backend = MockedBackend(number_qubits=2, seed=42)
+    first = [rng.random() for rng in backend.spawn_generators(3)]
+    second = [rng.random() for rng in MockedBackend(seed=42).spawn_generators(3)]
+    assert len(set(first)) == 3
+    assert first == second
+
+
+@pytest.mark.parametrize(
+    "measurement",
+    [
+        (ops.MeasureQubit(qubit=0, readout="ro", readout_index=0), np.bool_, 0, (1, 1)),
+        (
+            ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=10),
+            np.bool_,
+            0,
+            (10, 1),
+        ),
+        (
+            ops.PragmaGetPauliProduct(
+                qubit_paulis={0: 1, 1: 2}, readout="ro", circuit=Circuit()
+            ),
+            np.float64,
+            1,
+            (1, 1),
+        ),
+        (
+            ops.PragmaGetOccupationProbability(readout="ro", circuit=Circuit()),
+            np.float64,
+            1,
+            (1, 1),
+        ),
+        (ops.PragmaGetStateVector(readout="ro", circuit=Circuit()), np.complex128, 2, (1, 2)),
+        (ops.PragmaGetDensityMatrix(readout="ro", circuit=Circuit()), np.complex128, 2, (2, 2)),
+    ],
+)
+def test_mocked_backend_numpy_output(measurement):
+    """Test mocked backend with numpy output format, sized to the single qubit used"""
+    circuit = Circuit()
+    circuit += ops.DefinitionFloat(name="ro", length=1, is_output=True)
+    circuit += ops.DefinitionComplex(name="ro", length=1, is_output=True)
+    circuit += ops.DefinitionBit(name="ro", length=1, is_output=True)
+    circuit += ops.PauliX(qubit=0)
+    circuit += measurement[0]
+
+    mocked = MockedBackend(number_qubits=2, output_format="numpy")
+
+    results = mocked.run_circuit(circuit=circuit)[measurement[2]]["ro"]
+    assert isinstance(results, np.ndarray)
+    assert results.dtype == measurement[1]
+    assert results.shape == measurement[3]
+    assert results.flags["C_CONTIGUOUS"]
+
+
+def test_mocked_backend_unknown_output_format():
+    """Test that unknown output formats are rejected"""
+    with pytest.raises(ValueError):
+        MockedBackend(number_qubits=2, output_format="tuple")
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_mocked_backend_density_matrix_formats(output_format):
+    """Test that dense, sparse and lazy density matrices agree"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="ro", length=1, is_output=True)
+    circuit += ops.PragmaGetDensityMatrix(readout="ro", circuit=Circuit())
+
+    results = {}
+    for density_matrix_format in ["dense", "sparse", "lazy"]:
+        mocked = MockedBackend(
+            number_qubits=3,
+            seed=7,
+            output_format=output_format,
+            density_matrix_format=density_matrix_format,
+        )
+        results[density_matrix_format] = mocked.run_circuit(circuit=circuit)[2]["ro"]
+
+    dense = np.array(results["dense"])
+    assert dense.shape == (8, 8)
+    assert np.sum(np.abs(dense)) == 1
+    indices, values = results["sparse"]
+    npt.assert_array_equal(np.array(indices), np.array(np.nonzero(dense)).T)
+    npt.assert_array_equal(np.array(values), [1.0])
+    lazy = results["lazy"]
+    assert isinstance(lazy, MockedDensityMatrix)
+    assert lazy.shape == (8, 8)
+    npt.assert_array_equal(np.asarray(lazy), dense)
+
+
+def test_mocked_density_matrix_large():
+    """Test that lazy density matrices do not materialise on creation"""
+    circuit = Circuit()
+    circuit += ops.PragmaGetDensityMatrix(readout="ro", circuit=Circuit())
+    mocked = MockedBackend(number_qubits=40, density_matrix_format="lazy")
+    lazy = mocked.run_circuit(circuit=circuit)[2]["ro"]
+    assert lazy.shape == (2**40, 2**40)
+    indices, values = lazy.to_sparse()
+    assert 0 <= indices[0, 0] < 2**40
+
+
+@pytest.mark.parametrize("dtype", [np.complex64, np.complex128])
+def test_mocked_backend_state_vector(dtype):
+    """Test state vector dtype and normalisation"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="ro", length=1, is_output=True)
+    circuit += ops.PragmaGetStateVector(readout="ro", circuit=Circuit())
+    mocked = MockedBackend(number_qubits=4, output_format="numpy", state_vector_dtype=dtype)
+    state_vector = mocked.run_circuit(circuit=circuit)[2]["ro"][0]
+    assert state_vector.dtype == dtype
+    assert state_vector.shape == (16,)
+    npt.assert_allclose(np.linalg.norm(state_vector), 1.0, rtol=1e-6)
+
+
+def test_mocked_backend_memory_limit():
+    """Test that readouts exceeding the memory limit are refused"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="ro", length=1, is_output=True)
+    circuit += ops.PragmaGetStateVector(readout="ro", circuit=Circuit())
+    mocked = MockedBackend(number_qubits=10, output_format="numpy", memory_limit=2**14 - 1)
+    with pytest.raises(MemoryError):
+        mocked.run_circuit(circuit=circuit)
+    mocked = MockedBackend(number_qubits=10, output_format="numpy", memory_limit=2**14)
+    assert mocked.run_circuit(circuit=circuit)[2]["ro"].shape == (1, 1024)
+    with pytest.raises(ValueError):
+        MockedBackend(number_qubits=2, state_vector_dtype=np.float64).run_circuit(circuit)
+
+
+def _pauliz_measurement(number_circuits: int) -> PauliZProduct:
+    """Create a PauliZProduct measurement with one readout per circuit"""
+    measurement_input = PauliZProductInput(2, False)
+    constant_circuit = Circuit()
+    constant_circuit += ops.Hadamard(0)
+    circuits = []
+    for index in range(number_circuits):
+        readout = f"ro_{index}"
+        product = measurement_input.add_pauliz_product(readout, [0, 1])
+        measurement_input.add_linear_exp_val(f"exp_{index}", {product: 1.0})
+        circuit = Circuit()
+        circuit += ops.DefinitionBit(name=readout, length=2, is_output=True)
+        circuit += ops.RotateX(0, 0.1 * index)
+        circuit += ops.PragmaRepeatedMeasurement(readout=readout, number_measurements=20)
+        circuits.append(circuit)
+    return PauliZProduct(constant_circuit, circuits, measurement_input)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_mocked_backend_parallel_measurement(executor):
+    """Test that parallel measurement runs are deterministic"""
+    measurement = _pauliz_measurement(6)
+    serial = MockedBackend(number_qubits=2, seed=11, executor="thread", max_workers=1)
+    parallel = MockedBackend(number_qubits=2, seed=11, executor=executor, max_workers=3)
+    expected = serial.run_measurement_registers(measurement)
+    result = parallel.run_measurement_registers(measurement)
+    assert result == expected
+    assert sorted(result[0].keys()) == [f"ro_{index}" for index in range(6)]
+    assert parallel.run_measurement(measurement).keys() == {f"exp_{i}" for i in range(6)}
+    # The pool is started once and kept for later runs until the backend is closed
+    pool = parallel._executor_pool
+    assert pool is not None
+    parallel.run_measurement_registers(measurement)
+    assert parallel._executor_pool is pool
+    parallel.close()
+    assert parallel._executor_pool is None
+    assert parallel.run_measurement_registers(measurement)[0].keys() == result[0].keys()
+    parallel.close()
+    serial.close()
+    with pytest.raises(ValueError):
+        MockedBackend(number_qubits=2, executor="cluster")
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_mocked_backend_circuit_batch(output_format):
+    """Test running a batch of circuits"""
+    circuits = []
+    for index in range(5):
+        circuit = Circuit()
+        circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+        circuit += ops.DefinitionComplex(name="sv", length=4, is_output=True)
+        circuit += ops.RotateX(0, 0.1 * index)
+        circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=50)
+        circuit += ops.PragmaGetStateVector(readout="sv", circuit=Circuit())
+        circuits.append(circuit)
+    circuit = Circuit()
+    circuit += ops.DefinitionFloat(name="fl", length=2, is_output=True)
+    circuit += ops.PragmaGetOccupationProbability(readout="fl", circuit=Circuit())
+    circuits.insert(2, circuit)
+
+    mocked = MockedBackend(number_qubits=2, seed=5, output_format=output_format)
+    results = mocked.run_circuit_batch(circuits)
+    assert len(results) == 6
+    assert np.shape(results[2][1]["fl"]) == (1, 2)
+    bit_results = [np.array(result[0]["ro"]) for result in results[:2] + results[3:]]
+    for bits in bit_results:
+        assert bits.shape == (50, 2)
+    assert not all(np.array_equal(bit_results[0], bits) for bits in bit_results[1:])
+    for index, result in enumerate(results):
+        if index != 2:
+            npt.assert_allclose(np.linalg.norm(np.array(result[2]["sv"])[0]), 1.0)
+
+    repeated = MockedBackend(number_qubits=2, seed=5, output_format=output_format)
+    for result, expected in zip(repeated.run_circuit_batch(circuits), results):
+        npt.assert_array_equal(
+            np.array(result[0].get("ro", [])), np.array(expected[0].get("ro", []))
+        )
+
+
+def test_mocked_backend_circuit_batch_memory_limit():
+    """Test batched draws of a batch of circuits are split to fit into the memory limit"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="sv", length=4, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=50)
+    circuit += ops.PragmaGetStateVector(readout="sv", circuit=Circuit())
+
+    mocked = MockedBackend(number_qubits=2, seed=5, memory_limit=250)
+    results = mocked.run_circuit_batch([circuit] * 5)
+    bit_results = [np.array(result[0]["ro"]) for result in results]
+    for bits in bit_results:
+        assert bits.shape == (50, 2)
+    assert not all(np.array_equal(bit_results[0], bits) for bits in bit_results[1:])
+    for result in results:
+        npt.assert_allclose(np.linalg.norm(np.array(result[2]["sv"])[0]), 1.0)
+
+    repeated = MockedBackend(number_qubits=2, seed=5, memory_limit=250)
+    for result, bits in zip(repeated.run_circuit_batch([circuit] * 5), bit_results):
+        npt.assert_array_equal(np.array(result[0]["ro"]), bits)
+
+
+def test_mocked_backend_measurement_batch():
+    """Test running a batch of measurements"""
+    measurements = [_pauliz_measurement(3) for _ in range(4)]
+    mocked = MockedBackend(number_qubits=2, seed=5)
+    results = mocked.run_measurement_batch(measurements)
+    assert len(results) == 4
+    for result in results:
+        assert result.keys() == {"exp_0", "exp_1", "exp_2"}
+        for value in result.values():
+            assert -1.0 <= value <= 1.0
+
+
+@pytest.mark.parametrize("executor", [None, "thread"])
+def test_mocked_backend_prepared_measurement(executor):
+    """Test repeated runs of a prepared measurement"""
+    measurement = _pauliz_measurement(3)
+    session = MockedBackend(number_qubits=2, seed=3, executor=executor).prepare(measurement)
+    reference = MockedBackend(number_qubits=2, seed=3, executor=executor)
+    for _ in range(3):
+        assert session.run_registers() == reference.run_measurement_registers(measurement)
+    assert session.run().keys() == {"exp_0", "exp_1", "exp_2"}
+
+
+def test_mocked_backend_async():
+    """Test concurrent async runs on one event loop"""
+    measurement = _pauliz_measurement(3)
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=10)
+
+    async def submit(mocked):
+        return await asyncio.gather(
+            *[mocked.run_measurement_async(measurement) for _ in range(8)],
+            mocked.run_measurement_registers_async(measurement),
+            mocked.run_circuit_async(circuit),
+        )
+
+    mocked = MockedBackend(number_qubits=2, seed=9, max_workers=3)
+    results = asyncio.run(submit(mocked))
+    for result in results[:8]:
+        assert result.keys() == {"exp_0", "exp_1", "exp_2"}
+    assert results[8][0].keys() == {"ro_0", "ro_1", "ro_2"}
+    assert np.shape(results[9][0]["ro"]) == (10, 2)
+    mocked.close()
+    repeated = MockedBackend(number_qubits=2, seed=9, max_workers=3)
+    assert asyncio.run(submit(repeated)) == results
+    repeated.close()
+
+
+def test_mocked_backend_async_timeout_and_cancel():
+    """Test timeouts and cancellation of queued async jobs"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="ro", length=1, is_output=True)
+    circuit += ops.PragmaGetStateVector(readout="ro", circuit=Circuit())
+    mocked = MockedBackend(number_qubits=18, max_workers=1)
+
+    async def submit():
+        with pytest.raises(asyncio.TimeoutError):
+            await mocked.run_circuit_async(circuit, timeout=0)
+        running = asyncio.ensure_future(mocked.run_circuit_async(circuit))
+        queued = asyncio.ensure_future(mocked.run_circuit_async(circuit))
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert np.shape((await running)[2]["ro"]) == (1, 2**18)
+
+    asyncio.run(submit())
+    mocked.close()
+
+
+@pytest.mark.parametrize("executor", [None, "thread"])
+def test_mocked_backend_profiler(executor):
+    """Test that the profiler records every phase and readout of a measurement run"""
+    profiler = MockedProfiler()
+    backend = MockedBackend(number_qubits=2, seed=3, executor=executor, profiler=profiler)
+    result = backend.run_measurement(_pauliz_measurement(3))
+    report = profiler.report()
+    for phase, count in (
+        ("compile", 3),
+        ("register_setup", 3),
+        ("dispatch", 3),
+        ("conversion", 3),
+        ("output_assembly", 3),
+        ("evaluation", 1),
+    ):
+        assert report["phases"][phase]["count"] == count
+        assert report["phases"][phase]["time"] >= 0.0
+    assert report["operations"]["PragmaRepeatedMeasurement"]["count"] == 3
+    # Profiling does not change the drawn readouts
+    assert result == MockedBackend(number_qubits=2, seed=3, executor=executor).run_measurement(
+        _pauliz_measurement(3)
+    )
+
+
+def test_mocked_backend_streamed_shots():
+    """Test streaming repeated measurements and evaluating measurements from streams"""
+    backend = MockedBackend(number_qubits=2, seed=5, output_format="numpy", shot_chunk_size=7)
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=20)
+    (bit_registers, _, _) = backend.run_circuit(circuit)
+    assert isinstance(bit_registers["ro"], MockedShotStream)
+    assert [chunk.shape for chunk in bit_registers["ro"]] == [(7, 2), (7, 2), (6, 2)]
+
+    (bit_registers, _, _) = backend.run_measurement_registers(_pauliz_measurement(2))
+    assert all(isinstance(register, MockedShotStream) for register in bit_registers.values())
+    result = backend.run_measurement(_pauliz_measurement(2))
+    assert set(result) == {"exp_0", "exp_1"}
+
+
+def test_mocked_backend_draw_threads():
+    """Test that large readouts drawn by several threads only depend on the seed"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=4, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=600000)
+    results = [
+        MockedBackend(
+            number_qubits=4, seed=2, output_format="numpy", draw_threads=draw_threads
+        ).run_circuit(circuit)[0]["ro"]
+        for draw_threads in [1, 4]
+    ]
+    assert results[0].shape == (600000, 4)
+    assert np.array_equal(results[0], results[1])
+    assert 0.49 < results[0].mean() < 0.51
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_mocked_backend_packed_bits(output_format):
+    """Test returning repeated measurement and MeasureQubit registers bit-packed"""
+    backend = MockedBackend(
+        number_qubits=10, seed=4, output_format=output_format, bit_register_format="packed"
+    )
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=10, is_output=True)
+    circuit += ops.DefinitionBit(name="ro_single", length=10, is_output=True)
+    circuit += ops.MeasureQubit(0, "ro_single", 0)
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=100000)
+    (bit_registers, _, _) = backend.run_circuit(circuit)
+    assert isinstance(bit_registers["ro"], MockedBitRegister)
+    assert bit_registers["ro"].shape == (100000, 10)
+    assert bit_registers["ro"].nbytes == 100000 * 2
+    assert isinstance(bit_registers["ro_single"], MockedBitRegister)
+    assert bit_registers["ro_single"].shape == (1, 10)
+
+    result = backend.run_measurement(_pauliz_measurement(2))
+    assert set(result) == {"exp_0", "exp_1"}
+    with pytest.raises(ValueError):
+        MockedBackend(bit_register_format="bytes")
+
+
+@pytest.mark.parametrize("bit_register_format", ["dense", "packed"])
+def test_mocked_backend_sized_to_used_qubits(bit_register_format):
+    """Test that readouts are sized to the qubits the circuit uses, not the backend size"""
+    backend = MockedBackend(
+        number_qubits=30, seed=6, output_format="numpy", bit_register_format=bit_register_format
+    )
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=4, is_output=True)
+    circuit += ops.DefinitionBit(name="ro_all", length=3, is_output=True)
+    circuit += ops.DefinitionFloat(name="ro_float", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="ro_sv", length=4, is_output=True)
+    circuit += ops.DefinitionComplex(name="ro_dm", length=16, is_output=True)
+    circuit += ops.CNOT(0, 1)
+    circuit += ops.PragmaGetOccupationProbability("ro_float", Circuit())
+    circuit += ops.PragmaGetStateVector("ro_sv", Circuit())
+    circuit += ops.PragmaGetDensityMatrix("ro_dm", Circuit())
+    circuit += ops.PragmaRepeatedMeasurement("ro", 1000, {0: 2, 1: 0})
+    circuit += ops.PragmaRepeatedMeasurement("ro_all", 1000, None)
+    (bit_registers, float_registers, complex_registers) = backend.run_circuit(circuit)
+
+    assert float_registers["ro_float"].shape == (1, 2)
+    assert complex_registers["ro_sv"].shape == (1, 4)
+    assert complex_registers["ro_dm"].shape == (4, 4)
+    bits = np.asarray(bit_registers["ro"])
+    assert bits.shape == (1000, 4)
+    # Only the mapped bits are measured
+    assert bits[:, [0, 2]].any() and not bits[:, [1, 3]].any()
+    bits = np.asarray(bit_registers["ro_all"])
+    assert bits.shape == (1000, 3)
+    # The register bit of the unused qubit is never set
+    assert bits[:, :2].any() and not bits[:, 2].any()
+
+
+def _statistics_measurement(number_measurements: int) -> PauliZProduct:
+    """Create a flipped PauliZProduct measurement over measured and unmeasured qubits"""
+    measurement_input = PauliZProductInput(3, True)
+    products = [
+        measurement_input.add_pauliz_product("ro", qubits) for qubits in ([0], [1], [1, 2], [])
+    ]
+    for product in products:
+        measurement_input.add_linear_exp_val(f"linear_{product}", {product: 1.0})
+    measurement_input.add_symbolic_exp_val(
+        "symbolic", "2 * pauli_product_1 + cos(pauli_product_2) + pauli_product_0 ^ 2"
+    )
+    circuits = []
+    for readout in ("ro", "ro_flipped"):
+        circuit = Circuit()
+        circuit += ops.DefinitionBit(name=readout, length=3, is_output=True)
+        circuit += ops.Hadamard(0)
+        circuit += ops.PragmaRepeatedMeasurement(readout, number_measurements, None)
+        circuits.append(circuit)
+    return PauliZProduct(None, circuits, measurement_input)
+
+
+def test_mocked_backend_measurement_statistics():
+    """Test evaluating PauliZProduct measurements from sampled statistics"""
+    measurement = _statistics_measurement(100)
+    expected = MockedBackend(number_qubits=3, seed=7).run_measurement(measurement)
+    result = MockedBackend(
+        number_qubits=3, seed=7, measurement_statistics=True
+    ).run_measurement(measurement)
+    assert set(result) == set(expected)
+    # Products over the unmeasured qubits 1 and 2 are deterministic, flipping the measurement
+    # cancels products over odd many qubits
+    for name in ("linear_1", "linear_2", "linear_3"):
+        assert result[name] == expected[name]
+    assert result["linear_1"] == 0.0 and result["linear_2"] == 1.0
+    assert result["symbolic"] == pytest.approx(np.cos(1.0) + result["linear_0"] ** 2)
+
+    # The cost does not depend on the number of shots
+    backend = MockedBackend(number_qubits=3, seed=7, measurement_statistics=True)
+    values = [backend.run_measurement(_statistics_measurement(10**12))["linear_0"]]
+    values += [backend.run_measurement(measurement)["linear_0"] for _ in range(300)]
+    assert abs(values[0]) < 1e-4
+    # Mean of the random and flipped products over 100 shots each
+    assert abs(np.mean(values[1:])) < 0.03
+    assert np.std(values[1:]) == pytest.approx(np.sqrt(0.5 / 100), rel=0.2)
+
+    session = backend.prepare(measurement)
+    assert set(session.run()) == set(expected)
+
+
+def test_mocked_backend_measurement_statistics_fallback():
+    """Test that other measurements are evaluated from their registers"""
+    measurement_input = CheatedPauliZProductInput()
+    index = measurement_input.add_pauliz_product("ro")
+    measurement_input.add_linear_exp_val("exp", {index: 1.0})
+    circuit = Circuit()
+    circuit += ops.DefinitionFloat(name="ro", length=1, is_output=True)
+    circuit += ops.PragmaGetPauliProduct({0: 3}, "ro", Circuit())
+    measurement = CheatedPauliZProduct(None, [circuit], measurement_input)
+    assert MockedBackend(seed=2, measurement_statistics=True).run_measurement(
+        measurement
+    ) == MockedBackend(seed=2).run_measurement(measurement)
+
+
+@pytest.mark.parametrize("bit_register_format", ["dense", "packed"])
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_mocked_backend_number_of_measurements(output_format, bit_register_format):
+    """Test that MeasureQubit circuits return the shots set by PragmaSetNumberOfMeasurements"""
+    backend = MockedBackend(
+        number_qubits=2,
+        seed=8,
+        output_format=output_format,
+        bit_register_format=bit_register_format,
+    )
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionBit(name="single", length=2, is_output=True)
+    circuit += ops.Hadamard(0)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    circuit += ops.MeasureQubit(1, "ro", 1)
+    circuit += ops.MeasureQubit(0, "single", 0)
+    circuit += ops.PragmaSetNumberOfMeasurements(500, "ro")
+    bit_registers = backend.run_circuit(circuit)[0]
+    if bit_register_format == "packed":
+        assert isinstance(bit_registers["ro"], MockedBitRegister)
+    bits = np.asarray(bit_registers["ro"])
+    assert bits.shape == (500, 2)
+    assert 0.4 < bits.mean() < 0.6
+    assert np.asarray(bit_registers["single"]).shape == (1, 2)
+
+    # Single shot MeasureQubit readouts are random, not always False
+    single = [np.asarray(backend.run_circuit(circuit)[0]["single"])[0, 0] for _ in range(50)]
+    assert any(single) and not all(single)
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_mocked_backend_conditional(output_format):
+    """Test feed-forward circuits with conditionals evaluated for all shots"""
+    conditional_circuit = Circuit()
+    conditional_circuit += ops.PauliX(1)
+    conditional_circuit += ops.MeasureQubit(1, "ro", 1)
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.Hadamard(0)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    circuit += ops.PragmaConditional("ro", 0, conditional_circuit)
+    circuit += ops.PragmaSetNumberOfMeasurements(300, "ro")
+    backend = MockedBackend(number_qubits=2, seed=9, output_format=output_format)
+    bits = np.asarray(backend.run_circuit(circuit)[0]["ro"])
+    assert bits.shape == (300, 2)
+    assert bits[:, 0].any() and not bits[~bits[:, 0], 1].any()
+
+
 if __name__ == "__main__":
     pytest.main(sys.argv)
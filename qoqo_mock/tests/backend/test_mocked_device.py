@@ -0,0 +1,115 @@
+"""Test qoqo mocked device validation"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import pytest
+import sys
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo.devices import AllToAllDevice, GenericDevice, SquareLatticeDevice
+from qoqo.measurements import ClassicalRegister
+from qoqo_mock import MockedBackend, MockedDeviceIndex, MockedResultCache
+
+
+def _circuit(*operations) -> Circuit:
+    """Create a circuit with the given gates followed by a repeated measurement"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=4, is_output=True)
+    for operation in operations:
+        circuit += operation
+    circuit += ops.PragmaRepeatedMeasurement("ro", 10, None)
+    return circuit
+
+
+@pytest.mark.parametrize(
+    "operations, reason",
+    [
+        ([ops.CNOT(0, 1), ops.CNOT(3, 1), ops.RotateZ(2, 0.1)], None),
+        ([ops.CNOT(0, 1), ops.CNOT(0, 3)], "gate CNOT is not available on qubits (0, 3)"),
+        ([ops.RotateX(0, 0.1)], "gate RotateX is not available"),
+        ([ops.ControlledPauliZ(0, 1)], "gate ControlledPauliZ is not available"),
+        ([ops.Toffoli(0, 1, 2)], "gate Toffoli is not available on qubits (0, 1, 2)"),
+        ([ops.RotateZ(4, 0.1)], "the circuit uses 5 qubits, the device has 4"),
+        (
+            [ops.PragmaConditional("ro", 0, _circuit(ops.CNOT(1, 2)))],
+            "gate CNOT is not available on qubits (1, 2)",
+        ),
+    ],
+)
+def test_device_index_validate(operations, reason):
+    """Test validating circuits against the connectivity and gate set of a device"""
+    index = MockedDeviceIndex(SquareLatticeDevice(2, 2, ["RotateZ"], ["CNOT"], 1.0))
+    assert index.validate(_circuit(*operations)) == reason
+
+
+def test_device_index_directed_edges():
+    """Test that two-qubit gates are only available in the directions set in the device"""
+    device = GenericDevice(3)
+    device.set_single_qubit_gate_time("RotateZ", 0, 1.0)
+    device.set_two_qubit_gate_time("CNOT", 0, 1, 1.0)
+    device.set_two_qubit_gate_time("CZ", 1, 2, 1.0)
+    index = MockedDeviceIndex(device)
+    assert index.validate(_circuit(ops.CNOT(0, 1), ops.RotateZ(0, 0.1))) is None
+    reasons = [
+        index.validate(_circuit(operation))
+        for operation in [ops.RotateZ(1, 0.1), ops.CNOT(1, 0), ops.CNOT(1, 2)]
+    ]
+    assert reasons == [
+        "gate RotateZ is not available on qubit 1",
+        "gate CNOT is not available on qubits (1, 0)",
+        "gate CNOT is not available on qubits (1, 2)",
+    ]
+
+
+def test_mocked_backend_device(monkeypatch):
+    """Test that a device-aware backend refuses circuits and validates each circuit once"""
+    device = SquareLatticeDevice(2, 2, ["RotateZ"], ["CNOT"], 1.0)
+    backend = MockedBackend(seed=1, device=device)
+    assert backend.number_qubits == 4
+    circuit = _circuit(ops.CNOT(0, 1), ops.RotateZ(3, 0.1))
+    bit_registers, _, _ = backend.run_circuit(circuit)
+    assert len(bit_registers["ro"]) == 10
+
+    calls = []
+    find_violation = backend.device_index._find_violation
+    monkeypatch.setattr(
+        backend.device_index,
+        "_find_violation",
+        lambda circuit: calls.append(circuit) or find_violation(circuit),
+    )
+    backend.run_circuit(circuit)
+    backend.run_circuit_batch([circuit, circuit])
+    assert calls == []
+
+    with pytest.raises(RuntimeError, match="qubits \\(0, 3\\)"):
+        backend.run_circuit(_circuit(ops.CNOT(0, 3)))
+    with pytest.raises(RuntimeError):
+        backend.prepare(ClassicalRegister(None, [circuit, _circuit(ops.CNOT(0, 3))]))
+    assert len(calls) == 1
+
+
+def test_mocked_backend_device_shared_cache():
+    """Test that results cached without device are not served to a backend with device"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.PauliX(0)
+    circuit += ops.PragmaRepeatedMeasurement("ro", 10, None)
+    cache = MockedResultCache()
+    MockedBackend(number_qubits=2, seed=1, result_cache=cache).run_circuit(circuit)
+    device = AllToAllDevice(2, ["RotateZ"], ["CNOT"], 1.0)
+    backend = MockedBackend(seed=1, result_cache=cache, device=device)
+    with pytest.raises(RuntimeError):
+        backend.run_circuit(circuit)
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,166 @@
+"""Test qoqo mocked result cache"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import asyncio
+import pytest
+import sys
+import numpy as np
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo.measurements import PauliZProduct, PauliZProductInput
+from qoqo_mock import MockedBackend, MockedResultCache
+
+
+def _circuit(number_measurements: int) -> Circuit:
+    """Create a circuit with one repeated measurement"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.CNOT(0, 1)
+    circuit += ops.PragmaRepeatedMeasurement("ro", number_measurements, None)
+    return circuit
+
+
+def _measurement() -> PauliZProduct:
+    """Create a PauliZProduct measurement of one circuit"""
+    measurement_input = PauliZProductInput(2, False)
+    product = measurement_input.add_pauliz_product("ro", [0, 1])
+    measurement_input.add_linear_exp_val("exp", {product: 1.0})
+    return PauliZProduct(None, [_circuit(100)], measurement_input)
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_cached_runs(output_format):
+    """Test that repeated runs hit the cache and cached results cannot be corrupted"""
+    cache = MockedResultCache()
+    backend = MockedBackend(
+        number_qubits=2, seed=11, output_format=output_format, result_cache=cache
+    )
+    first = backend.run_circuit(_circuit(100))
+    assert (cache.hits, cache.misses) == (0, 1)
+    second = backend.run_circuit(_circuit(100))
+    assert (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(np.asarray(first[0]["ro"]), np.asarray(second[0]["ro"]))
+
+    if output_format == "numpy":
+        assert not second[0]["ro"].flags.writeable
+        with pytest.raises(ValueError):
+            second[0]["ro"][0, 0] = True
+    else:
+        expected = [list(row) for row in first[0]["ro"]]
+        second[0]["ro"][0][0] = not second[0]["ro"][0][0]
+        second[0]["ro"].append([True, True])
+        assert backend.run_circuit(_circuit(100))[0]["ro"] == expected
+
+    # Deterministic mode: results only depend on the content and the seed
+    fresh = MockedBackend(
+        number_qubits=2, seed=11, output_format=output_format, result_cache=MockedResultCache()
+    )
+    fresh.run_circuit(_circuit(5))
+    np.testing.assert_array_equal(
+        np.asarray(fresh.run_circuit(_circuit(100))[0]["ro"]), np.asarray(first[0]["ro"])
+    )
+
+
+def test_cached_measurement():
+    """Test caching registers and evaluated results of measurements"""
+    cache = MockedResultCache()
+    backend = MockedBackend(number_qubits=2, seed=12, result_cache=cache)
+    result = backend.run_measurement(_measurement())
+    # Evaluated results are cached without their registers
+    assert (len(cache), cache.hits, cache.misses) == (1, 0, 1)
+    assert backend.run_measurement(_measurement()) == result
+    registers = backend.run_measurement_registers(_measurement())
+    assert (len(cache), cache.hits, cache.misses) == (2, 1, 2)
+    assert len(registers[0]["ro"]) == 100
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_cached_async_runs(output_format):
+    """Test that async runs share the cache and the results of synchronous runs"""
+    cache = MockedResultCache()
+    backend = MockedBackend(
+        number_qubits=2, seed=14, output_format=output_format, result_cache=cache
+    )
+    reference = MockedBackend(
+        number_qubits=2, seed=14, output_format=output_format, result_cache=MockedResultCache()
+    )
+
+    async def run_async():
+        return (
+            await backend.run_circuit_async(_circuit(50)),
+            await backend.run_measurement_registers_async(_measurement()),
+            await backend.run_measurement_async(_measurement()),
+        )
+
+    circuit_registers, measurement_registers, result = asyncio.run(run_async())
+    backend.close()
+    assert (cache.hits, cache.misses) == (0, 3)
+    np.testing.assert_array_equal(
+        np.asarray(circuit_registers[0]["ro"]),
+        np.asarray(reference.run_circuit(_circuit(50))[0]["ro"]),
+    )
+    np.testing.assert_array_equal(
+        np.asarray(measurement_registers[0]["ro"]),
+        np.asarray(reference.run_measurement_registers(_measurement())[0]["ro"]),
+    )
+    assert result == reference.run_measurement(_measurement())
+    backend.run_circuit(_circuit(50))
+    assert cache.hits == 1
+
+
+def test_cache_eviction():
+    """Test LRU eviction by number of entries and by bytes"""
+    cache = MockedResultCache(max_entries=2)
+    backend = MockedBackend(number_qubits=2, seed=13, output_format="numpy", result_cache=cache)
+    for number_measurements in (10, 20, 10, 30):
+        backend.run_circuit(_circuit(number_measurements))
+    assert len(cache) == 2
+    backend.run_circuit(_circuit(10))
+    backend.run_circuit(_circuit(20))
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    cache = MockedResultCache(max_bytes=5000)
+    backend = MockedBackend(number_qubits=2, seed=13, output_format="numpy", result_cache=cache)
+    backend.run_circuit(_circuit(1000))
+    backend.run_circuit(_circuit(1000))
+    assert len(cache) == 1 and 2000 <= cache.nbytes < 5000
+    backend.run_circuit(_circuit(1500))
+    assert len(cache) == 1 and 3000 <= cache.nbytes < 5000
+    # Results larger than the limit are not cached
+    backend.run_circuit(_circuit(10000))
+    assert len(cache) == 1 and cache.hits == 1
+
+    cache.clear()
+    assert (len(cache), cache.nbytes, cache.hits, cache.misses) == (0, 0, 0, 0)
+
+
+def test_cache_memory_limit():
+    """Test that results cached without memory limit are not served to a limited backend"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="state", length=16, is_output=True)
+    circuit += ops.PragmaGetStateVector("state", None)
+    cache = MockedResultCache()
+    MockedBackend(number_qubits=4, seed=15, result_cache=cache).run_circuit(circuit)
+    limited = MockedBackend(number_qubits=4, seed=15, result_cache=cache, memory_limit=64)
+    with pytest.raises(MemoryError):
+        limited.run_circuit(circuit)
+
+
+def test_cache_requires_seed():
+    """Test that a result cache cannot be used without seed"""
+    with pytest.raises(ValueError):
+        MockedBackend(result_cache=MockedResultCache())
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,159 @@
+"""Test qoqo mocked result sink"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import pytest
+import sys
+import os
+import numpy as np
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo.measurements import PauliZProduct, PauliZProductInput
+from qoqo_mock import MockedBackend, MockedDensityMatrix, MockedRegisterFile, MockedResultSink
+
+
+def _circuit(number_measurements: int) -> Circuit:
+    """Create a circuit with a repeated measurement and a state vector readout"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="state", length=4, is_output=True)
+    circuit += ops.PragmaGetStateVector("state", None)
+    circuit += ops.PragmaRepeatedMeasurement("ro", number_measurements, None)
+    return circuit
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+@pytest.mark.parametrize("shot_chunk_size", [None, 7])
+def test_result_sink_run_circuit(tmp_path, output_format, shot_chunk_size):
+    """Test that the registers of a run are stored and match the registers kept in memory"""
+    backend = MockedBackend(
+        number_qubits=2,
+        seed=3,
+        output_format=output_format,
+        shot_chunk_size=shot_chunk_size,
+        result_sink=MockedResultSink(tmp_path / "results"),
+    )
+    bit_registers, _, complex_registers = backend.run_circuit(_circuit(20))
+    expected = MockedBackend(
+        number_qubits=2, seed=3, output_format=output_format, shot_chunk_size=shot_chunk_size
+    ).run_circuit(_circuit(20))
+
+    handle = bit_registers["ro"]
+    assert isinstance(handle, MockedRegisterFile)
+    assert handle.path == str(tmp_path / "results" / "run_0_bit_ro.npy")
+    assert len(handle) == 20
+    stored = np.memmap(
+        handle.path, handle.dtype, mode="r", offset=handle.offset, shape=handle.shape
+    )
+    expected_bits = expected[0]["ro"]
+    if shot_chunk_size is not None:
+        expected_bits = expected_bits.tolist()
+    assert stored.tolist() == np.asarray(expected_bits).tolist()
+    assert np.array_equal(np.load(handle.path), stored)
+    assert np.array_equal(np.asarray(complex_registers["state"]), expected[2]["state"])
+
+    bit_registers, _, _ = backend.run_circuit(_circuit(5))
+    assert bit_registers["ro"].path.endswith("run_1_bit_ro.npy")
+    assert bit_registers["ro"].open().shape == (5, 2)
+
+
+def test_result_sink_write_registers(tmp_path):
+    """Test storing empty registers and keeping registers that are not arrays"""
+    sink = MockedResultSink(tmp_path)
+    sparse = object()
+    bit_registers, float_registers, complex_registers = sink.write_registers(
+        ({"empty": []}, {"float": [[0.5, 1.5]]}, {"sparse": sparse})
+    )
+    assert bit_registers["empty"].shape == (0,)
+    assert bit_registers["empty"].tolist() == []
+    assert np.load(bit_registers["empty"].path).size == 0
+    assert float_registers["float"].dtype == np.float64
+    assert float_registers["float"].tolist() == [[0.5, 1.5]]
+    assert complex_registers["sparse"] is sparse
+
+
+def test_result_sink_measurement(tmp_path):
+    """Test that measurement registers are stored and evaluated measurements are not"""
+    measurement_input = PauliZProductInput(2, False)
+    product = measurement_input.add_pauliz_product("ro", [0, 1])
+    measurement_input.add_linear_exp_val("exp", {product: 1.0})
+    measurement = PauliZProduct(None, [_circuit(50)], measurement_input)
+    sink = MockedResultSink(tmp_path)
+    backend = MockedBackend(number_qubits=2, seed=3, result_sink=sink)
+
+    bit_registers, _, _ = backend.run_measurement_registers(measurement)
+    assert isinstance(bit_registers["ro"], MockedRegisterFile)
+    assert len(bit_registers["ro"]) == 50
+    assert set(backend.run_measurement(measurement)) == {"exp"}
+    assert set(backend.prepare(measurement).run()) == {"exp"}
+    assert sorted(path.name for path in tmp_path.glob("*_ro.npy")) == ["run_0_bit_ro.npy"]
+
+    results = backend.run_circuit_batch([_circuit(3), _circuit(4)])
+    assert [len(result[0]["ro"]) for result in results] == [3, 4]
+
+
+def test_result_sink_register_names(tmp_path):
+    """Test that register names cannot escape the sink directory and stay distinct"""
+    sink = MockedResultSink(tmp_path / "results")
+    names = ["../escape", "a/b", "a_b", "a%2Fb", ".."]
+    bit_registers, _, _ = sink.write_registers(({name: [[True, False]] for name in names}, {}, {}))
+    paths = {bit_registers[name].path for name in names}
+    assert len(paths) == len(names)
+    assert sorted(path.name for path in (tmp_path / "results").iterdir()) == sorted(
+        os.path.basename(path) for path in paths
+    )
+    assert list(tmp_path.iterdir()) == [tmp_path / "results"]
+    assert bit_registers["../escape"].tolist() == [[True, False]]
+
+
+def test_result_sink_measurement_circuits(tmp_path):
+    """Test that the registers of each circuit of a measurement are written to one run"""
+    first = Circuit()
+    first += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    first += ops.PragmaRepeatedMeasurement("ro", 10, None)
+    second = Circuit()
+    second += ops.DefinitionBit(name="other", length=2, is_output=True)
+    second += ops.PragmaRepeatedMeasurement("other", 20, None)
+    measurement_input = PauliZProductInput(2, False)
+    product = measurement_input.add_pauliz_product("ro", [0, 1])
+    measurement_input.add_linear_exp_val("exp", {product: 1.0})
+    measurement = PauliZProduct(None, [first, second], measurement_input)
+    backend = MockedBackend(
+        number_qubits=2,
+        output_format="numpy",
+        bit_register_format="packed",
+        result_sink=MockedResultSink(tmp_path),
+    )
+
+    bit_registers, _, _ = backend.run_measurement_registers(measurement)
+    assert bit_registers["ro"].path.endswith("run_0_bit_ro.npy")
+    assert bit_registers["other"].path.endswith("run_0_bit_other.npy")
+    assert bit_registers["other"].open().shape == (20, 2)
+    bit_registers, _, _ = backend.prepare(measurement).run_registers()
+    assert bit_registers["ro"].path.endswith("run_1_bit_ro.npy")
+
+
+def test_result_sink_lazy_density_matrix(tmp_path):
+    """Test that lazy density matrices are kept in memory instead of being materialised"""
+    circuit = Circuit()
+    circuit += ops.DefinitionComplex(name="dm", length=1, is_output=True)
+    circuit += ops.PragmaGetDensityMatrix("dm", None)
+    backend = MockedBackend(
+        number_qubits=20, density_matrix_format="lazy", result_sink=MockedResultSink(tmp_path)
+    )
+    _, _, complex_registers = backend.run_circuit(circuit)
+    assert isinstance(complex_registers["dm"], MockedDensityMatrix)
+    assert list(tmp_path.iterdir()) == []
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,82 @@
+"""Test qoqo mocked timing model"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import pytest
+import sys
+import time
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo_mock import MockedBackend, MockedTimingModel
+
+
+def _timed_circuit() -> Circuit:
+    """Create a circuit with gates, sleeps, resets and 100 shots"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.PauliX(0)
+    circuit += ops.Hadamard(1)
+    circuit += ops.CNOT(0, 1)
+    circuit += ops.MultiQubitMS([0, 1], 0.1)
+    circuit += ops.PragmaSleep([0, 1], 0.5)
+    circuit += ops.PragmaActiveReset(0)
+    circuit += ops.PragmaSetNumberOfMeasurements(100, "ro")
+    circuit += ops.PragmaRepeatedMeasurement(readout="ro", number_measurements=10)
+    return circuit
+
+
+def test_circuit_duration():
+    """Test the simulated duration of a circuit"""
+    model = MockedTimingModel(
+        queue_delay=2.0,
+        shot_time=0.25,
+        single_qubit_gate_time=1.0,
+        two_qubit_gate_time=10.0,
+        multi_qubit_gate_time=100.0,
+        active_reset_time=1000.0,
+        gate_times={"Hadamard": 3.0},
+        virtual=True,
+    )
+    circuit = _timed_circuit()
+    shot_duration = 1.0 + 3.0 + 10.0 + 100.0 + 0.5 + 1000.0 + 0.25
+    assert model.circuit_duration(circuit) == pytest.approx(100 * shot_duration)
+    assert model.job_duration([circuit, circuit]) == pytest.approx(2.0 + 200 * shot_duration)
+    assert model.circuit_duration(Circuit()) == pytest.approx(0.25)
+
+
+def test_virtual_timing_with_backend():
+    """Test that the backend accounts each run as a job in virtual time"""
+    model = MockedTimingModel(queue_delay=60.0, shot_time=1.0, virtual=True)
+    mocked = MockedBackend(number_qubits=2, timing_model=model)
+    start = time.perf_counter()
+    mocked.run_circuit(_timed_circuit())
+    mocked.run_circuit(_timed_circuit())
+    assert time.perf_counter() - start < 1.0
+    assert model.number_jobs == 2
+    assert model.last_job_duration == pytest.approx(210.0)
+    assert model.total_duration == pytest.approx(420.0)
+    model.reset()
+    assert model.number_jobs == 0
+    assert model.total_duration == 0.0
+
+
+def test_real_time_timing_with_backend():
+    """Test that the backend sleeps for the job duration in real-time mode"""
+    model = MockedTimingModel(queue_delay=0.05)
+    mocked = MockedBackend(number_qubits=2, timing_model=model)
+    start = time.perf_counter()
+    mocked.run_circuit(Circuit())
+    assert time.perf_counter() - start >= 0.05
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -15,8 +15,14 @@ import sys
 import numpy as np
 from qoqo import operations as ops
 from qoqo import Circuit
-from typing import Any
-from qoqo_mock import mocked_call_circuit
+from typing import Any, Dict
+from qoqo_mock import (
+    mocked_call_circuit,
+    mocked_call_operation,
+    mocked_compile_circuit,
+    MockedBitRegister,
+    MockedShotStream,
+)
 
 
 @pytest.mark.parametrize(
@@ -102,5 +108,307 @@ def test_all_operations(op: Any):
     )
 
 
+def test_unknown_keyword_argument():
+    """Test that misspelled keyword arguments are rejected"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=1, is_output=True)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    rng = np.random.default_rng(1)
+    with pytest.raises(TypeError):
+        mocked_call_circuit(circuit, {}, {}, {}, {}, {}, rgn=rng)
+    with pytest.raises(TypeError):
+        mocked_call_operation(circuit[1], {"ro": [False]}, {}, {}, {}, {}, rgn=rng)
+
+
+def test_compiled_plan():
+    """Test that the compiled plan only keeps readouts and is cached"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionFloat(name="fl", length=1, is_output=False)
+    for _ in range(100):
+        circuit += ops.CNOT(0, 1)
+    circuit += ops.PragmaSleep([0, 1], 0.002)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    circuit += ops.PragmaRepeatedMeasurement("ro", 20, {})
+
+    plan = mocked_compile_circuit(circuit)
+    assert [op.hqslang() for _, op in plan.readouts] == [
+        "MeasureQubit",
+        "PragmaRepeatedMeasurement",
+    ]
+    assert plan.bit_definitions == [("ro", 2, True)]
+    assert plan.float_definitions == [("fl", 1, False)]
+    assert plan.complex_definitions == []
+    assert mocked_compile_circuit(circuit.__copy__()) is plan
+
+    circuit += ops.PauliX(0)
+    assert mocked_compile_circuit(circuit) is not plan
+
+
+def test_unsupported_operation_fails_up_front():
+    """Test that unsupported operations are rejected before any readout"""
+    circuit = Circuit()
+    circuit += ops.PragmaRepeatedMeasurement("ro", 20, {})
+    circuit += ops.InputBit("ro", 0, True)
+    output_bit_register_dict: Dict[str, Any] = {}
+    with pytest.raises(RuntimeError):
+        mocked_call_circuit(
+            circuit=circuit,
+            classical_bit_registers={},
+            classical_float_registers={},
+            classical_complex_registers={},
+            output_bit_register_dict=output_bit_register_dict,
+            output_complex_register_dict={},
+            number_qubits=1,
+        )
+    assert output_bit_register_dict == {}
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_streamed_repeated_measurement(output_format):
+    """Test that repeated measurements are streamed in chunks of shots"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=3, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement("ro", 1000001, None)
+    output_bit_register_dict: Dict[str, Any] = {}
+    mocked_call_circuit(
+        circuit,
+        {},
+        {},
+        {},
+        output_bit_register_dict,
+        {},
+        number_qubits=3,
+        rng=np.random.default_rng(1),
+        output_format=output_format,
+        shot_chunk_size=100000,
+    )
+    stream = output_bit_register_dict["ro"]
+    assert isinstance(stream, MockedShotStream)
+    assert len(stream) == 1000001
+    assert stream.shape == (1000001, 3)
+
+    chunk_lengths = [len(chunk) for chunk in stream]
+    assert chunk_lengths == [100000] * 10 + [1]
+    first_chunk = next(iter(stream))
+    assert isinstance(first_chunk, np.ndarray if output_format == "numpy" else list)
+    # Every iteration yields the same shots
+    np.testing.assert_array_equal(np.asarray(first_chunk), next(stream.chunks()))
+
+    histogram = stream.histogram()
+    assert sum(histogram.values()) == 1000001
+    assert set(histogram) <= set(range(8))
+    weights = np.array([1, 2, 4])
+    assert histogram[5] == np.count_nonzero(stream.to_array() @ weights == 5)
+
+    with pytest.raises(ValueError):
+        mocked_call_circuit(circuit, {}, {}, {}, {}, {}, shot_chunk_size=0)
+
+
+def test_bit_register_accessors():
+    """Test packing bits and the row, column and bool accessors of MockedBitRegister"""
+    bits = np.random.default_rng(2).integers(0, 2, size=(50, 11), dtype=np.bool_)
+    register = MockedBitRegister.from_bool(bits)
+    assert register.shape == (50, 11)
+    assert len(register) == 50
+    assert register.nbytes == 50 * 2
+    np.testing.assert_array_equal(register.to_bool(), bits)
+    np.testing.assert_array_equal(np.asarray(register), bits)
+    assert register.tolist() == bits.tolist()
+    np.testing.assert_array_equal(register.row(3), bits[3])
+    np.testing.assert_array_equal(register.row(slice(5, 9)), bits[5:9])
+    for bit in (0, 7, 8, 10, -1):
+        np.testing.assert_array_equal(register.column(bit), bits[:, bit])
+    with pytest.raises(IndexError):
+        register.column(11)
+
+
+@pytest.mark.parametrize("number_qubits", [3, 8, 11])
+def test_packed_repeated_measurement(number_qubits):
+    """Test that packed repeated measurements keep the unused bits zero"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=number_qubits, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement("ro", 1000, None)
+    output_bit_register_dict: Dict[str, Any] = {}
+    mocked_call_circuit(
+        circuit,
+        {},
+        {},
+        {},
+        output_bit_register_dict,
+        {},
+        number_qubits=number_qubits,
+        bit_register_format="packed",
+    )
+    register = output_bit_register_dict["ro"]
+    assert isinstance(register, MockedBitRegister)
+    assert register.shape == (1000, number_qubits)
+    bits = register.to_bool()
+    assert bits.any() and not bits.all()
+    # Repacking the unpacked bits restores the packed bytes, unused bits included
+    np.testing.assert_array_equal(MockedBitRegister.from_bool(bits).packed, register.packed)
+
+    with pytest.raises(ValueError):
+        mocked_call_circuit(circuit, {}, {}, {}, {}, {}, bit_register_format="bytes")
+
+
+@pytest.mark.parametrize("output_format", ["list", "numpy"])
+def test_measure_qubit_number_of_measurements(output_format):
+    """Test that MeasureQubit readouts produce the shots set by PragmaSetNumberOfMeasurements"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=3, is_output=True)
+    circuit += ops.DefinitionBit(name="single", length=1, is_output=True)
+    circuit += ops.CNOT(0, 2)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    circuit += ops.MeasureQubit(2, "ro", 2)
+    circuit += ops.MeasureQubit(0, "single", 0)
+    circuit += ops.PragmaSetNumberOfMeasurements(1000, "ro")
+    assert mocked_compile_circuit(circuit).number_measurements == {"ro": 1000}
+
+    classical_bit_registers: Dict[str, Any] = {"ro": [False] * 3, "single": [False]}
+    output_bit_register_dict: Dict[str, Any] = {}
+    mocked_call_circuit(
+        circuit,
+        classical_bit_registers,
+        {},
+        {},
+        output_bit_register_dict,
+        {},
+        number_qubits=3,
+        rng=np.random.default_rng(4),
+        output_format=output_format,
+    )
+    assert set(output_bit_register_dict) == {"ro"}
+    assert set(classical_bit_registers) == {"single"}
+    bits = np.asarray(output_bit_register_dict["ro"])
+    assert bits.shape == (1000, 3)
+    # Only the measured bits are random
+    assert 0.4 < bits[:, 0].mean() < 0.6 and 0.4 < bits[:, 2].mean() < 0.6
+    assert not bits[:, 1].any()
+
+
+def test_conditional_shot_vectorised():
+    """Test that conditionals on multi-shot registers only change the selected shots"""
+    conditional_circuit = Circuit()
+    conditional_circuit += ops.MeasureQubit(1, "ro", 1)
+    conditional_circuit += ops.MeasureQubit(1, "result", 0)
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionBit(name="result", length=1, is_output=True)
+    circuit += ops.MeasureQubit(0, "ro", 0)
+    circuit += ops.PragmaConditional("ro", 0, conditional_circuit)
+    circuit += ops.PragmaSetNumberOfMeasurements(2000, "ro")
+
+    output_bit_register_dict: Dict[str, Any] = {}
+    mocked_call_circuit(
+        circuit,
+        {"ro": [False, False], "result": [False]},
+        {},
+        {},
+        output_bit_register_dict,
+        {},
+        number_qubits=2,
+        rng=np.random.default_rng(5),
+        output_format="numpy",
+    )
+    ro = output_bit_register_dict["ro"]
+    result = output_bit_register_dict["result"]
+    assert ro.shape == (2000, 2) and result.shape == (2000, 1)
+    selected = ro[:, 0]
+    assert 0.4 < selected.mean() < 0.6
+    # Only the shots meeting the condition are measured in the conditional circuit
+    assert not ro[~selected, 1].any() and not result[~selected, 0].any()
+    assert 0.4 < ro[selected, 1].mean() < 0.6 and 0.4 < result[selected, 0].mean() < 0.6
+
+
+@pytest.mark.parametrize("flag", [True, False])
+def test_conditional_single_shot(flag):
+    """Test that conditionals on single-shot registers run their circuit if the bit is set"""
+    conditional_circuit = Circuit()
+    conditional_circuit += ops.PragmaGetPauliProduct({0: 3}, "fl", Circuit())
+    circuit = Circuit()
+    circuit += ops.PragmaConditional("flag", 0, conditional_circuit)
+    classical_float_registers: Dict[str, Any] = {}
+    mocked_call_circuit(
+        circuit, {"flag": [flag]}, classical_float_registers, {}, {}, {}, number_qubits=1
+    )
+    assert ("fl" in classical_float_registers) == flag
+
+
+@pytest.mark.parametrize("bit_register_format", ["dense", "packed"])
+def test_threaded_draws(monkeypatch, bit_register_format):
+    """Test that split draws are deterministic and independent of the number of threads"""
+    monkeypatch.setattr("qoqo_mock.interface.mocked_interface._DRAW_BLOCK_SIZE", 64)
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=3, is_output=True)
+    circuit += ops.DefinitionBit(name="mq", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="state", length=64, is_output=True)
+    circuit += ops.PragmaSetNumberOfMeasurements(500, "mq")
+    circuit += ops.MeasureQubit(0, "mq", 0)
+    circuit += ops.PragmaGetStateVector("state", Circuit())
+    circuit += ops.PragmaRepeatedMeasurement("ro", 1000, {0: 0, 1: 1})
+
+    results = []
+    for draw_threads in [1, 3, 3]:
+        classical_complex_registers: Dict[str, Any] = {}
+        output_bit_register_dict: Dict[str, Any] = {}
+        mocked_call_circuit(
+            circuit,
+            {},
+            {},
+            classical_complex_registers,
+            output_bit_register_dict,
+            {},
+            number_qubits=6,
+            rng=np.random.default_rng(4),
+            output_format="numpy",
+            bit_register_format=bit_register_format,
+            draw_threads=draw_threads,
+        )
+        results.append(
+            (
+                np.asarray(output_bit_register_dict["ro"]),
+                np.asarray(output_bit_register_dict["mq"]),
+                classical_complex_registers["state"],
+            )
+        )
+    for ro, mq, state in results:
+        assert np.array_equal(ro, results[0][0]) and np.array_equal(mq, results[0][1])
+        assert np.array_equal(state, results[0][2])
+    ro, mq, state = results[0]
+    assert ro.shape == (1000, 3) and not ro[:, 2].any() and 0.45 < ro[:, :2].mean() < 0.55
+    assert mq.shape == (500, 2) and not mq[:, 1].any() and 0.4 < mq[:, 0].mean() < 0.6
+    assert np.isclose(np.vdot(state, state).real, 1.0)
+    # Different blocks are drawn from independent generators
+    assert not np.array_equal(ro[:21], ro[21:42])
+
+    with pytest.raises(ValueError):
+        mocked_call_circuit(circuit, {}, {}, {}, {}, {}, number_qubits=6, draw_threads=0)
+
+
+@pytest.mark.parametrize("seed", [None, 7])
+def test_readout_generator(seed):
+    """Test that readouts are reproducible with a seeded generator and unseeded without one"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=4, is_output=True)
+    circuit += ops.PragmaRepeatedMeasurement("ro", 200, None)
+    results = []
+    for _ in range(2):
+        output_bit_register_dict: Dict[str, Any] = {}
+        mocked_call_circuit(
+            circuit,
+            {},
+            {},
+            {},
+            output_bit_register_dict,
+            {},
+            number_qubits=4,
+            rng=None if seed is None else np.random.default_rng(seed),
+            output_format="numpy",
+        )
+        results.append(output_bit_register_dict["ro"])
+    assert np.array_equal(results[0], results[1]) == (seed is not None)
+
+
 if __name__ == "__main__":
     pytest.main(sys.argv)
@@ -0,0 +1,74 @@
+"""Test qoqo mocked profiler"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import pickle
+import pytest
+import sys
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo_mock import mocked_call_circuit, mocked_call_operation, MockedProfiler
+
+
+def test_profiled_circuit():
+    """Test recording the phases, operations and callbacks of mocked_call_circuit"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionFloat(name="ro_float", length=2, is_output=True)
+    circuit += ops.PauliX(0)
+    circuit += ops.PragmaGetOccupationProbability("ro_float", Circuit())
+    circuit += ops.PragmaRepeatedMeasurement("ro", 10, None)
+
+    calls = []
+    profiler = MockedProfiler()
+    profiler.add_before_operation(lambda operation: calls.append(("before", operation.hqslang())))
+    profiler.add_after_operation(
+        lambda operation, duration: calls.append(("after", operation.hqslang()))
+    )
+    mocked_call_circuit(circuit, {}, {}, {}, {}, {}, number_qubits=2, profiler=profiler)
+
+    assert calls == [
+        ("before", "PragmaGetOccupationProbability"),
+        ("after", "PragmaGetOccupationProbability"),
+        ("before", "PragmaRepeatedMeasurement"),
+        ("after", "PragmaRepeatedMeasurement"),
+    ]
+    report = profiler.report()
+    assert set(report["phases"]) == {"compile", "dispatch", "conversion"}
+    assert report["phases"]["conversion"]["count"] == 2
+    # Gates are skipped when compiling, only readouts are dispatched
+    assert set(report["operations"]) == {
+        "PragmaGetOccupationProbability",
+        "PragmaRepeatedMeasurement",
+    }
+
+    operation = ops.PragmaRepeatedMeasurement("ro", 10, None)
+    mocked_call_operation(operation, {}, {}, {}, {}, {}, profiler=profiler)
+    assert profiler.report()["operations"]["PragmaRepeatedMeasurement"]["count"] == 2
+
+    profiler.reset()
+    assert profiler.report() == {"phases": {}, "operations": {}}
+    assert len(profiler.before_operation) == 1
+
+
+def test_profiler_pickle():
+    """Test that a profiler can be pickled with its statistics"""
+    profiler = MockedProfiler()
+    profiler.record_phase("dispatch", 0.5)
+    restored = pickle.loads(pickle.dumps(profiler))
+    assert restored.report() == profiler.report()
+    restored.record_phase("dispatch", 0.5)
+    assert restored.report()["phases"]["dispatch"] == {"count": 2, "time": 1.0}
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,76 @@
+"""Test qoqo mocked benchmark suite"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import json
+import os
+import pytest
+import sys
+from qoqo_mock import benchmarks
+
+
+def test_benchmark_cases_cover_sweeps() -> None:
+    """Test that the suite sweeps all parameters and benchmarked functions"""
+    names = [name for name, _ in benchmarks.benchmark_cases()]
+    assert len(names) == len(set(names))
+    for prefix in (
+        "mocked_call_circuit/",
+        "run_circuit/",
+        "run_measurement_registers/",
+        "run_measurement/",
+    ):
+        assert any(name.startswith(prefix) for name in names)
+    for readout_type in benchmarks.READOUT_TYPES:
+        assert any(f"/{readout_type}/" in name for name in names)
+
+
+def test_compare_results() -> None:
+    """Test that only slowdowns beyond the tolerance are regressions"""
+    baseline = {"results": {"a": 1.0, "b": 1.0, "c": 1.0}}
+    results = {"results": {"a": 1.1, "b": 2.0, "c": 0.5, "d": 10.0}}
+    assert benchmarks.compare_results(results, baseline, 0.25) == [("b", 1.0, 2.0)]
+
+
+def test_main_stores_and_compares(tmp_path) -> None:
+    """Test storing results as JSON and comparing against them"""
+    output = str(tmp_path / "results.json")
+    arguments = ["--repeats", "1", "--filter", "length=100$", "--output", output]
+    assert benchmarks.main(arguments) == 0
+    with open(output) as file:
+        stored = json.load(file)
+    assert set(stored["results"]) == {"mocked_call_circuit/length=100", "run_circuit/length=100"}
+
+    baseline = str(tmp_path / "baseline.json")
+    stored["results"] = {name: 0.0 for name in stored["results"]}
+    with open(baseline, "w") as file:
+        json.dump(stored, file)
+    assert (
+        benchmarks.main(["--repeats", "1", "--filter", "length=100$", "--baseline", baseline]) == 1
+    )
+
+
+def test_import_time_budget_regression() -> None:
+    """Test that exceeding the import time budget is reported as regression"""
+    assert benchmarks.main(["--repeats", "1", "--filter", "^import/", "--import-budget", "0"]) == 1
+
+
+@pytest.mark.skipif(
+    not os.environ.get("QOQO_MOCK_BENCHMARKS"),
+    reason="wall-clock budget, set QOQO_MOCK_BENCHMARKS=1 to run",
+)
+def test_import_time_budget() -> None:
+    """Test that importing qoqo_mock stays within the import time budget"""
+    assert benchmarks.main(["--repeats", "3", "--filter", "^import/"]) == 0
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
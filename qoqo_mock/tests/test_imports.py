@@ -0,0 +1,54 @@
+"""Test lazy imports of qoqo_mock"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import os
+import pytest
+import subprocess
+import sys
+import qoqo_mock
+
+
+def _run(code: str) -> list:
+    """Run code in a fresh interpreter and return the words of its output"""
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, env=environment, text=True
+    ).stdout.split()
+
+
+@pytest.mark.parametrize("package", ["qoqo_mock", "qoqo_mock.interface", "qoqo_mock.backend"])
+def test_import_is_lazy(package):
+    """Test that importing the packages does not import qoqo and numpy"""
+    code = f"import sys, {package}\nprint('qoqo' in sys.modules, 'numpy' in sys.modules)"
+    assert _run(code) == ["False", "False"]
+
+
+@pytest.mark.parametrize("name", qoqo_mock.__all__)
+def test_lazy_names(name):
+    """Test that all public names are imported on first access"""
+    code = f"import qoqo_mock\nprint(qoqo_mock.{name}.__module__, '{name}' in vars(qoqo_mock))"
+    module, cached = _run(code)
+    assert module.startswith("qoqo_mock.")
+    assert cached == "True"
+    assert name in dir(qoqo_mock)
+
+
+def test_unknown_name():
+    """Test that unknown names raise AttributeError"""
+    with pytest.raises(AttributeError):
+        qoqo_mock.MockedSimulator
+    assert not hasattr(qoqo_mock.backend, "mocked_call_circuit")
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
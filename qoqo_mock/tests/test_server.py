@@ -0,0 +1,136 @@
+"""Test qoqo mocked job server and remote backend"""
+
+# Copyright © 2019-2023 HQS Quantum Simulations GmbH. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+import pytest
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from qoqo import operations as ops
+from qoqo import Circuit
+from qoqo.measurements import PauliZProduct, PauliZProductInput
+from qoqo_mock import MockedBackend, MockedRemoteBackend
+from qoqo_mock.server import MockedJobServer
+
+
+@pytest.fixture
+def server():
+    """Start a job server on a free port"""
+    job_server = MockedJobServer(MockedBackend(number_qubits=2, seed=1), number_workers=2)
+    job_server.start()
+    yield job_server
+    job_server.shutdown()
+
+
+def _circuit() -> Circuit:
+    """Create a circuit with bit, float and complex readouts"""
+    circuit = Circuit()
+    circuit += ops.DefinitionBit(name="ro", length=2, is_output=True)
+    circuit += ops.DefinitionFloat(name="ro_float", length=2, is_output=True)
+    circuit += ops.DefinitionComplex(name="ro_complex", length=4, is_output=True)
+    circuit += ops.CNOT(0, 1)
+    circuit += ops.PragmaGetOccupationProbability("ro_float", Circuit())
+    circuit += ops.PragmaGetStateVector("ro_complex", Circuit())
+    circuit += ops.PragmaRepeatedMeasurement("ro", 10, None)
+    return circuit
+
+
+@pytest.mark.parametrize("serialisation", ["json", "bincode"])
+def test_remote_backend(server, serialisation):
+    """Test running circuits and measurements through the job server"""
+    backend = MockedRemoteBackend(server.url, serialisation=serialisation, pool_size=2)
+    bit_registers, float_registers, complex_registers = backend.run_circuit(_circuit())
+    assert len(bit_registers["ro"]) == 10
+    assert len(float_registers["ro_float"][0]) == 2
+    assert len(complex_registers["ro_complex"][0]) == 4
+    assert isinstance(complex_registers["ro_complex"][0][0], complex)
+
+    measurement_input = PauliZProductInput(2, False)
+    product = measurement_input.add_pauliz_product("ro", [0, 1])
+    measurement_input.add_linear_exp_val("exp", {product: 1.0})
+    measurement = PauliZProduct(None, [_circuit()], measurement_input)
+    assert len(backend.run_measurement_registers(measurement)[0]["ro"]) == 10
+    assert set(backend.run_measurement(measurement)) == {"exp"}
+
+    # Concurrent jobs share the connection pool
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: backend.run_circuit(_circuit()), range(8)))
+    assert all(len(result[0]["ro"]) == 10 for result in results)
+    backend.close()
+
+
+def test_remote_backend_errors(server):
+    """Test that refused and failed jobs raise errors on the client"""
+    backend = MockedRemoteBackend(server.url)
+    with pytest.raises(RuntimeError, match="Job submission failed"):
+        backend.submit("simulation", Circuit())
+    circuit = Circuit()
+    circuit += ops.InputBit("ro", 0, True)
+    with pytest.raises(RuntimeError, match="failed"):
+        backend.run_circuit(circuit)
+    with pytest.raises(ValueError):
+        MockedRemoteBackend(server.url, serialisation="pickle")
+
+
+def _wait_finished(job_server: MockedJobServer, job_id: str) -> None:
+    """Wait until a job has finished or failed"""
+    job = job_server.job(job_id)
+    while job is not None and job.status in ("queued", "running"):
+        time.sleep(0.001)
+
+
+def test_job_eviction(server):
+    """Test that failed jobs are removed once reported and unretrieved jobs expire"""
+    backend = MockedRemoteBackend(server.url)
+    circuit = Circuit()
+    circuit += ops.InputBit("ro", 0, True)
+    job_id = backend.submit("circuit", circuit)
+    with pytest.raises(RuntimeError, match="failed"):
+        backend.wait(job_id)
+    assert server.job(job_id) is None
+
+    expiring = MockedJobServer(MockedBackend(number_qubits=2), job_ttl=0.0)
+    expiring.start()
+    job_id = expiring.submit("circuit", _circuit())
+    _wait_finished(expiring, job_id)
+    assert expiring.job(job_id) is None
+    expiring.shutdown()
+
+
+@pytest.mark.parametrize("density_matrix_format", ["sparse", "lazy"])
+def test_density_matrix_format(density_matrix_format):
+    """Test that the job server rejects backends with non-dense density matrices"""
+    backend = MockedBackend(number_qubits=2, density_matrix_format=density_matrix_format)
+    with pytest.raises(ValueError):
+        MockedJobServer(backend)
+
+
+def test_idempotent_submission(server):
+    """Test that repeated submissions with the same key queue a single job"""
+    job_id = server.submit("circuit", _circuit(), "key")
+    assert server.submit("circuit", _circuit(), "key") == job_id
+    assert server.submit("circuit", _circuit()) != job_id
+    _wait_finished(server, job_id)
+    server.remove(job_id)
+    assert server.submit("circuit", _circuit(), "key") != job_id
+
+
+def test_request_timeout(server):
+    """Test that the socket timeout is applied to the pooled connections"""
+    backend = MockedRemoteBackend(server.url, request_timeout=5.0)
+    assert len(backend.run_circuit(_circuit())[0]["ro"]) == 10
+    assert backend._connections.get_nowait().timeout == 5.0
+    backend.close()
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)